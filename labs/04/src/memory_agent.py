@@ -11,9 +11,10 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from src.agent_labs.memory import LongTermMemory, MemoryItem, ShortTermMemory
+from src.agent_labs.memory.snapshot import SnapshotWriter, load_snapshots, sequence_keys
 
 
 @dataclass
@@ -103,6 +104,7 @@ class MemoryAgent:
         self.short_term = ShortTermMemory(max_items=max_short_term)
         self.long_term = LongTermMemory()
         self.max_short_term = max_short_term
+        self._snapshot_writer: Optional[SnapshotWriter] = None
 
     def add_conversation_turn(self, role: str, content: str) -> None:
         """Add a conversation turn to short-term memory.
@@ -149,38 +151,29 @@ class MemoryAgent:
 
         # Split query into terms for matching
         query_terms = set(query.lower().split())
+        relevance_scores = {}
 
-        # Retrieve from short-term memory - check each item for relevance
-        short_term_all = self.short_term.retrieve()
+        # Retrieve from short-term memory via its incremental term index
         short_term_items = []
-        for item in short_term_all:
-            content_terms = set(item.content.lower().split())
-            if query_terms & content_terms:  # If any query term matches
-                short_term_items.append(item)
+        for item, matches in self.short_term.search_terms(query):
+            short_term_items.append(item)
+            relevance_scores[item.content] = matches / len(query_terms)
 
         # Retrieve from long-term memory - check each fact for relevance
         long_term_all = self.long_term.retrieve()
         long_term_items = []
         for item in long_term_all:
             content_terms = set(item.content.lower().split())
-            if query_terms & content_terms:  # If any query term matches
+            matches = len(query_terms & content_terms)
+            if matches:  # If any query term matches
                 long_term_items.append(item)
-
-        # Limit long-term results
-        long_term_items = long_term_items[:5]
+                relevance_scores[item.content] = matches / len(query_terms)
+                if len(long_term_items) >= 5:  # Limit long-term results
+                    break
 
         retrieval_time_ms = (time.time() - start_time) * 1000
 
-        # Calculate simple relevance scores based on query term matches
-        relevance_scores = {}
-
         all_items = short_term_items + long_term_items
-        for item in all_items:
-            content_terms = set(item.content.lower().split())
-            matches = len(query_terms & content_terms)
-            if matches > 0:
-                relevance_scores[item.content] = matches / len(query_terms)
-
         if include_trace:
             trace = RetrievalTrace(
                 query=query,
@@ -283,6 +276,68 @@ class MemoryAgent:
 
         return agent
 
+    def save_snapshot(self, path: str, delta: bool = False) -> Dict[str, Any]:
+        """Save memory state as a binary snapshot.
+
+        Args:
+            path: Path to snapshot file
+            delta: Only write changes since the previous snapshot from this agent
+
+        Returns:
+            Dictionary with snapshot statistics
+        """
+        if self._snapshot_writer is None:
+            self._snapshot_writer = SnapshotWriter()
+        config = MemoryItem(
+            content="config",
+            timestamp=datetime(1970, 1, 1),
+            metadata={"max_short_term": self.max_short_term},
+        )
+        tiers = {
+            "agent": [("config", config)],
+            "short_term": sequence_keys(self.short_term.retrieve()),
+            "long_term": self.long_term.entries(),
+        }
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            stats = self._snapshot_writer.write(tiers, f, delta=delta)
+
+        return {
+            "sequence": stats.sequence,
+            "delta": delta,
+            "records": stats.records,
+            "deletes": stats.deletes,
+            "unchanged": stats.unchanged,
+            "bytes_written": stats.bytes_written,
+        }
+
+    @classmethod
+    def load_snapshots(cls, paths: Sequence[str]) -> MemoryAgent:
+        """Load memory state from a full snapshot followed by its deltas.
+
+        Args:
+            paths: Snapshot files in the order they were written
+
+        Returns:
+            MemoryAgent instance with loaded state
+        """
+        files = [open(path, "rb") for path in paths]
+        try:
+            tiers = load_snapshots(files)
+        finally:
+            for f in files:
+                f.close()
+
+        config = tiers.get("agent", {}).get("config")
+        max_short_term = config.metadata.get("max_short_term", 10) if config else 10
+        agent = cls(max_short_term=max_short_term)
+        for item in tiers.get("short_term", {}).values():
+            agent.short_term.store(item)
+        for key, item in tiers.get("long_term", {}).items():
+            agent.long_term.store(item, key=key)
+        return agent
+
     def clear(self) -> None:
         """Clear all memory tiers."""
         self.short_term.clear()
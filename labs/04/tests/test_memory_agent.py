@@ -291,6 +291,47 @@ class TestMemoryAgent:
         finally:
             Path(temp_path).unlink(missing_ok=True)
 
+    def test_memory_snapshot_full_and_delta(self):
+        """Test binary snapshots round-trip state and deltas only carry changes."""
+        agent = MemoryAgent(max_short_term=4)
+        agent.add_conversation_turn("user", "Hello")
+        agent.add_fact("User lives in Seattle", key="location")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_path = str(Path(temp_dir) / "memory.snap")
+            delta_path = str(Path(temp_dir) / "memory.1.snap")
+            agent.save_snapshot(base_path)
+            agent.add_fact("User enjoys hiking", confidence=0.9, key="hobby")
+            stats = agent.save_snapshot(delta_path, delta=True)
+
+            loaded_agent = MemoryAgent.load_snapshots([base_path, delta_path])
+
+        assert stats["records"] == 1
+        assert loaded_agent.max_short_term == 4
+        assert loaded_agent.get_conversation_history() == agent.get_conversation_history()
+        facts = {fact.content: fact.confidence for fact in loaded_agent.get_all_facts()}
+        assert facts == {"User lives in Seattle": 1.0, "User enjoys hiking": 0.9}
+
+    def test_memory_snapshot_rejects_delta_from_other_agent(self):
+        """Test a delta is only applied on top of the full snapshot it extends."""
+        from src.agent_labs.memory import SnapshotFormatError
+
+        agent, other = MemoryAgent(), MemoryAgent()
+        agent.add_fact("User lives in Seattle", key="location")
+        other.add_fact("User lives in Oslo", key="location")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_path = str(Path(temp_dir) / "memory.snap")
+            other_path = str(Path(temp_dir) / "other.snap")
+            delta_path = str(Path(temp_dir) / "other.1.snap")
+            agent.save_snapshot(base_path)
+            other.save_snapshot(other_path)
+            other.add_fact("User enjoys hiking", key="hobby")
+            other.save_snapshot(delta_path, delta=True)
+
+            with pytest.raises(SnapshotFormatError):
+                MemoryAgent.load_snapshots([base_path, delta_path])
+
     def test_memory_persistence_json_format(self):
         """Test saved JSON format is correct."""
         agent = MemoryAgent(max_short_term=3)
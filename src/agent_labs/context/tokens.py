@@ -4,23 +4,29 @@ Token counting utilities.
 
 from __future__ import annotations
 
+from typing import List, Optional, Sequence
+
+from ..llm_providers.tokenizer import get_tokenizer
+
 
 class TokenCounter:
-    """Model-agnostic token estimation."""
+    """Token counting backed by the shared tokenizer service."""
 
     TOKENS_PER_WORD = 1.3
 
     @staticmethod
-    def count(text: str) -> int:
+    def count(text: str, model: Optional[str] = None) -> int:
         if not text:
             return 0
-        words = len(text.split())
-        special_chars = sum(1 for c in text if c in ".,!?;:'\"()[]{}")
-        return max(1, int(words * TokenCounter.TOKENS_PER_WORD + special_chars * 0.5))
+        return max(1, get_tokenizer().count(text, model=model))
+
+    @staticmethod
+    def count_batch(texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+        return get_tokenizer().count_batch(texts, model=model)
 
     @classmethod
-    def fits(cls, text: str, max_tokens: int) -> bool:
-        return cls.count(text) <= max_tokens
+    def fits(cls, text: str, max_tokens: int, model: Optional[str] = None) -> bool:
+        return cls.count(text, model) <= max_tokens
 
 
 def estimate_tokens(text: str, tokens_per_word: float = TokenCounter.TOKENS_PER_WORD) -> int:
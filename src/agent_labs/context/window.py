@@ -20,19 +20,24 @@ class ContextWindow:
     summarizer: Optional[ContextSummarizer] = None
     token_usage: int = 0
     items: List[dict] = field(default_factory=list)
+    model: Optional[str] = None
 
     def available_tokens(self) -> int:
         return max(0, self.max_tokens - self.token_usage)
 
+    def count(self, text: str) -> int:
+        return TokenCounter.count(text, self.model)
+
     def fits(self, text: str) -> bool:
-        return TokenCounter.count(text) <= self.available_tokens()
+        return self.count(text) <= self.available_tokens()
 
     async def add(self, text: str, metadata: Optional[dict] = None) -> bool:
-        tokens_needed = TokenCounter.count(text)
+        tokens_needed = self.count(text)
         available = self.available_tokens()
 
         if tokens_needed <= available:
-            self.items.append({"text": text, "metadata": metadata or {}})
+            # Items keep their count so eviction doesn't re-tokenize them.
+            self.items.append({"text": text, "metadata": metadata or {}, "tokens": tokens_needed})
             self.token_usage += tokens_needed
             return True
 
@@ -44,7 +49,7 @@ class ContextWindow:
         if self.overflow_strategy == "drop":
             if self.items:
                 old = self.items.pop(0)
-                self.token_usage -= TokenCounter.count(old["text"])
+                self.token_usage -= self._item_tokens(old)
                 return await self.add(text, metadata)
             raise TokenLimitExceededError("Cannot fit text even with oldest removed")
 
@@ -54,16 +59,29 @@ class ContextWindow:
             if self.items:
                 old = self.items.pop(0)
                 old_text = old["text"]
-                self.token_usage -= TokenCounter.count(old_text)
-                target_tokens = max(1, TokenCounter.count(old_text) // 2)
+                old_tokens = self._item_tokens(old)
+                self.token_usage -= old_tokens
+                target_tokens = max(1, old_tokens // 2)
                 summarized = await self.summarizer.summarize(old_text, max_length=target_tokens)
-                self.items.insert(0, {"text": summarized, "metadata": old["metadata"]})
-                self.token_usage += TokenCounter.count(summarized)
+                summarized_tokens = self.count(summarized)
+                self.items.insert(
+                    0,
+                    {
+                        "text": summarized,
+                        "metadata": old["metadata"],
+                        "tokens": summarized_tokens,
+                    },
+                )
+                self.token_usage += summarized_tokens
                 return await self.add(text, metadata)
             raise TokenLimitExceededError("Cannot fit text even with summarization")
 
         raise ValueError(f"Unknown overflow strategy: {self.overflow_strategy}")
 
+    def _item_tokens(self, item: dict) -> int:
+        tokens = item.get("tokens")
+        return tokens if tokens is not None else self.count(item["text"])
+
 
 class TokenLimitExceededError(RuntimeError):
     """Raised when text cannot fit into the context window."""
@@ -4,6 +4,7 @@ from .base import Metric
 from .scorers import ExactMatchScorer, SimilarityScorer, RougeScorer
 from .results import EvaluationResult
 from .runner import BenchmarkRunner, BenchmarkCase, BenchmarkResult
+from .load import LoadGenerator, LoadTestResult
 from .report import report_json, report_markdown
 from .visualization import score_distribution, comparison_chart
 
@@ -16,6 +17,8 @@ __all__ = [
     "BenchmarkRunner",
     "BenchmarkCase",
     "BenchmarkResult",
+    "LoadGenerator",
+    "LoadTestResult",
     "report_json",
     "report_markdown",
     "score_distribution",
@@ -0,0 +1,145 @@
+"""
+Load generator for the agent loop.
+
+LoadGenerator drives many concurrent ``Agent.run`` calls (closed loop: a
+fixed number of workers, each starting a new run as soon as its previous
+one finishes) and reports throughput and latency percentiles. Pair it with
+SimulatedProvider to load-test the orchestration stack without a model
+server.
+
+Example:
+    >>> provider = SimulatedProvider(capacity=8, seed=1, time_scale=0.1)
+    >>> generator = LoadGenerator(lambda: Agent(provider), concurrency=32)
+    >>> result = await generator.run(["Summarize the report"], total=500)
+    >>> print(result.to_dict())
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..stats import percentile
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class LoadTestResult:
+    """Outcome of a load test."""
+
+    runs: int
+    errors: int
+    duration_s: float
+    latencies_ms: List[float] = field(default_factory=list)
+    error_types: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Completed runs per second."""
+        return (self.runs - self.errors) / self.duration_s if self.duration_s else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.runs if self.runs else 0.0
+
+    def percentiles(self) -> Dict[str, float]:
+        """Latency percentiles (ms) of successful runs."""
+        if not self.latencies_ms:
+            return {}
+        return {f"p{pct}": percentile(self.latencies_ms, pct) for pct in PERCENTILES}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "duration_s": self.duration_s,
+            "throughput": self.throughput,
+            "latency_ms": self.percentiles(),
+            "error_types": dict(self.error_types),
+        }
+
+
+class LoadGenerator:
+    """Run an agent concurrently over a set of goals and measure it."""
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], Any],
+        concurrency: int = 10,
+        max_turns: int = 3,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """
+        Initialize LoadGenerator.
+
+        Args:
+            agent_factory: Returns the agent each worker uses (may return a shared one)
+            concurrency: Number of runs in flight at once
+            max_turns: max_turns passed to each run
+            clock: Timer (injectable for tests)
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        self.agent_factory = agent_factory
+        self.concurrency = concurrency
+        self.max_turns = max_turns
+        self._clock = clock
+
+    async def run(
+        self,
+        goals: Sequence[str],
+        total: Optional[int] = None,
+        duration_s: Optional[float] = None,
+    ) -> LoadTestResult:
+        """
+        Drive runs until ``total`` runs have started or ``duration_s`` elapsed.
+
+        Goals are used round-robin. With neither limit, each goal runs once.
+        """
+        if not goals:
+            raise ValueError("goals cannot be empty")
+        if total is None and duration_s is None:
+            total = len(goals)
+
+        latencies: List[float] = []
+        error_types: Counter = Counter()
+        started = 0
+        start = self._clock()
+
+        def next_goal() -> Optional[str]:
+            nonlocal started
+            if total is not None and started >= total:
+                return None
+            if duration_s is not None and self._clock() - start >= duration_s:
+                return None
+            goal = goals[started % len(goals)]
+            started += 1
+            return goal
+
+        async def worker() -> None:
+            agent = self.agent_factory()
+            while True:
+                goal = next_goal()
+                if goal is None:
+                    return
+                run_start = self._clock()
+                try:
+                    await agent.run(goal, max_turns=self.max_turns)
+                except Exception as exc:
+                    error_types[type(exc).__name__] += 1
+                else:
+                    latencies.append((self._clock() - run_start) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return LoadTestResult(
+            runs=started,
+            errors=sum(error_types.values()),
+            duration_s=self._clock() - start,
+            latencies_ms=latencies,
+            error_types=dict(error_types),
+        )
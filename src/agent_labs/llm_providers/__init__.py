@@ -3,16 +3,44 @@
 Exports:
 - Provider: Abstract base class for all providers
 - LLMResponse: Response dataclass
+- ChatMessage: Role/content message for Provider.generate_chat
 - MockProvider: Deterministic testing provider
+- SimulatedProvider: Load-testing provider with modeled latency, capacity and failures
 - OllamaProvider: Local model inference provider
+- OllamaSession: Ollama conversation that reuses the server's KV context
+- ProviderWrapper: Base class for providers that decorate another provider
+- CachingProvider: Exact-key response cache (memory LRU + optional SQLite)
+- SingleFlightProvider: Coalesces concurrent identical requests
+- BatchingProvider: Micro-batches concurrent requests with bounded parallelism
+- RateLimitedProvider: Token-bucket budgets plus adaptive (AIMD) concurrency
+- LoadBalancedProvider: Spreads calls over several backends with failover
+- HedgedProvider: Duplicates slow calls to a second backend (tail latency)
+- FallbackCascadeProvider: Fast model first, larger model when its answer is rejected
+- HTTPClientPool / get_http_pool: Shared keep-alive HTTP clients per server
+- Tokenizer / get_tokenizer: Cached per-model token counting
+- UsageTrackingProvider / UsageTracker: Token, cost and latency accounting with budgets
+- Deadline / deadline_scope: Time budgets that shrink timeouts of nested calls
 - Custom exceptions: Error handling for different failure modes
 """
 
-from .base import Provider, LLMResponse
+from .base import Provider, LLMResponse, Timings, ChatMessage, as_messages, render_messages
 from .mock import MockProvider
-from .ollama import OllamaProvider
+from .simulated import SimulatedProvider, LatencyModel, SimulationStats
+from .ollama import OllamaProvider, OllamaSession
 from .openai import OpenAIProvider
 from .cloud import CloudProvider
+from .wrapper import ProviderWrapper
+from .caching import CachingProvider, CacheStats
+from .coalescing import SingleFlightProvider, CoalescingStats
+from .batching import BatchingProvider, BatchRequest, BatchingStats
+from .ratelimit import RateLimitedProvider, RateLimitStats, TokenBucket, AIMDLimiter
+from .balancer import LoadBalancedProvider, CircuitBreaker, BackendStats
+from .hedging import HedgedProvider, HedgingStats
+from .cascade import FallbackCascadeProvider, CascadeStats
+from .http_pool import HTTPClientPool, PoolConfig, get_http_pool, close_http_pool
+from .tokenizer import Tokenizer, get_tokenizer
+from .usage import UsageTracker, UsageTrackingProvider, UsageRecord, UsageSummary
+from .deadline import Deadline, DeadlineExceededError, current_deadline, deadline_scope
 from .exceptions import (
     ProviderError,
     ProviderConnectionError,
@@ -28,11 +56,57 @@ __all__ = [
     # Core classes
     "Provider",
     "LLMResponse",
+    "Timings",
+    "ChatMessage",
+    "as_messages",
+    "render_messages",
     # Implementations
     "MockProvider",
+    "SimulatedProvider",
+    "LatencyModel",
+    "SimulationStats",
     "OllamaProvider",
+    "OllamaSession",
     "OpenAIProvider",
     "CloudProvider",
+    # Wrappers
+    "ProviderWrapper",
+    "CachingProvider",
+    "CacheStats",
+    "SingleFlightProvider",
+    "CoalescingStats",
+    "BatchingProvider",
+    "BatchRequest",
+    "BatchingStats",
+    "RateLimitedProvider",
+    "RateLimitStats",
+    "TokenBucket",
+    "AIMDLimiter",
+    "LoadBalancedProvider",
+    "CircuitBreaker",
+    "BackendStats",
+    "HedgedProvider",
+    "HedgingStats",
+    "FallbackCascadeProvider",
+    "CascadeStats",
+    # HTTP
+    "HTTPClientPool",
+    "PoolConfig",
+    "get_http_pool",
+    "close_http_pool",
+    # Tokens
+    "Tokenizer",
+    "get_tokenizer",
+    # Usage
+    "UsageTracker",
+    "UsageTrackingProvider",
+    "UsageRecord",
+    "UsageSummary",
+    # Deadlines
+    "Deadline",
+    "DeadlineExceededError",
+    "current_deadline",
+    "deadline_scope",
     # Exceptions
     "ProviderError",
     "ProviderConnectionError",
@@ -0,0 +1,388 @@
+"""
+Load balancing and failover across several providers.
+
+LoadBalancedProvider spreads calls over a pool of backends (e.g. one
+OllamaProvider per host) using either:
+- ``least_outstanding``: the backend with the fewest in-flight calls;
+- ``ewma``: the backend with the lowest latency EWMA, weighted by its
+  in-flight calls.
+
+Each backend has a circuit breaker. ProviderConnectionError and
+ProviderTimeoutError count as failures; after ``failure_threshold``
+consecutive failures the backend is ejected for ``reset_timeout`` seconds,
+then a single probe call decides whether it rejoins. A probe that ends
+without a verdict (cancelled, rate limited, deadline or another error)
+frees the slot for the next probe. Failed calls fail over to the next
+backend. Rate-limited backends are skipped for the call
+without tripping their breaker. Other errors (auth, bad model, ...) and
+an expired caller deadline are the caller's problem and are raised
+unchanged.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .base import Provider, LLMResponse, MessageLike
+from .deadline import DeadlineExceededError
+from .exceptions import (
+    ProviderConnectionError,
+    ProviderRateLimitError,
+    ProviderTimeoutError,
+)
+from .wrapper import model_name
+
+STRATEGIES = ("least_outstanding", "ewma")
+
+_FAILOVER_ERRORS = (ProviderConnectionError, ProviderTimeoutError, ProviderRateLimitError)
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def available(self) -> bool:
+        """Whether a call may be sent (does not reserve the half-open probe)."""
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probing)
+
+    def begin(self) -> bool:
+        """Start a call; returns True if it is the half-open probe."""
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def end_probe(self) -> None:
+        """Release a probe that ended without success or failure."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probing = False
+
+
+@dataclass
+class BackendStats:
+    """Snapshot of one backend's state."""
+
+    name: str
+    state: str
+    outstanding: int
+    ewma_ms: Optional[float]
+    requests: int
+    failures: int
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "outstanding": self.outstanding,
+            "ewma_ms": self.ewma_ms,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class _Backend:
+    def __init__(self, provider: Provider, name: str, breaker: CircuitBreaker) -> None:
+        self.provider = provider
+        self.name = name
+        self.breaker = breaker
+        self.outstanding = 0
+        self.ewma_ms: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+
+    def observe(self, latency_ms: float, alpha: float) -> None:
+        if self.ewma_ms is None:
+            self.ewma_ms = latency_ms
+        else:
+            self.ewma_ms = alpha * latency_ms + (1 - alpha) * self.ewma_ms
+
+
+class LoadBalancedProvider(Provider):
+    """
+    Distribute calls across providers with health tracking and failover.
+
+    Example:
+        >>> provider = LoadBalancedProvider(
+        ...     [OllamaProvider(base_url=url) for url in hosts],
+        ...     strategy="ewma",
+        ... )
+        >>> await provider.generate("Hello")
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Provider],
+        strategy: str = "least_outstanding",
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        ewma_alpha: float = 0.3,
+        max_attempts: Optional[int] = None,
+        health_check: Optional[Callable[[Provider], Awaitable[bool]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize LoadBalancedProvider.
+
+        Args:
+            providers: Backends to balance over
+            strategy: "least_outstanding" or "ewma"
+            failure_threshold: Consecutive failures before a backend is ejected
+            reset_timeout: Seconds an ejected backend waits before a probe call
+            ewma_alpha: Weight of the newest latency sample
+            max_attempts: Backends tried per call (default: all of them)
+            health_check: Async probe; defaults to the backend's health_check()
+            clock: Monotonic clock (injectable for tests)
+        """
+        if not providers:
+            raise ValueError("LoadBalancedProvider needs at least one provider")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {STRATEGIES}")
+        if not 0 < ewma_alpha <= 1:
+            raise ValueError("ewma_alpha must be in (0, 1]")
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.max_attempts = max_attempts or len(providers)
+        self._health_check = health_check
+        self._clock = clock
+        self._backends: List[_Backend] = []
+        for index, provider in enumerate(providers):
+            name = getattr(provider, "base_url", None)
+            name = name or f"{model_name(provider) or 'backend'}#{index}"
+            self._backends.append(
+                _Backend(provider, name, CircuitBreaker(failure_threshold, reset_timeout, clock))
+            )
+
+    @property
+    def model(self) -> Optional[str]:
+        return model_name(self._backends[0].provider)
+
+    @property
+    def providers(self) -> List[Provider]:
+        return [backend.provider for backend in self._backends]
+
+    def stats(self) -> List[BackendStats]:
+        return [
+            BackendStats(
+                name=backend.name,
+                state=backend.breaker.state,
+                outstanding=backend.outstanding,
+                ewma_ms=backend.ewma_ms,
+                requests=backend.requests,
+                failures=backend.failures,
+            )
+            for backend in self._backends
+        ]
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        return await self._call(
+            lambda p: p.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+        )
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        return await self._call(
+            lambda p: p.generate_chat(
+                messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stable_prefix=stable_prefix,
+            )
+        )
+
+    async def _call(self, call: Callable[[Provider], Awaitable[LLMResponse]]) -> LLMResponse:
+        tried: List[_Backend] = []
+        last_error: Optional[Exception] = None
+        while len(tried) < self.max_attempts:
+            backend = self._pick(tried)
+            if backend is None:
+                break
+            tried.append(backend)
+            start, probe = self._begin(backend)
+            try:
+                response = await call(backend.provider)
+            except DeadlineExceededError:
+                backend.outstanding -= 1
+                raise
+            except _FAILOVER_ERRORS as exc:
+                self._fail(backend, exc)
+                last_error = exc
+                continue
+            except BaseException:
+                backend.outstanding -= 1
+                raise
+            finally:
+                if probe:
+                    backend.breaker.end_probe()
+            self._succeed(backend, start)
+            return response
+        raise self._exhausted(last_error)
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        tried: List[_Backend] = []
+        last_error: Optional[Exception] = None
+        while len(tried) < self.max_attempts:
+            backend = self._pick(tried)
+            if backend is None:
+                break
+            tried.append(backend)
+            start, probe = self._begin(backend)
+            started = False
+            try:
+                async for chunk in backend.provider.stream(prompt, max_tokens=max_tokens):
+                    started = True
+                    yield chunk
+            except DeadlineExceededError:
+                backend.outstanding -= 1
+                raise
+            except _FAILOVER_ERRORS as exc:
+                self._fail(backend, exc)
+                if started:
+                    # Chunks already reached the caller; a new backend would repeat them.
+                    raise
+                last_error = exc
+                continue
+            except BaseException:
+                backend.outstanding -= 1
+                raise
+            finally:
+                if probe:
+                    backend.breaker.end_probe()
+            self._succeed(backend, start)
+            return
+        raise self._exhausted(last_error)
+
+    async def count_tokens(self, text: str) -> int:
+        return await self._backends[0].provider.count_tokens(text)
+
+    async def check_health(self) -> Dict[str, bool]:
+        """Probe every backend; unhealthy ones are ejected, healthy ones restored."""
+        results = await asyncio.gather(
+            *(self._probe(backend) for backend in self._backends)
+        )
+        health = {}
+        for backend, healthy in zip(self._backends, results):
+            if healthy:
+                backend.breaker.record_success()
+            else:
+                backend.breaker.trip()
+            health[backend.name] = healthy
+        return health
+
+    async def close(self):
+        for backend in self._backends:
+            close = getattr(backend.provider, "close", None)
+            if close is not None:
+                await close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __repr__(self) -> str:
+        names = [backend.name for backend in self._backends]
+        return f"LoadBalancedProvider({names!r}, strategy={self.strategy!r})"
+
+    def _pick(self, exclude: List[_Backend]) -> Optional[_Backend]:
+        candidates = [
+            backend
+            for backend in self._backends
+            if backend not in exclude and backend.breaker.available()
+        ]
+        if not candidates:
+            return None
+        if self.strategy == "ewma":
+            # Unmeasured backends score 0 so they get sampled first.
+            return min(candidates, key=lambda b: (b.ewma_ms or 0.0) * (b.outstanding + 1))
+        return min(candidates, key=lambda b: b.outstanding)
+
+    def _begin(self, backend: _Backend) -> Tuple[float, bool]:
+        probe = backend.breaker.begin()
+        backend.outstanding += 1
+        backend.requests += 1
+        return self._clock(), probe
+
+    def _succeed(self, backend: _Backend, start: float) -> None:
+        backend.outstanding -= 1
+        backend.observe((self._clock() - start) * 1000, self.ewma_alpha)
+        backend.breaker.record_success()
+
+    def _fail(self, backend: _Backend, exc: Exception) -> None:
+        backend.outstanding -= 1
+        backend.failures += 1
+        if not isinstance(exc, ProviderRateLimitError):
+            backend.breaker.record_failure()
+
+    def _exhausted(self, last_error: Optional[Exception]) -> Exception:
+        if last_error is not None:
+            return last_error
+        return ProviderConnectionError("No healthy backends available")
+
+    async def _probe(self, backend: _Backend) -> bool:
+        try:
+            if self._health_check is not None:
+                return bool(await self._health_check(backend.provider))
+            check = getattr(backend.provider, "health_check", None)
+            if check is not None:
+                return bool(await check())
+            await backend.provider.generate("ping", max_tokens=1, temperature=0.0)
+            return True
+        except Exception:
+            return False
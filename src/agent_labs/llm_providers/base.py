@@ -10,8 +10,45 @@ All implementations must support:
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import AsyncIterator, Optional
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Union
+
+
+@dataclass
+class Timings:
+    """Where the time of one call went, in milliseconds (None = unknown)."""
+
+    latency_ms: Optional[float] = None
+    """Client-side wall time of the call."""
+
+    ttft_ms: Optional[float] = None
+    """Time to first token."""
+
+    queue_ms: Optional[float] = None
+    """Time spent waiting in client-side queues (rate limiting)."""
+
+    load_ms: Optional[float] = None
+    """Server time spent loading the model."""
+
+    prompt_eval_ms: Optional[float] = None
+    """Server time spent evaluating the prompt."""
+
+    eval_ms: Optional[float] = None
+    """Server time spent generating the completion."""
+
+    server_ms: Optional[float] = None
+    """Total server-side time."""
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "latency_ms": self.latency_ms,
+            "ttft_ms": self.ttft_ms,
+            "queue_ms": self.queue_ms,
+            "load_ms": self.load_ms,
+            "prompt_eval_ms": self.prompt_eval_ms,
+            "eval_ms": self.eval_ms,
+            "server_ms": self.server_ms,
+        }
 
 
 @dataclass
@@ -27,6 +64,54 @@ class LLMResponse:
     model: str
     """Model used for generation."""
 
+    prompt_tokens: Optional[int] = None
+    """Tokens in the prompt, when the provider reports them."""
+
+    completion_tokens: Optional[int] = None
+    """Tokens in the completion, when the provider reports them."""
+
+    timings: Timings = field(default_factory=Timings)
+    """Latency breakdown (filled in by providers and wrappers)."""
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus completion tokens, falling back to ``tokens_used``."""
+        if self.prompt_tokens is None and self.completion_tokens is None:
+            return self.tokens_used
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+
+
+@dataclass(frozen=True)
+class ChatMessage:
+    """One message of a chat conversation."""
+
+    role: str
+    """"system", "user" or "assistant"."""
+
+    content: str
+    """Message text."""
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+
+MessageLike = Union[ChatMessage, Dict[str, str]]
+
+
+def as_messages(messages: Sequence[MessageLike]) -> List[ChatMessage]:
+    """Normalize ChatMessage objects or {"role", "content"} dicts to ChatMessages."""
+    return [
+        message
+        if isinstance(message, ChatMessage)
+        else ChatMessage(message["role"], message["content"])
+        for message in messages
+    ]
+
+
+def render_messages(messages: Sequence[MessageLike]) -> str:
+    """Flatten a conversation into a single prompt string."""
+    return "\n\n".join(f"{m.role}: {m.content}" for m in as_messages(messages))
+
 
 class Provider(ABC):
     """Abstract base class for LLM providers."""
@@ -96,3 +181,40 @@ class Provider(ABC):
             >>> print(tokens)  # Output: 4
         """
         pass
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        """
+        Generate a reply to a list of chat messages.
+
+        ``stable_prefix`` is the number of leading messages that are
+        unchanged since the previous call in the same conversation (the
+        caller only appended). Backends with KV-cache or prompt-prefix
+        reuse can then skip re-processing them; others ignore it.
+
+        The default flattens the messages with render_messages() and calls
+        generate(); providers with a native chat endpoint override this.
+
+        Args:
+            messages: Conversation as ChatMessage objects or role/content dicts
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            stable_prefix: Leading messages unchanged since the last call
+
+        Returns:
+            LLMResponse with the assistant reply
+
+        Example:
+            >>> response = await provider.generate_chat([
+            ...     {"role": "system", "content": "You are terse."},
+            ...     {"role": "user", "content": "Hello"},
+            ... ])
+        """
+        return await self.generate(
+            render_messages(messages), max_tokens=max_tokens, temperature=temperature
+        )
@@ -0,0 +1,238 @@
+"""
+Client-side micro-batching for providers.
+
+BatchingProvider collects concurrent ``generate`` calls for up to
+``max_wait_ms`` (or until ``max_batch_size`` requests are queued) and
+dispatches them together:
+- if the wrapped provider implements ``generate_batch(requests)``, the
+  whole batch goes out as one upstream call;
+- otherwise the batch's requests run concurrently.
+
+Either way, at most ``max_parallel`` upstream calls are in flight, which
+should match the inference server's capacity (e.g. Ollama's
+OLLAMA_NUM_PARALLEL) so the server stays saturated but not overloaded.
+"""
+
+import asyncio
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set
+
+from .base import Provider, LLMResponse, MessageLike
+from .exceptions import ProviderError
+from .wrapper import ProviderWrapper
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    """One generate request inside a batch."""
+
+    prompt: str
+    max_tokens: int = 1000
+    temperature: float = 0.7
+
+
+@dataclass
+class BatchingStats:
+    """Counters for BatchingProvider."""
+
+    requests: int = 0
+    batches: int = 0
+    upstream_calls: int = 0
+    max_in_flight: int = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "upstream_calls": self.upstream_calls,
+            "max_in_flight": self.max_in_flight,
+            "avg_batch_size": self.avg_batch_size,
+        }
+
+
+class _Pending:
+    __slots__ = ("request", "future")
+
+    def __init__(self, request: BatchRequest, future: "asyncio.Future[LLMResponse]") -> None:
+        self.request = request
+        self.future = future
+
+
+class BatchingProvider(ProviderWrapper):
+    """
+    Micro-batch concurrent requests with bounded upstream parallelism.
+
+    Example:
+        >>> provider = BatchingProvider(OllamaProvider(), max_batch_size=8, max_parallel=4)
+        >>> await asyncio.gather(*(provider.generate(p) for p in prompts))
+    """
+
+    def __init__(
+        self,
+        provider: Provider,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_parallel: Optional[int] = None,
+    ):
+        """
+        Initialize BatchingProvider.
+
+        Args:
+            provider: Provider to wrap
+            max_batch_size: Flush a batch once this many requests are queued
+            max_wait_ms: Longest time a request waits for its batch to fill
+            max_parallel: Upstream calls allowed in flight (default: max_batch_size)
+        """
+        super().__init__(provider)
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+        if max_parallel is not None and max_parallel <= 0:
+            raise ValueError("max_parallel must be positive")
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_parallel = max_parallel or max_batch_size
+        self._pending: List[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._dispatches: Set[asyncio.Task] = set()
+        self._stats = BatchingStats()
+
+    def stats(self) -> BatchingStats:
+        return replace(self._stats)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[LLMResponse]" = loop.create_future()
+        self._pending.append(_Pending(BatchRequest(prompt, max_tokens, temperature), future))
+        self._stats.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        # Chat calls are not batched but still count against upstream capacity.
+        async with self._slot():
+            return await super().generate_chat(messages, max_tokens, temperature, stable_prefix)
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        # Streams are not batched but still count against upstream capacity.
+        async with self._slot():
+            async for chunk in self.provider.stream(prompt, max_tokens=max_tokens):
+                yield chunk
+
+    async def flush(self) -> None:
+        """Dispatch queued requests now and wait for all batches to finish."""
+        self._flush()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            self._stats.batches += 1
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[_Pending]) -> None:
+        batch = [item for item in batch if not item.future.done()]
+        if not batch:
+            return
+        generate_batch = getattr(self.provider, "generate_batch", None)
+        if generate_batch is not None:
+            await self._run_batch(generate_batch, batch)
+        else:
+            await asyncio.gather(*(self._run_one(item) for item in batch))
+
+    async def _run_batch(self, generate_batch, batch: List[_Pending]) -> None:
+        try:
+            async with self._slot():
+                responses = await generate_batch([item.request for item in batch])
+        except Exception as exc:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+        responses = list(responses)
+        if len(responses) != len(batch):
+            # Fail every caller rather than leaving unmatched ones waiting.
+            error = ProviderError(
+                f"generate_batch returned {len(responses)} responses for {len(batch)} requests"
+            )
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(error)
+            return
+        for item, response in zip(batch, responses):
+            if not item.future.done():
+                item.future.set_result(response)
+
+    async def _run_one(self, item: _Pending) -> None:
+        request = item.request
+        try:
+            async with self._slot():
+                if item.future.done():  # caller gave up while queued for a slot
+                    return
+                response = await self.provider.generate(
+                    request.prompt,
+                    max_tokens=request.max_tokens,
+                    temperature=request.temperature,
+                )
+        except Exception as exc:
+            if not item.future.done():
+                item.future.set_exception(exc)
+            return
+        if not item.future.done():
+            item.future.set_result(response)
+
+    def _slot(self) -> "_Slot":
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_parallel)
+        return _Slot(self)
+
+
+class _Slot:
+    """Async context manager holding one upstream capacity slot."""
+
+    def __init__(self, owner: BatchingProvider) -> None:
+        self._owner = owner
+
+    async def __aenter__(self) -> None:
+        owner = self._owner
+        await owner._slots.acquire()
+        owner._in_flight += 1
+        owner._stats.upstream_calls += 1
+        owner._stats.max_in_flight = max(owner._stats.max_in_flight, owner._in_flight)
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._owner._in_flight -= 1
+        self._owner._slots.release()
@@ -0,0 +1,324 @@
+"""
+Response cache for providers.
+
+CachingProvider memoizes ``generate`` results keyed on an exact hash of
+(model, prompt, max_tokens, temperature), with an in-memory LRU tier and an
+optional SQLite tier. Streams are cached as their chunk sequence and replayed
+through ``stream()`` on a hit.
+
+Caching is exact-match only (no semantic similarity). Only deterministic
+calls (temperature 0) are cached by default; raise ``max_temperature``, or
+set it to None, to also cache and replay sampled calls. Streams run at the
+backend's default temperature, so they are only cached with None.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from .base import Provider, LLMResponse, MessageLike, Timings, as_messages
+from .wrapper import ProviderWrapper
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a CachingProvider."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    bypassed: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+@dataclass
+class _CacheEntry:
+    response: LLMResponse
+    chunks: Optional[List[str]] = None
+    expires_at: Optional[float] = None
+    created_at: float = field(default_factory=time.time)
+
+    def expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+    def to_json(self) -> str:
+        return json.dumps({"response": asdict(self.response), "chunks": self.chunks})
+
+    @classmethod
+    def from_json(cls, data: str, expires_at: Optional[float]) -> "_CacheEntry":
+        payload = json.loads(data)
+        response = dict(payload["response"])
+        if response.get("timings") is not None:
+            response["timings"] = Timings(**response["timings"])
+        return cls(
+            response=LLMResponse(**response),
+            chunks=payload.get("chunks"),
+            expires_at=expires_at,
+        )
+
+
+class _SqliteCacheTier:
+    """Disk tier storing JSON-encoded entries in SQLite."""
+
+    def __init__(self, path: str, max_entries: Optional[int]) -> None:
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS provider_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        return self._conn.execute(
+            "SELECT value, expires_at FROM provider_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+    def put(self, key: str, entry: _CacheEntry) -> int:
+        """Store an entry; returns how many old entries were evicted."""
+        self._conn.execute(
+            """
+            INSERT INTO provider_cache (key, value, expires_at, created_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = excluded.value,
+                expires_at = excluded.expires_at,
+                created_at = excluded.created_at
+            """,
+            (key, entry.to_json(), entry.expires_at, entry.created_at),
+        )
+        evicted = 0
+        if self.max_entries is not None:
+            cursor = self._conn.execute(
+                """
+                DELETE FROM provider_cache WHERE key IN (
+                    SELECT key FROM provider_cache
+                    ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            evicted = max(0, cursor.rowcount)
+        self._conn.commit()
+        return evicted
+
+    def delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM provider_cache WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM provider_cache")
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachingProvider(ProviderWrapper):
+    """
+    Cache provider responses by exact request key.
+
+    Example:
+        >>> provider = CachingProvider(OllamaProvider(), max_entries=512, ttl_seconds=3600)
+        >>> await provider.generate("Summarize ...", temperature=0.0)  # upstream call
+        >>> await provider.generate("Summarize ...", temperature=0.0)  # cache hit
+        >>> provider.stats().hit_rate
+        0.5
+    """
+
+    def __init__(
+        self,
+        provider: Provider,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        max_disk_entries: Optional[int] = None,
+        max_temperature: Optional[float] = 0.0,
+    ):
+        """
+        Initialize CachingProvider.
+
+        Args:
+            provider: Provider to wrap
+            max_entries: In-memory LRU capacity
+            ttl_seconds: Entry lifetime (None = never expire)
+            disk_path: Optional SQLite path for a persistent second tier
+            max_disk_entries: Optional size limit for the SQLite tier
+            max_temperature: Only cache calls at or below this temperature
+                (None = cache every call, including streams)
+        """
+        super().__init__(provider)
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_temperature = max_temperature
+        self._memory: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._disk = _SqliteCacheTier(disk_path, max_disk_entries) if disk_path else None
+        self._stats = CacheStats()
+
+    def cache_key(
+        self, prompt: str, max_tokens: int, temperature: Optional[float], kind: str = "generate"
+    ) -> str:
+        """Exact-match key for a request."""
+        payload = json.dumps(
+            [kind, self.model, prompt, max_tokens, temperature],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def stats(self) -> CacheStats:
+        return replace(self._stats)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._disk:
+            self._disk.clear()
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        if not self._cacheable(temperature):
+            self._stats.bypassed += 1
+            return await self.provider.generate(
+                prompt, max_tokens=max_tokens, temperature=temperature
+            )
+
+        key = self.cache_key(prompt, max_tokens, temperature)
+        entry = self._lookup(key)
+        if entry is not None:
+            return replace(entry.response)
+
+        response = await self.provider.generate(
+            prompt, max_tokens=max_tokens, temperature=temperature
+        )
+        self._store(key, _CacheEntry(response=replace(response), expires_at=self._expiry()))
+        return response
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        if not self._cacheable(temperature):
+            self._stats.bypassed += 1
+            return await super().generate_chat(messages, max_tokens, temperature, stable_prefix)
+
+        conversation = json.dumps([m.to_dict() for m in as_messages(messages)], ensure_ascii=False)
+        key = self.cache_key(conversation, max_tokens, temperature, kind="chat")
+        entry = self._lookup(key)
+        if entry is not None:
+            return replace(entry.response)
+
+        response = await super().generate_chat(messages, max_tokens, temperature, stable_prefix)
+        self._store(key, _CacheEntry(response=replace(response), expires_at=self._expiry()))
+        return response
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        if self.max_temperature is not None:
+            self._stats.bypassed += 1
+            async for chunk in self.provider.stream(prompt, max_tokens=max_tokens):
+                yield chunk
+            return
+
+        key = self.cache_key(prompt, max_tokens, None, kind="stream")
+        entry = self._lookup(key)
+        if entry is not None:
+            for chunk in entry.chunks or [entry.response.text]:
+                yield chunk
+            return
+
+        chunks: List[str] = []
+        async for chunk in self.provider.stream(prompt, max_tokens=max_tokens):
+            chunks.append(chunk)
+            yield chunk
+        # Only completed streams are cached; an aborted consumer never reaches here.
+        response = LLMResponse(text="".join(chunks), tokens_used=0, model=self.model or "")
+        self._store(key, _CacheEntry(response=response, chunks=chunks, expires_at=self._expiry()))
+
+    async def close(self):
+        if self._disk:
+            self._disk.close()
+            self._disk = None
+        await super().close()
+
+    def _cacheable(self, temperature: float) -> bool:
+        return self.max_temperature is None or temperature <= self.max_temperature
+
+    def _expiry(self) -> Optional[float]:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    def _lookup(self, key: str) -> Optional[_CacheEntry]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry.expired(now):
+                del self._memory[key]
+                self._stats.expirations += 1
+            else:
+                self._memory.move_to_end(key)
+                self._stats.hits += 1
+                self._stats.memory_hits += 1
+                return entry
+
+        if self._disk is not None:
+            row = self._disk.get(key)
+            if row is not None:
+                value, expires_at = row
+                if expires_at is not None and now >= expires_at:
+                    self._disk.delete(key)
+                    self._stats.expirations += 1
+                else:
+                    entry = _CacheEntry.from_json(value, expires_at)
+                    self._remember(key, entry)
+                    self._stats.hits += 1
+                    self._stats.disk_hits += 1
+                    return entry
+
+        self._stats.misses += 1
+        return None
+
+    def _store(self, key: str, entry: _CacheEntry) -> None:
+        self._remember(key, entry)
+        if self._disk is not None:
+            self._stats.evictions += self._disk.put(key, entry)
+
+    def _remember(self, key: str, entry: _CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats.evictions += 1
@@ -0,0 +1,236 @@
+"""
+Fast-model-first provider cascades.
+
+FallbackCascadeProvider combines tiers ordered from cheapest/fastest to
+most capable. A cheap tier's answer is used when the ``accept`` predicate
+approves it; otherwise the answer of the next tier is used. The last tier
+is the fallback and its answer is always accepted.
+
+Modes:
+- ``race``: all tiers start together (later tiers optionally after
+  ``stagger_ms``); the first accepted answer wins and the other calls are
+  cancelled. Lowest latency, highest cost.
+- ``cascade``: tiers run one after another, each only if the previous
+  answer was rejected or failed. Lowest cost.
+"""
+
+import asyncio
+import inspect
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Union
+
+from .base import Provider, LLMResponse, MessageLike
+from .wrapper import model_name
+
+MODES = ("race", "cascade")
+
+AcceptPredicate = Callable[[LLMResponse], Union[bool, Awaitable[bool]]]
+
+
+def non_empty(response: LLMResponse) -> bool:
+    """Default acceptance: the answer has some text."""
+    return bool(response.text.strip())
+
+
+@dataclass
+class CascadeStats:
+    """Per-tier counters for FallbackCascadeProvider."""
+
+    requests: int = 0
+    wins: List[int] = field(default_factory=list)
+    rejected: List[int] = field(default_factory=list)
+    errors: List[int] = field(default_factory=list)
+    cancelled: int = 0
+
+    def win_rates(self) -> List[float]:
+        return [wins / self.requests if self.requests else 0.0 for wins in self.wins]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "requests": self.requests,
+            "wins": list(self.wins),
+            "win_rates": self.win_rates(),
+            "rejected": list(self.rejected),
+            "errors": list(self.errors),
+            "cancelled": self.cancelled,
+        }
+
+
+class FallbackCascadeProvider(Provider):
+    """
+    Use a fast model's answer when it is good enough, else a larger model's.
+
+    Example:
+        >>> provider = FallbackCascadeProvider(
+        ...     [OllamaProvider(model="llama3.2:1b"), OllamaProvider(model="llama3.1:70b")],
+        ...     accept=lambda r: "I don't know" not in r.text,
+        ... )
+        >>> await provider.generate("Plan the next step")
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[Provider],
+        accept: AcceptPredicate = non_empty,
+        mode: str = "race",
+        stagger_ms: float = 0.0,
+    ):
+        """
+        Initialize FallbackCascadeProvider.
+
+        Args:
+            tiers: Providers from fastest/cheapest to most capable
+            accept: Sync or async predicate deciding whether a non-final tier's answer is used
+            mode: "race" (run tiers concurrently) or "cascade" (one after another)
+            stagger_ms: In race mode, delay before starting each later tier
+        """
+        if not tiers:
+            raise ValueError("FallbackCascadeProvider needs at least one tier")
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self._tiers = list(tiers)
+        self.accept = accept
+        self.mode = mode
+        self.stagger_ms = stagger_ms
+        count = len(self._tiers)
+        self._stats = CascadeStats(wins=[0] * count, rejected=[0] * count, errors=[0] * count)
+
+    @property
+    def model(self) -> Optional[str]:
+        return model_name(self._tiers[-1])
+
+    @property
+    def tiers(self) -> List[Provider]:
+        return list(self._tiers)
+
+    def stats(self) -> CascadeStats:
+        stats = self._stats
+        return CascadeStats(
+            requests=stats.requests,
+            wins=list(stats.wins),
+            rejected=list(stats.rejected),
+            errors=list(stats.errors),
+            cancelled=stats.cancelled,
+        )
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        return await self._call(
+            lambda p: p.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+        )
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        return await self._call(
+            lambda p: p.generate_chat(
+                messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stable_prefix=stable_prefix,
+            )
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        # A streamed answer can't be judged before it is shown, so streams
+        # go to the most capable tier.
+        async for chunk in self._tiers[-1].stream(prompt, max_tokens=max_tokens):
+            yield chunk
+
+    async def count_tokens(self, text: str) -> int:
+        return await self._tiers[-1].count_tokens(text)
+
+    async def close(self):
+        for provider in self._tiers:
+            close = getattr(provider, "close", None)
+            if close is not None:
+                await close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _call(self, call: Callable[[Provider], Awaitable[LLMResponse]]) -> LLMResponse:
+        self._stats.requests += 1
+        if self.mode == "cascade":
+            return await self._cascade(call)
+        return await self._race(call)
+
+    async def _cascade(self, call: Callable[[Provider], Awaitable[LLMResponse]]) -> LLMResponse:
+        error: Optional[Exception] = None
+        for index, provider in enumerate(self._tiers):
+            try:
+                response = await call(provider)
+            except Exception as exc:
+                self._stats.errors[index] += 1
+                error = error or exc
+                continue
+            if await self._accepted(index, response):
+                self._stats.wins[index] += 1
+                return response
+        raise error  # only reached when the final tier failed
+
+    async def _race(self, call: Callable[[Provider], Awaitable[LLMResponse]]) -> LLMResponse:
+        tasks: Dict[asyncio.Future, int] = {
+            asyncio.ensure_future(self._staggered(index, call)): index
+            for index in range(len(self._tiers))
+        }
+        pending: Set[asyncio.Future] = set(tasks)
+        # The final tier's answer, used unless a cheaper tier finishing in
+        # the same tick is accepted.
+        fallback: Optional[LLMResponse] = None
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=tasks.__getitem__):
+                    index = tasks[task]
+                    if task.exception() is not None:
+                        self._stats.errors[index] += 1
+                        error = error or task.exception()
+                        continue
+                    response = task.result()
+                    if index == len(self._tiers) - 1:
+                        fallback = response
+                    elif await self._accepted(index, response):
+                        self._stats.wins[index] += 1
+                        return response
+                if fallback is not None:
+                    self._stats.wins[-1] += 1
+                    return fallback
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            self._stats.cancelled += len(pending)
+
+    async def _staggered(
+        self, index: int, call: Callable[[Provider], Awaitable[LLMResponse]]
+    ) -> LLMResponse:
+        if index and self.stagger_ms > 0:
+            await asyncio.sleep(index * self.stagger_ms / 1000)
+        return await call(self._tiers[index])
+
+    async def _accepted(self, index: int, response: LLMResponse) -> bool:
+        if index == len(self._tiers) - 1:
+            return True
+        verdict = self.accept(response)
+        if inspect.isawaitable(verdict):
+            verdict = await verdict
+        if not verdict:
+            self._stats.rejected[index] += 1
+        return bool(verdict)
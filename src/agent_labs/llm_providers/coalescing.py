@@ -0,0 +1,201 @@
+"""
+Request coalescing (single-flight) for providers.
+
+SingleFlightProvider deduplicates concurrent identical requests: the first
+caller starts the upstream call and later callers with the same arguments
+wait on it instead of issuing their own. Streams are fanned out, so every
+subscriber receives the full chunk sequence (late joiners replay the chunks
+already received, then follow live).
+
+The upstream call runs in its own task; it is cancelled only when every
+waiter has gone away.
+"""
+
+import asyncio
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .base import Provider, LLMResponse, MessageLike, as_messages
+from .wrapper import ProviderWrapper
+
+
+@dataclass
+class CoalescingStats:
+    """Counters for SingleFlightProvider."""
+
+    requests: int = 0
+    upstream_calls: int = 0
+    coalesced: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+        }
+
+
+class _Flight:
+    """An in-flight generate call shared by several waiters."""
+
+    def __init__(self, task: "asyncio.Task[LLMResponse]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamFlight:
+    """An in-flight stream whose chunks are buffered for all subscribers."""
+
+    def __init__(self) -> None:
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class SingleFlightProvider(ProviderWrapper):
+    """
+    Deduplicate concurrent identical provider calls.
+
+    Example:
+        >>> provider = SingleFlightProvider(OllamaProvider())
+        >>> results = await asyncio.gather(*(provider.generate("Same prompt") for _ in range(10)))
+        >>> provider.stats().upstream_calls
+        1
+    """
+
+    def __init__(self, provider: Provider):
+        super().__init__(provider)
+        self._inflight: Dict[Tuple, _Flight] = {}
+        self._streams: Dict[Tuple, _StreamFlight] = {}
+        self._stats = CoalescingStats()
+
+    def stats(self) -> CoalescingStats:
+        return replace(self._stats)
+
+    @property
+    def inflight(self) -> int:
+        """Number of distinct upstream calls currently running."""
+        return len(self._inflight) + len(self._streams)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        return await self._coalesce(
+            (prompt, max_tokens, temperature),
+            lambda: self.provider.generate(prompt, max_tokens=max_tokens, temperature=temperature),
+        )
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        conversation = tuple((m.role, m.content) for m in as_messages(messages))
+        return await self._coalesce(
+            ("chat", conversation, max_tokens, temperature),
+            lambda: self.provider.generate_chat(
+                messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stable_prefix=stable_prefix,
+            ),
+        )
+
+    async def _coalesce(
+        self, key: Tuple, call: Callable[[], Awaitable[LLMResponse]]
+    ) -> LLMResponse:
+        self._stats.requests += 1
+        flight = self._inflight.get(key)
+        if flight is None:
+            self._stats.upstream_calls += 1
+            task = asyncio.ensure_future(call())
+            flight = _Flight(task)
+            self._inflight[key] = flight
+            task.add_done_callback(lambda _, key=key, flight=flight: self._finish(key, flight))
+        else:
+            self._stats.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            response = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.task.cancelled():
+                raise
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                flight.task.cancel()
+            raise
+        flight.waiters -= 1
+        # Each waiter gets its own copy so callers can't mutate a shared response.
+        return replace(response)
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        key = (prompt, max_tokens)
+        self._stats.requests += 1
+        flight = self._streams.get(key)
+        if flight is None:
+            self._stats.upstream_calls += 1
+            flight = _StreamFlight()
+            self._streams[key] = flight
+            flight.task = asyncio.ensure_future(self._pump(key, flight, prompt, max_tokens))
+        else:
+            self._stats.coalesced += 1
+
+        flight.subscribers += 1
+        index = 0
+        try:
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(
+                        lambda: index < len(flight.chunks) or flight.done
+                    )
+                    pending = flight.chunks[index:]
+                    finished = flight.done
+                for chunk in pending:
+                    yield chunk
+                index += len(pending)
+                if finished and index >= len(flight.chunks):
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done and flight.task is not None:
+                flight.task.cancel()
+
+    def _finish(self, key: Tuple, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            # Mark the exception retrieved when nobody is left to observe it.
+            flight.task.exception()
+
+    async def _pump(self, key: Tuple, flight: _StreamFlight, prompt: str, max_tokens: int) -> None:
+        try:
+            async for chunk in self.provider.stream(prompt, max_tokens=max_tokens):
+                async with flight.changed:
+                    flight.chunks.append(chunk)
+                    flight.changed.notify_all()
+        except asyncio.CancelledError:
+            flight.error = asyncio.CancelledError()
+            raise
+        except Exception as exc:
+            flight.error = exc
+        finally:
+            if self._streams.get(key) is flight:
+                del self._streams[key]
+            flight.done = True
+            async with flight.changed:
+                flight.changed.notify_all()
@@ -0,0 +1,100 @@
+"""
+Deadlines that flow through provider and tool calls.
+
+A Deadline is installed for a block of code with ``deadline_scope`` and is
+visible to everything awaited inside it (including tasks it starts) via
+``current_deadline()``. Providers and tools use it to shrink per-attempt
+timeouts, skip retries that cannot finish in time and fail fast with
+DeadlineExceededError once the budget is gone. Nested scopes can only
+tighten the deadline.
+
+Example:
+    >>> with deadline_scope(30):
+    ...     await agent.run(goal)  # every call inside shares the 30s budget
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from .exceptions import ProviderTimeoutError
+
+
+class DeadlineExceededError(ProviderTimeoutError):
+    """Raised when a call's deadline has passed (or would pass before it can finish)."""
+
+    pass
+
+
+class Deadline:
+    """An absolute point in time by which work must finish."""
+
+    def __init__(
+        self,
+        seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize Deadline.
+
+        Args:
+            seconds: Budget from now
+            clock: Monotonic clock (injectable for tests)
+        """
+        self._clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)."""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, default: float) -> float:
+        """``default`` shrunk to the time left."""
+        return min(default, self.remaining())
+
+    def check(self, what: str = "call") -> None:
+        """Raise DeadlineExceededError if the deadline has passed."""
+        if self.expired:
+            raise DeadlineExceededError(f"Deadline exceeded before {what}")
+
+    def allows(self, seconds: float) -> bool:
+        """Whether ``seconds`` more still fit before the deadline."""
+        return seconds < self.remaining()
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+_CURRENT: ContextVar[Optional[Deadline]] = ContextVar("agent_labs_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The innermost active deadline, if any."""
+    return _CURRENT.get()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Run a block under a deadline ``seconds`` from now.
+
+    ``None`` or a value <= 0 adds no deadline (an outer one still applies).
+    An outer deadline that expires sooner is kept.
+    """
+    outer = _CURRENT.get()
+    if seconds is None or seconds <= 0:
+        yield outer
+        return
+    deadline = Deadline(seconds)
+    if outer is not None and outer.expires_at <= deadline.expires_at:
+        deadline = outer
+    token = _CURRENT.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _CURRENT.reset(token)
@@ -0,0 +1,210 @@
+"""
+Hedged requests for tail-latency reduction.
+
+HedgedProvider sends each ``generate`` call to one backend. If no answer
+arrives within the hedge delay, it sends a duplicate to another backend,
+returns whichever answer comes first and cancels the other call.
+
+The hedge delay is a percentile (p95 by default) of recent latencies, so
+only the slowest few percent of calls are duplicated. ``max_hedge_ratio``
+is a hard cap on the extra load: at most that fraction of requests may
+be hedged.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Set
+
+from ..stats import percentile
+from .base import Provider, LLMResponse, MessageLike
+from .wrapper import model_name
+
+
+@dataclass
+class HedgingStats:
+    """Counters for HedgedProvider."""
+
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    budget_denied: int = 0
+
+    @property
+    def hedge_ratio(self) -> float:
+        return self.hedges / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "hedge_ratio": self.hedge_ratio,
+        }
+
+
+class HedgedProvider(Provider):
+    """
+    Duplicate slow calls to a second backend and keep the first answer.
+
+    Example:
+        >>> provider = HedgedProvider(
+        ...     [OllamaProvider(base_url=url) for url in hosts],
+        ...     hedge_percentile=95,
+        ...     max_hedge_ratio=0.05,
+        ... )
+        >>> await provider.generate("Hello")
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Provider],
+        hedge_percentile: float = 95.0,
+        initial_delay_ms: float = 1000.0,
+        min_delay_ms: float = 0.0,
+        max_hedge_ratio: float = 0.1,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        """
+        Initialize HedgedProvider.
+
+        Args:
+            providers: Backends (one is enough; hedges then go to the same backend)
+            hedge_percentile: Latency percentile used as the hedge delay
+            initial_delay_ms: Hedge delay until ``min_samples`` latencies are known
+            min_delay_ms: Lower bound on the hedge delay
+            max_hedge_ratio: Maximum fraction of requests that may be hedged
+            window: Number of recent latencies kept
+            min_samples: Samples needed before the percentile is trusted
+        """
+        if not providers:
+            raise ValueError("HedgedProvider needs at least one provider")
+        if not 0 < hedge_percentile <= 100:
+            raise ValueError("hedge_percentile must be in (0, 100]")
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError("max_hedge_ratio must be in [0, 1]")
+        self._providers = list(providers)
+        self.hedge_percentile = hedge_percentile
+        self.initial_delay_ms = initial_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._next = 0
+        self._stats = HedgingStats()
+
+    @property
+    def model(self) -> Optional[str]:
+        return model_name(self._providers[0])
+
+    @property
+    def providers(self) -> List[Provider]:
+        return list(self._providers)
+
+    def stats(self) -> HedgingStats:
+        return replace(self._stats)
+
+    def hedge_delay(self) -> float:
+        """Current hedge delay in seconds."""
+        if len(self._latencies) < self.min_samples:
+            delay_ms = self.initial_delay_ms
+        else:
+            delay_ms = percentile(self._latencies, self.hedge_percentile)
+        return max(delay_ms, self.min_delay_ms) / 1000
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        return await self._hedged(
+            lambda p: p.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+        )
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        return await self._hedged(
+            lambda p: p.generate_chat(
+                messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stable_prefix=stable_prefix,
+            )
+        )
+
+    async def _hedged(self, call: Callable[[Provider], Awaitable[LLMResponse]]) -> LLMResponse:
+        self._stats.requests += 1
+        primary, secondary = self._choose()
+        start = time.perf_counter()
+        first = asyncio.ensure_future(call(primary))
+        pending: Set[asyncio.Future] = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if not done:
+                if self._hedge_allowed():
+                    self._stats.hedges += 1
+                    pending.add(asyncio.ensure_future(call(secondary)))
+                else:
+                    self._stats.budget_denied += 1
+
+            error: Optional[BaseException] = None
+            while True:
+                if not done:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both finished in the same tick.
+                for task in sorted(done, key=lambda t: t is not first):
+                    if task.exception() is None:
+                        if task is not first:
+                            self._stats.hedge_wins += 1
+                        self._latencies.append((time.perf_counter() - start) * 1000)
+                        return task.result()
+                    error = error or task.exception()
+                done = set()
+                if not pending:
+                    raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        # Chunks can't be taken from two streams, so streams are not hedged.
+        primary, _ = self._choose()
+        async for chunk in primary.stream(prompt, max_tokens=max_tokens):
+            yield chunk
+
+    async def count_tokens(self, text: str) -> int:
+        return await self._providers[0].count_tokens(text)
+
+    async def close(self):
+        for provider in self._providers:
+            close = getattr(provider, "close", None)
+            if close is not None:
+                await close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _choose(self):
+        count = len(self._providers)
+        index = self._next % count
+        self._next += 1
+        return self._providers[index], self._providers[(index + 1) % count]
+
+    def _hedge_allowed(self) -> bool:
+        return self._stats.hedges + 1 <= self.max_hedge_ratio * self._stats.requests
@@ -0,0 +1,119 @@
+"""
+Process-wide pool of persistent HTTP clients.
+
+Providers and LLM-backed tools that talk to the same server share one
+``httpx.AsyncClient`` per (origin, pool settings), so TCP/TLS connections
+are kept alive and reused across calls instead of opened per request.
+
+httpx clients are bound to the event loop that first used them, so the
+pool keeps a separate client per running loop and discards clients whose
+loop has closed.
+
+Example:
+    >>> client = get_http_pool().get("http://localhost:11434")
+    >>> await client.post("http://localhost:11434/api/generate", json=payload)
+    >>> await close_http_pool()  # on shutdown
+"""
+
+import asyncio
+import importlib.util
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .exceptions import ProviderConfigError
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection settings for pooled clients."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    timeout: float = 60.0
+
+
+def origin(base_url: str) -> str:
+    """Normalize a URL to ``scheme://host:port``."""
+    parts = urlsplit(base_url)
+    if not parts.scheme or not parts.hostname:
+        raise ProviderConfigError(f"Invalid base URL: {base_url!r}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname.lower()}:{port}"
+
+
+class HTTPClientPool:
+    """Shared ``httpx.AsyncClient`` instances keyed by origin and settings."""
+
+    def __init__(self, config: Optional[PoolConfig] = None):
+        self.config = config or PoolConfig()
+        self._clients: Dict[Tuple[Any, str, PoolConfig], Any] = {}
+
+    def get(self, base_url: str, config: Optional[PoolConfig] = None):
+        """Return the shared client for ``base_url`` (created on first use)."""
+        config = config or self.config
+        loop = _running_loop()
+        self._prune()
+        key = (loop, origin(base_url), config)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._create(config)
+            self._clients[key] = client
+        return client
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def aclose(self) -> None:
+        """Close every client owned by the running loop (graceful shutdown)."""
+        loop = _running_loop()
+        for key in [key for key in self._clients if key[0] is loop]:
+            await self._clients.pop(key).aclose()
+        self._prune()
+
+    def _prune(self) -> None:
+        for key in [key for key in self._clients if key[0] is not None and key[0].is_closed()]:
+            del self._clients[key]
+
+    @staticmethod
+    def _create(config: PoolConfig):
+        try:
+            import httpx
+        except ImportError:
+            raise ProviderConfigError(
+                "httpx is required for pooled HTTP clients. "
+                "Install with: pip install httpx"
+            )
+        # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 without it.
+        http2 = config.http2 and importlib.util.find_spec("h2") is not None
+        return httpx.AsyncClient(
+            timeout=config.timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+_POOL = HTTPClientPool()
+
+
+def get_http_pool() -> HTTPClientPool:
+    """The process-wide client pool."""
+    return _POOL
+
+
+async def close_http_pool() -> None:
+    """Close the process-wide pool's clients for the running loop."""
+    await _POOL.aclose()
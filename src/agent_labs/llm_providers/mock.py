@@ -76,7 +76,9 @@ class MockProvider(Provider):
         return LLMResponse(
             text=text[:max_tokens * 4],  # Rough estimate: 4 chars per token
             tokens_used=tokens,
-            model=self.name
+            model=self.name,
+            prompt_tokens=len(prompt.split()),
+            completion_tokens=tokens,
         )
 
     async def stream(
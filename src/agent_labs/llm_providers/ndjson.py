@@ -0,0 +1,74 @@
+"""
+Incremental newline-delimited JSON (NDJSON) decoding.
+
+Streaming endpoints such as Ollama's /api/generate send one JSON object
+per line. NDJSONDecoder works on raw byte chunks: it buffers partial
+lines across chunks and decodes each complete line exactly once, without
+first decoding the bytes to str. orjson is used when installed; otherwise
+the stdlib json module is used.
+"""
+
+import json
+from typing import Any, Callable, List, Optional
+
+try:  # optional accelerator
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+if orjson is not None:
+    loads_json: Callable[[bytes], Any] = orjson.loads
+else:
+    loads_json = json.loads
+
+
+class NDJSONDecoder:
+    """
+    Decode NDJSON from arbitrary byte chunks.
+
+    Example:
+        >>> decoder = NDJSONDecoder()
+        >>> decoder.feed(b'{"a": 1}\\n{"b"')
+        [{'a': 1}]
+        >>> decoder.feed(b': 2}\\n')
+        [{'b': 2}]
+    """
+
+    def __init__(self, loads: Optional[Callable[[bytes], Any]] = None):
+        self._loads = loads or loads_json
+        self._buffer = bytearray()
+
+    @property
+    def pending(self) -> int:
+        """Bytes buffered from an incomplete line."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Add a chunk and return the objects from every line it completes."""
+        if not data:
+            return []
+        # Only the new bytes can contain the next newline.
+        newline = data.find(b"\n")
+        if newline < 0:
+            self._buffer += data
+            return []
+        newline += len(self._buffer)
+        self._buffer += data
+
+        objects = []
+        start = 0
+        buffer = self._buffer
+        while newline >= 0:
+            line = bytes(buffer[start:newline]).strip()
+            if line:
+                objects.append(self._loads(line))
+            start = newline + 1
+            newline = buffer.find(b"\n", start)
+        del buffer[:start]
+        return objects
+
+    def flush(self) -> List[Any]:
+        """Decode a final line that was not newline-terminated."""
+        line = bytes(self._buffer).strip()
+        self._buffer.clear()
+        return [self._loads(line)] if line else []
@@ -22,15 +22,45 @@ Models available:
 """
 
 import asyncio
-from typing import AsyncIterator
+import random
+import uuid
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
 
-from .base import Provider, LLMResponse
+from .base import (
+    Provider,
+    LLMResponse,
+    Timings,
+    ChatMessage,
+    MessageLike,
+    as_messages,
+    render_messages,
+)
 from .exceptions import (
     ProviderConnectionError,
     ProviderTimeoutError,
     ModelNotFoundError,
     ProviderConfigError,
 )
+from .deadline import DeadlineExceededError, current_deadline
+from .http_pool import PoolConfig, get_http_pool
+from .ndjson import NDJSONDecoder
+from .tokenizer import get_tokenizer
+from .wrapper import ProviderWrapper
+
+
+def _ns_to_ms(value: Optional[int]) -> Optional[float]:
+    return value / 1e6 if value is not None else None
+
+
+@dataclass
+class _SessionContext:
+    """Conversation already evaluated by Ollama and its returned KV context."""
+
+    messages: Tuple[ChatMessage, ...]
+    context: array
 
 
 class OllamaProvider(Provider):
@@ -54,6 +84,11 @@ class OllamaProvider(Provider):
         timeout: int = 60,
         max_retries: int = 2,
         retry_backoff: float = 0.5,
+        client: Optional[Any] = None,
+        pool_config: Optional[PoolConfig] = None,
+        keep_context: bool = False,
+        max_sessions: int = 32,
+        max_context_tokens: int = 32768,
     ):
         """
         Initialize OllamaProvider.
@@ -62,6 +97,13 @@ class OllamaProvider(Provider):
             base_url: Ollama server URL (default: localhost:11434)
             model: Model name to use (default: llama2)
             timeout: Request timeout in seconds (default: 60)
+            max_retries: Retries on transient network errors (default: 2)
+            retry_backoff: Base delay for exponential backoff in seconds
+            client: Optional pre-configured httpx.AsyncClient (not closed by close())
+            pool_config: Keep-alive/connection/HTTP2 settings for the shared client pool
+            keep_context: Reuse Ollama's returned KV context within sessions (see session())
+            max_sessions: Session contexts kept before the least recently used is dropped
+            max_context_tokens: Contexts longer than this are not kept
             
         Raises:
             ProviderConfigError: If configuration is invalid
@@ -72,43 +114,75 @@ class OllamaProvider(Provider):
             raise ProviderConfigError("model cannot be empty")
         if timeout <= 0:
             raise ProviderConfigError("timeout must be positive")
+        if max_sessions <= 0:
+            raise ProviderConfigError("max_sessions must be positive")
         
         self.base_url = base_url.rstrip("/")  # Remove trailing slash
         self.model = model
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_backoff = retry_backoff
-        self._client = None
+        self.pool_config = pool_config
+        self._client = client
+        self._pooled = client is None
         self._httpx = None
+        self.keep_context = keep_context
+        self.max_sessions = max_sessions
+        self.max_context_tokens = max_context_tokens
+        self._contexts: "OrderedDict[str, _SessionContext]" = OrderedDict()
+        self.context_reuses = 0
         
     async def _ensure_client(self):
-        """Lazy load httpx client."""
-        if self._client is None:
+        """Lazy load httpx client (shared per server via the HTTP client pool)."""
+        if self._httpx is None:
             try:
                 import httpx
-                self._httpx = httpx
-                self._client = httpx.AsyncClient(timeout=self.timeout)
             except ImportError:
                 raise ProviderConfigError(
                     "httpx is required for OllamaProvider. "
                     "Install with: pip install httpx"
                 )
+            self._httpx = httpx
+        if self._pooled:
+            self._client = get_http_pool().get(self.base_url, self.pool_config)
 
     async def _post_with_retry(self, url: str, payload: dict):
-        """Post request with simple retry on transient errors."""
+        """Post request with simple retry on transient errors.
+
+        Under a deadline (see deadline_scope), each attempt's timeout is
+        shrunk to the time left and retries that can't start in time are
+        skipped.
+        """
         attempt = 0
         last_error = None
         while attempt <= self.max_retries:
             try:
-                return await self._client.post(url, json=payload)
+                return await self._client.post(url, json=payload, timeout=self._attempt_timeout())
             except (self._httpx.TimeoutException, self._httpx.RequestError) as e:
                 last_error = e
-                if attempt >= self.max_retries:
+                if attempt >= self.max_retries or not self._retry_allowed(attempt):
                     raise
                 await asyncio.sleep(self.retry_backoff * (2 ** attempt))
                 attempt += 1
         raise last_error  # pragma: no cover
 
+    def _attempt_timeout(self) -> float:
+        deadline = current_deadline()
+        if deadline is None:
+            return self.timeout
+        deadline.check(f"Ollama request to {self.base_url}")
+        return deadline.timeout(self.timeout)
+
+    def _retry_allowed(self, attempt: int) -> bool:
+        deadline = current_deadline()
+        return deadline is None or deadline.allows(self.retry_backoff * (2 ** attempt))
+
+    def _timeout_error(self, message: str) -> ProviderTimeoutError:
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            return DeadlineExceededError(f"{message} (deadline exceeded)")
+        return ProviderTimeoutError(message)
+
     async def generate(
         self,
         prompt: str,
@@ -144,6 +218,166 @@ class OllamaProvider(Provider):
             }
         }
         
+        data = await self._post_json(url, payload)
+        return self._response(data.get("response", ""), data)
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        """
+        Generate a reply using Ollama's /api/chat endpoint.
+        
+        The Ollama runner keeps the KV cache of the previous request and
+        reuses the longest matching token prefix, so appending to an
+        unchanged conversation (``stable_prefix``) only evaluates the new
+        messages.
+        
+        Args:
+            messages: Conversation as ChatMessage objects or role/content dicts
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature (0.0-1.0)
+            stable_prefix: Leading messages unchanged since the last call
+            
+        Returns:
+            LLMResponse with the assistant reply
+            
+        Raises:
+            ProviderConnectionError: If cannot connect to Ollama
+            ProviderTimeoutError: If request times out
+            ModelNotFoundError: If model is not available
+        """
+        await self._ensure_client()
+        
+        url = f"{self.base_url}/api/chat"
+        payload = {
+            "model": self.model,
+            "messages": [message.to_dict() for message in as_messages(messages)],
+            "stream": False,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+            }
+        }
+        
+        data = await self._post_json(url, payload)
+        return self._response((data.get("message") or {}).get("content", ""), data)
+
+    def session(self, session_id: Optional[str] = None) -> Provider:
+        """
+        Open a conversation session that carries Ollama's KV context.
+        
+        With ``keep_context`` enabled, the session's generate_chat calls go
+        to /api/generate and pass back the ``context`` returned by the
+        previous call, so only the messages appended since then are
+        evaluated. Without it, this provider itself is returned.
+        
+        Args:
+            session_id: Key for the stored context (default: a new random id)
+            
+        Returns:
+            OllamaSession, or this provider when keep_context is off
+        """
+        if not self.keep_context:
+            return self
+        return OllamaSession(self, session_id or uuid.uuid4().hex)
+
+    @property
+    def context_sessions(self) -> int:
+        """Number of sessions with a stored KV context."""
+        return len(self._contexts)
+
+    def drop_context(self, session_id: str) -> None:
+        """Forget the stored KV context of a session."""
+        self._contexts.pop(session_id, None)
+
+    def clear_contexts(self) -> None:
+        """Forget every stored KV context."""
+        self._contexts.clear()
+
+    async def _generate_in_session(
+        self,
+        session_id: str,
+        messages: Sequence[MessageLike],
+        max_tokens: int,
+        temperature: float,
+    ) -> LLMResponse:
+        """Generate a chat reply, reusing the session's context when the
+        conversation extends the one it was computed for."""
+        await self._ensure_client()
+        
+        conversation = tuple(as_messages(messages))
+        # Popped so a concurrent call on the same session can't reuse it, and
+        # re-inserted last on success (LRU order).
+        state = self._contexts.pop(session_id, None)
+        new_messages = conversation
+        context = None
+        if (
+            state is not None
+            and len(conversation) > len(state.messages)
+            and conversation[:len(state.messages)] == state.messages
+        ):
+            new_messages = conversation[len(state.messages):]
+            context = state.context
+            self.context_reuses += 1
+        # Otherwise history was rewritten (or this is the first call): the
+        # stale context is dropped and the whole conversation is evaluated.
+        
+        url = f"{self.base_url}/api/generate"
+        payload = {
+            "model": self.model,
+            "prompt": render_messages(new_messages),
+            "stream": False,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+            }
+        }
+        if context is not None:
+            payload["context"] = context.tolist()
+        
+        data = await self._post_json(url, payload)
+        text = data.get("response", "")
+        returned = data.get("context")
+        if returned and len(returned) <= self.max_context_tokens:
+            self._contexts[session_id] = _SessionContext(
+                messages=conversation + (ChatMessage("assistant", text),),
+                # array("l") stores 8 bytes per token instead of an int object.
+                context=array("l", returned),
+            )
+            while len(self._contexts) > self.max_sessions:
+                self._contexts.popitem(last=False)
+        
+        return self._response(text, data)
+
+    def _response(self, text: str, data: dict) -> LLMResponse:
+        """Build an LLMResponse with Ollama's token counts and timings."""
+        load_ms = _ns_to_ms(data.get("load_duration"))
+        prompt_eval_ms = _ns_to_ms(data.get("prompt_eval_duration"))
+        ttft_ms = None
+        if prompt_eval_ms is not None:
+            ttft_ms = (load_ms or 0.0) + prompt_eval_ms
+        return LLMResponse(
+            text=text,
+            tokens_used=data.get("eval_count", 0),
+            model=self.model,
+            # prompt_eval_count is omitted when the whole prompt was cached.
+            prompt_tokens=data.get("prompt_eval_count", 0 if "eval_count" in data else None),
+            completion_tokens=data.get("eval_count"),
+            timings=Timings(
+                ttft_ms=ttft_ms,
+                load_ms=load_ms,
+                prompt_eval_ms=prompt_eval_ms,
+                eval_ms=_ns_to_ms(data.get("eval_duration")),
+                server_ms=_ns_to_ms(data.get("total_duration")),
+            ),
+        )
+
+    async def _post_json(self, url: str, payload: dict) -> dict:
+        """POST a non-streaming request and return the decoded JSON body."""
         try:
             response = await self._post_with_retry(url, payload)
             
@@ -154,20 +388,14 @@ class OllamaProvider(Provider):
                 )
             
             response.raise_for_status()
-            data = response.json()
-            
-            return LLMResponse(
-                text=data.get("response", ""),
-                tokens_used=data.get("eval_count", 0),
-                model=self.model
-            )
+            return response.json()
             
         except asyncio.TimeoutError as e:
-            raise ProviderTimeoutError(
+            raise self._timeout_error(
                 f"Ollama request timed out after {self.timeout}s"
             ) from e
         except self._httpx.TimeoutException as e:
-            raise ProviderTimeoutError(
+            raise self._timeout_error(
                 f"Ollama request timed out after {self.timeout}s"
             ) from e
         except self._httpx.RequestError as e:
@@ -191,8 +419,12 @@ class OllamaProvider(Provider):
         Yields:
             Text chunks as they arrive
             
+        If the connection drops mid-stream, the request is retried and the
+        text the caller has already received is skipped.
+            
         Raises:
-            ProviderConnectionError: If cannot connect to Ollama
+            ProviderConnectionError: If cannot connect to Ollama, or a retried
+                stream does not repeat the text already yielded
             ProviderTimeoutError: If request times out
             ModelNotFoundError: If model is not available
         """
@@ -205,13 +437,22 @@ class OllamaProvider(Provider):
             "stream": True,
             "options": {
                 "num_predict": max_tokens,
+                # A fixed per-call seed makes a retried stream regenerate the
+                # same tokens, so the part already yielded can be skipped.
+                "seed": random.randrange(2 ** 31),
             }
         }
         
+        emitted: List[str] = []  # chunks already yielded to the caller
         attempt = 0
         while attempt <= self.max_retries:
             try:
-                async with self._client.stream("POST", url, json=payload) as response:
+                # A retry must regenerate this text before anything new is yielded.
+                replay = "".join(emitted)
+                received = 0
+                async with self._client.stream(
+                    "POST", url, json=payload, timeout=self._attempt_timeout()
+                ) as response:
                     if response.status_code == 404:
                         raise ModelNotFoundError(
                             f"Model '{self.model}' not found in Ollama"
@@ -219,38 +460,59 @@ class OllamaProvider(Provider):
                     
                     response.raise_for_status()
                     
-                    async for line in response.aiter_lines():
-                        if line:
-                            import json
-                            data = json.loads(line)
-                            token = data.get("response", "")
-                            if token:
-                                yield token
+                    async for data in self._iter_ndjson(response):
+                        token = data.get("response", "")
+                        if not token:
+                            continue
+                        end = received + len(token)
+                        if received < len(replay):
+                            overlap = min(end, len(replay))
+                            if token[: overlap - received] != replay[received:overlap]:
+                                raise ProviderConnectionError(
+                                    "Ollama stream diverged from the text already "
+                                    "yielded after reconnecting"
+                                )
+                        if end > len(replay):
+                            chunk = token[max(0, len(replay) - received):]
+                            emitted.append(chunk)
+                            yield chunk
+                        received = end
                 break
             except asyncio.TimeoutError as e:
-                if attempt >= self.max_retries:
-                    raise ProviderTimeoutError(
+                if attempt >= self.max_retries or not self._retry_allowed(attempt):
+                    raise self._timeout_error(
                         f"Ollama streaming timed out after {self.timeout}s"
                     ) from e
             except self._httpx.TimeoutException as e:
-                if attempt >= self.max_retries:
-                    raise ProviderTimeoutError(
+                if attempt >= self.max_retries or not self._retry_allowed(attempt):
+                    raise self._timeout_error(
                         f"Ollama streaming timed out after {self.timeout}s"
                     ) from e
             except self._httpx.RequestError as e:
-                if attempt >= self.max_retries:
+                if attempt >= self.max_retries or not self._retry_allowed(attempt):
                     raise ProviderConnectionError(
                         f"Cannot connect to Ollama at {self.base_url}"
                     ) from e
             await asyncio.sleep(self.retry_backoff * (2 ** attempt))
             attempt += 1
 
+    @staticmethod
+    async def _iter_ndjson(response) -> AsyncIterator[dict]:
+        """Decode NDJSON objects from a streaming response body."""
+        decoder = NDJSONDecoder()
+        async for chunk in response.aiter_bytes():
+            for data in decoder.feed(chunk):
+                yield data
+        for data in decoder.flush():
+            yield data
+
     async def count_tokens(self, text: str) -> int:
         """
         Estimate token count.
         
-        Note: Ollama doesn't provide token counting API,
-        so we use a simple heuristic (1 token per word).
+        Note: Ollama doesn't provide a token counting API and its models
+        use their own vocabularies, so this uses the shared tokenizer's
+        calibrated heuristic (see Tokenizer.calibrate).
         
         Args:
             text: Text to count tokens for
@@ -258,15 +520,32 @@ class OllamaProvider(Provider):
         Returns:
             Estimated token count
         """
-        if not text:
-            return 0
-        # Simple heuristic: ~1 token per word
-        return len(text.split())
+        return get_tokenizer().count(text, model=self.model)
+
+    async def health_check(self) -> bool:
+        """
+        Check that the Ollama server is reachable.
+
+        Returns:
+            True if GET /api/tags succeeds, False otherwise
+        """
+        await self._ensure_client()
+        try:
+            response = await self._client.get(f"{self.base_url}/api/tags", timeout=self.timeout)
+        except self._httpx.HTTPError:
+            return False
+        return response.status_code == 200
 
     async def close(self):
-        """Close the HTTP client."""
-        if self._client:
-            await self._client.aclose()
+        """
+        Release the HTTP client.
+
+        Pooled connections stay open for other users of the same server;
+        call close_http_pool() on shutdown to close them.
+        """
+        self._contexts.clear()
+        if self._pooled:
+            self._client = None
 
     async def __aenter__(self):
         """Context manager entry."""
@@ -275,3 +554,44 @@ class OllamaProvider(Provider):
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         await self.close()
+
+
+class OllamaSession(ProviderWrapper):
+    """
+    Conversation-scoped view of an OllamaProvider that reuses KV context.
+    
+    Each generate_chat call is expected to extend the previous call's
+    conversation plus its reply; only the new messages are sent along with
+    the stored context. If the conversation no longer starts with that
+    exchange (history was edited or truncated), the context is discarded
+    and the full conversation is evaluated again. Plain generate and stream
+    calls are stateless.
+    
+    Example:
+        >>> provider = OllamaProvider(model="llama2", keep_context=True)
+        >>> async with provider.session() as session:
+        ...     await session.generate_chat(messages)
+    """
+
+    def __init__(self, provider: OllamaProvider, session_id: str):
+        super().__init__(provider)
+        self.session_id = session_id
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        return await self.provider._generate_in_session(
+            self.session_id, messages, max_tokens, temperature
+        )
+
+    def reset(self) -> None:
+        """Forget this session's context."""
+        self.provider.drop_context(self.session_id)
+
+    async def close(self):
+        """End the session (the underlying provider stays open)."""
+        self.reset()
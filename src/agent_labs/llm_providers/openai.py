@@ -1,29 +1,38 @@
 """OpenAI LLM Provider implementation.
 
-Supports OpenAI API (GPT-4, GPT-3.5, etc.) with proper error handling and retries.
+Supports OpenAI API (GPT-4, GPT-3.5, etc.) and OpenAI-compatible servers with
+proper error handling and retries. Calls go through a shared, non-blocking
+``httpx.AsyncClient`` from the process-wide HTTP client pool (no OpenAI SDK
+dependency, see ADR-0008), so many concurrent agent runs can share one
+provider without blocking the event loop.
 """
 
+import asyncio
+import json
 import os
-import time
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 
-from .base import Provider, LLMResponse
+from .base import Provider, LLMResponse, MessageLike, as_messages
 from .exceptions import (
     ProviderAuthError,
+    ProviderConfigError,
     ProviderConnectionError,
     ProviderRateLimitError,
     ProviderTimeoutError,
     TokenLimitExceededError,
     ModelNotFoundError,
 )
+from .deadline import DeadlineExceededError, current_deadline
+from .http_pool import PoolConfig, get_http_pool
+from .tokenizer import get_tokenizer
 
 
 class OpenAIProvider(Provider):
     """OpenAI API provider for GPT models.
-    
+
     Supports all OpenAI chat models (GPT-4, GPT-3.5-turbo, etc.).
     Requires OPENAI_API_KEY environment variable.
-    
+
     Args:
         api_key: OpenAI API key (if not provided, reads from OPENAI_API_KEY env var)
         model: Model name (e.g., 'gpt-4', 'gpt-3.5-turbo')
@@ -31,8 +40,15 @@ class OpenAIProvider(Provider):
         timeout: Request timeout in seconds
         temperature: Sampling temperature (0.0-2.0)
         max_retries: Maximum retry attempts for rate limits
+        retry_backoff: Base delay in seconds for exponential backoff
+        max_connections: Connection pool size shared by concurrent requests
+        max_keepalive_connections: Idle connections kept open for reuse
+        client: Optional pre-configured httpx.AsyncClient (not closed by close())
+        pool_config: Shared-pool settings (overrides the two connection limits above)
     """
-    
+
+    SYSTEM_PROMPT = "You are a helpful AI assistant."
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -41,6 +57,11 @@ class OpenAIProvider(Provider):
         timeout: int = 30,
         temperature: float = 0.7,
         max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        client: Optional[Any] = None,
+        pool_config: Optional[PoolConfig] = None,
     ):
         """Initialize OpenAI provider."""
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -48,26 +69,123 @@ class OpenAIProvider(Provider):
             raise ProviderAuthError(
                 "OpenAI API key required. Set OPENAI_API_KEY environment variable."
             )
-        
+        if max_retries <= 0:
+            raise ProviderConfigError("max_retries must be positive")
+
         self.model = model
         self.base_url = base_url.rstrip("/")
         self.default_timeout = timeout
         self.default_temperature = temperature
         self.max_retries = max_retries
-        
-        # Lazy import to avoid dependency if not using OpenAI
+        self.retry_backoff = retry_backoff
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.pool_config = pool_config or PoolConfig(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._client = client
+        self._pooled = client is None
+        self._httpx = None
+
+    async def _ensure_client(self):
+        """Lazy load the pooled httpx client."""
+        if self._httpx is None:
+            try:
+                import httpx
+            except ImportError:
+                raise ProviderConfigError(
+                    "httpx is required for OpenAIProvider. "
+                    "Install with: pip install httpx"
+                )
+            self._httpx = httpx
+        if self._pooled:
+            self._client = get_http_pool().get(self.base_url, self.pool_config)
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    @staticmethod
+    def _error_message(response) -> str:
+        try:
+            data = response.json()
+        except ValueError:
+            return response.text
+        error = data.get("error") if isinstance(data, dict) else None
+        if isinstance(error, dict):
+            return str(error.get("message", error))
+        return str(data)
+
+    @staticmethod
+    def _retry_after(response, default: float) -> float:
+        value = response.headers.get("retry-after")
         try:
-            import openai
-            self.client = openai.OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url,
-                timeout=self.default_timeout,
+            return max(0.0, float(value)) if value is not None else default
+        except ValueError:
+            return default
+
+    def _raise_for_status(self, response) -> None:
+        """Map OpenAI HTTP error responses to provider exceptions."""
+        status = response.status_code
+        if status < 400:
+            return
+        message = self._error_message(response)
+        lowered = message.lower()
+        if status in (401, 403):
+            raise ProviderAuthError(f"OpenAI authentication failed: {message}")
+        if status == 404:
+            raise ModelNotFoundError(f"OpenAI model '{self.model}' not found: {message}")
+        if status == 429:
+            retry_after = int(self._retry_after(response, 60))
+            raise ProviderRateLimitError(
+                f"OpenAI rate limit exceeded: {message}", retry_after=retry_after
             )
-        except ImportError:
-            raise ProviderAuthError(
-                "OpenAI package not installed. Install with: pip install openai"
+        if "maximum context length" in lowered or "token limit" in lowered:
+            raise TokenLimitExceededError(f"OpenAI token limit exceeded: {message}")
+        raise ProviderConnectionError(f"OpenAI API error ({status}): {message}")
+
+    def _is_retryable(self, response) -> bool:
+        return response.status_code == 429 or response.status_code >= 500
+
+    async def _backoff(self, attempt: int, response=None) -> None:
+        delay = self.retry_backoff * (2 ** attempt)
+        if response is not None:
+            delay = self._retry_after(response, delay)
+        deadline = current_deadline()
+        if deadline is not None and not deadline.allows(delay):
+            raise DeadlineExceededError(
+                f"OpenAI retry in {delay:.1f}s would exceed the deadline"
             )
-    
+        await asyncio.sleep(delay)
+
+    def _timeout(self, what: str) -> float:
+        """Per-attempt timeout, shrunk to the current deadline."""
+        deadline = current_deadline()
+        if deadline is None:
+            return self.default_timeout
+        deadline.check(what)
+        return deadline.timeout(self.default_timeout)
+
+    @staticmethod
+    def _deadline_expired() -> bool:
+        deadline = current_deadline()
+        return deadline is not None and deadline.expired
+
+    def _timeout_error(self, message: str) -> ProviderTimeoutError:
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            return DeadlineExceededError(f"{message} (deadline exceeded)")
+        return ProviderTimeoutError(message)
+
     async def generate(
         self,
         prompt: str,
@@ -75,15 +193,15 @@ class OpenAIProvider(Provider):
         temperature: float = 0.7,
     ) -> LLMResponse:
         """Generate response from OpenAI API.
-        
+
         Args:
             prompt: Input prompt/query
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature (0.0-2.0)
-        
+
         Returns:
             LLMResponse with generated text and token count
-            
+
         Raises:
             ProviderAuthError: Invalid API key
             ProviderRateLimitError: Rate limit exceeded
@@ -92,133 +210,163 @@ class OpenAIProvider(Provider):
             TokenLimitExceededError: Input too long
             ModelNotFoundError: Invalid model name
         """
-        messages = [
-            {"role": "system", "content": "You are a helpful AI assistant."},
-            {"role": "user", "content": prompt},
-        ]
-        
-        # Retry logic for rate limits
+        return await self._complete(self._messages(prompt), max_tokens, temperature)
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        """Send ``messages`` as-is to the chat completions endpoint.
+
+        No system prompt is added. OpenAI caches identical prompt prefixes
+        automatically, so keeping the first ``stable_prefix`` messages
+        byte-identical between calls is all that is needed for reuse.
+        """
+        payload_messages = [message.to_dict() for message in as_messages(messages)]
+        return await self._complete(payload_messages, max_tokens, temperature)
+
+    async def _complete(
+        self, messages: List[Dict[str, str]], max_tokens: int, temperature: float
+    ) -> LLMResponse:
+        await self._ensure_client()
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        url = f"{self.base_url}/chat/completions"
+
         for attempt in range(self.max_retries):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
+                response = await self._client.post(
+                    url,
+                    json=payload,
+                    headers=self._headers(),
+                    timeout=self._timeout("OpenAI request"),
                 )
-                
-                # Extract response
-                content = response.choices[0].message.content
-                tokens = response.usage.total_tokens
-                
-                return LLMResponse(
-                    text=content,
-                    tokens_used=tokens,
-                    model=self.model,
+            except self._httpx.TimeoutException as e:
+                if attempt < self.max_retries - 1 and not self._deadline_expired():
+                    await self._backoff(attempt)
+                    continue
+                raise self._timeout_error(
+                    f"OpenAI request timeout after {self.default_timeout}s"
+                ) from e
+            except self._httpx.RequestError as e:
+                if attempt < self.max_retries - 1:
+                    await self._backoff(attempt)
+                    continue
+                raise ProviderConnectionError(f"OpenAI connection error: {e}") from e
+
+            if self._is_retryable(response) and attempt < self.max_retries - 1:
+                await self._backoff(attempt, response)
+                continue
+            if response.status_code == 429:
+                raise ProviderRateLimitError(
+                    f"OpenAI rate limit exceeded after {self.max_retries} retries",
+                    retry_after=int(self._retry_after(response, 60)),
                 )
-                
-            except Exception as e:
-                error_msg = str(e).lower()
-                
-                # Authentication error
-                if "authentication" in error_msg or "api key" in error_msg or "401" in error_msg:
-                    raise ProviderAuthError(f"OpenAI authentication failed: {e}")
-                
-                # Rate limit - retry with backoff
-                if "rate limit" in error_msg or "429" in error_msg:
-                    if attempt < self.max_retries - 1:
-                        wait_time = 2 ** attempt  # Exponential backoff
-                        time.sleep(wait_time)
-                        continue
-                    raise ProviderRateLimitError(f"OpenAI rate limit exceeded after {self.max_retries} retries")
-                
-                # Timeout
-                if "timeout" in error_msg or "timed out" in error_msg:
-                    raise ProviderTimeoutError(f"OpenAI request timeout after {self.default_timeout}s")
-                
-                # Token limit
-                if "maximum context length" in error_msg or "token limit" in error_msg:
-                    raise TokenLimitExceededError(f"OpenAI token limit exceeded: {e}")
-                
-                # Model not found
-                if "model" in error_msg and ("not found" in error_msg or "does not exist" in error_msg):
-                    raise ModelNotFoundError(f"OpenAI model '{self.model}' not found: {e}")
-                
-                # Connection/network error
-                if "connection" in error_msg or "network" in error_msg:
-                    raise ProviderConnectionError(f"OpenAI connection error: {e}")
-                
-                # Generic error
-                raise ProviderConnectionError(f"OpenAI API error: {e}")
-        
+            self._raise_for_status(response)
+
+            data = response.json()
+            content = data["choices"][0]["message"].get("content") or ""
+            usage = data.get("usage") or {}
+            return LLMResponse(
+                text=content,
+                tokens_used=usage.get("total_tokens", 0),
+                model=data.get("model", self.model),
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+            )
+
         # Should not reach here
         raise ProviderRateLimitError(f"OpenAI rate limit exceeded after {self.max_retries} retries")
-    
+
     async def stream(
         self,
         prompt: str,
         max_tokens: int = 1000,
     ) -> AsyncIterator[str]:
         """Stream text response tokens as they arrive.
-        
+
         Args:
             prompt: Input text
             max_tokens: Maximum tokens to generate
-            
+
         Yields:
             Chunks of generated text
         """
-        messages = [
-            {"role": "system", "content": "You are a helpful AI assistant."},
-            {"role": "user", "content": prompt},
-        ]
-        
+        await self._ensure_client()
+        payload = {
+            "model": self.model,
+            "messages": self._messages(prompt),
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        url = f"{self.base_url}/chat/completions"
+
         try:
-            stream = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=max_tokens,
-                stream=True,
-            )
-            
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-                    
-        except Exception as e:
-            error_msg = str(e).lower()
-            if "authentication" in error_msg or "api key" in error_msg:
-                raise ProviderAuthError(f"OpenAI authentication failed: {e}")
-            raise ProviderConnectionError(f"OpenAI streaming error: {e}")
-    
+            async with self._client.stream(
+                "POST",
+                url,
+                json=payload,
+                headers=self._headers(),
+                timeout=self._timeout("OpenAI stream"),
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    self._raise_for_status(response)
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    choices = chunk.get("choices") or []
+                    if choices:
+                        content = (choices[0].get("delta") or {}).get("content")
+                        if content:
+                            yield content
+        except self._httpx.TimeoutException as e:
+            raise self._timeout_error(
+                f"OpenAI streaming timed out after {self.default_timeout}s"
+            ) from e
+        except self._httpx.RequestError as e:
+            raise ProviderConnectionError(f"OpenAI streaming error: {e}") from e
+
     async def count_tokens(self, text: str) -> int:
         """Count tokens in text.
-        
-        Uses tiktoken library for accurate token counting.
-        
+
+        Uses the shared tokenizer service: the model's tiktoken encoding is
+        loaded once and counts are memoized. Without tiktoken, a calibrated
+        heuristic is used.
+
         Args:
             text: Text to count
-            
+
         Returns:
             Number of tokens
         """
-        try:
-            import tiktoken
-            
-            # Get encoding for model
-            if "gpt-4" in self.model:
-                encoding = tiktoken.encoding_for_model("gpt-4")
-            elif "gpt-3.5" in self.model:
-                encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-            else:
-                # Default to cl100k_base (GPT-4/3.5 encoding)
-                encoding = tiktoken.get_encoding("cl100k_base")
-            
-            return len(encoding.encode(text))
-        except ImportError:
-            # Fallback: rough approximation (4 chars = 1 token)
-            return len(text) // 4
-    
+        return get_tokenizer().count(text, model=self.model)
+
+    async def close(self):
+        """Release the HTTP client (pooled connections are closed by close_http_pool())."""
+        if self._pooled:
+            self._client = None
+
+    async def __aenter__(self):
+        """Context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        await self.close()
+
     def __repr__(self) -> str:
         """String representation."""
         return f"OpenAIProvider(model={self.model}, base_url={self.base_url})"
@@ -0,0 +1,473 @@
+"""
+Client-side rate limiting and adaptive concurrency for providers.
+
+RateLimitedProvider admits requests through three gates:
+- token buckets for requests/minute and tokens/minute budgets;
+- an AIMD concurrency limit that grows slowly while calls succeed within
+  the latency target and halves on 429s, timeouts or slow responses;
+- a server-imposed pause whenever ``ProviderRateLimitError.retry_after``
+  is received (the rejected request is re-queued and retried).
+
+Requests that cannot be admitted wait in per-tenant queues which are
+served round-robin, so one busy tenant cannot starve the others.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Sequence
+
+from .base import Provider, LLMResponse, MessageLike, render_messages
+from .deadline import DeadlineExceededError, current_deadline
+from .exceptions import ProviderRateLimitError, ProviderTimeoutError
+from .wrapper import ProviderWrapper
+
+DEFAULT_TENANT = "default"
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate_per_minute``.
+
+    The bucket may go negative when actual usage exceeds a reservation;
+    later acquisitions then wait until the debt is repaid.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if now)."""
+        self._refill()
+        # Requests larger than the bucket only need a full bucket.
+        needed = min(amount, self.capacity) - self._tokens
+        return max(0.0, needed / self.rate)
+
+    def try_acquire(self, amount: float) -> bool:
+        if self.wait_time(amount) > 0:
+            return False
+        self._tokens -= amount
+        return True
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + delta)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit."""
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_target_ms: Optional[float] = None,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("expected 1 <= min_limit <= initial <= max_limit")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_target_ms = latency_target_ms
+        self._limit = float(initial)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def on_success(self, latency_ms: float) -> None:
+        if self.latency_target_ms is not None and latency_ms > self.latency_target_ms:
+            self.on_overload()
+            return
+        # Grows by roughly ``increase`` per full window of successful calls.
+        self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+
+    def on_overload(self) -> None:
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+
+
+@dataclass
+class RateLimitStats:
+    """Counters for RateLimitedProvider."""
+
+    admitted: int = 0
+    queued: int = 0
+    rejected: int = 0
+    rate_limited: int = 0
+    timeouts: int = 0
+    retries: int = 0
+    in_flight: int = 0
+    concurrency_limit: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "rate_limited": self.rate_limited,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "concurrency_limit": self.concurrency_limit,
+        }
+
+
+class _Ticket:
+    __slots__ = ("tokens", "future")
+
+    def __init__(self, tokens: float, future: "asyncio.Future[None]") -> None:
+        self.tokens = tokens
+        self.future = future
+
+
+class RateLimitedProvider(ProviderWrapper):
+    """
+    Enforce rate budgets and an adaptive concurrency limit on a provider.
+
+    Example:
+        >>> provider = RateLimitedProvider(
+        ...     OpenAIProvider(api_key=key),
+        ...     requests_per_minute=500,
+        ...     tokens_per_minute=90_000,
+        ... )
+        >>> team_a = provider.for_tenant("team-a")
+        >>> await team_a.generate("Hello")
+    """
+
+    def __init__(
+        self,
+        provider: Provider,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        latency_target_ms: Optional[float] = None,
+        max_queue: Optional[int] = None,
+        max_retries: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize RateLimitedProvider.
+
+        Args:
+            provider: Provider to wrap
+            requests_per_minute: Request budget (None = unlimited)
+            tokens_per_minute: Token budget, prompt + max_tokens reserved per call
+            initial_concurrency: Starting concurrency limit
+            min_concurrency: Floor for the adaptive limit
+            max_concurrency: Ceiling for the adaptive limit
+            latency_target_ms: Responses slower than this shrink the limit
+            max_queue: Reject with ProviderRateLimitError beyond this many waiters
+            max_retries: Retries after a ProviderRateLimitError from upstream
+            clock: Monotonic clock (injectable for tests)
+        """
+        super().__init__(provider)
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.limiter = AIMDLimiter(
+            initial=initial_concurrency,
+            min_limit=min_concurrency,
+            max_limit=max_concurrency,
+            latency_target_ms=latency_target_ms,
+        )
+        self._clock = clock
+        self._requests = (
+            TokenBucket(requests_per_minute, clock=clock) if requests_per_minute else None
+        )
+        self._tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self._queues: "OrderedDict[str, Deque[_Ticket]]" = OrderedDict()
+        self._blocked_until = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._stats = RateLimitStats()
+
+    def stats(self) -> RateLimitStats:
+        stats = replace(self._stats)
+        stats.concurrency_limit = self.limiter.limit
+        return stats
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def for_tenant(self, tenant: str) -> Provider:
+        """A provider view whose calls are queued under ``tenant``."""
+        return _TenantProvider(self, tenant)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        return await self._generate(DEFAULT_TENANT, prompt, max_tokens, temperature)
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        return await self._generate_chat(
+            DEFAULT_TENANT, messages, max_tokens, temperature, stable_prefix
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        async for chunk in self._stream(DEFAULT_TENANT, prompt, max_tokens):
+            yield chunk
+
+    async def _generate(
+        self, tenant: str, prompt: str, max_tokens: int, temperature: float
+    ) -> LLMResponse:
+        return await self._call(
+            tenant,
+            await self._estimate(prompt, max_tokens),
+            lambda: self.provider.generate(prompt, max_tokens=max_tokens, temperature=temperature),
+        )
+
+    async def _generate_chat(
+        self,
+        tenant: str,
+        messages: Sequence[MessageLike],
+        max_tokens: int,
+        temperature: float,
+        stable_prefix: int,
+    ) -> LLMResponse:
+        return await self._call(
+            tenant,
+            await self._estimate(render_messages(messages), max_tokens),
+            lambda: self.provider.generate_chat(
+                messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stable_prefix=stable_prefix,
+            ),
+        )
+
+    async def _call(
+        self, tenant: str, reserved: float, call: Callable[[], Awaitable[LLMResponse]]
+    ) -> LLMResponse:
+        queued = 0.0
+        for attempt in range(self.max_retries + 1):
+            enqueued = self._clock()
+            await self._acquire(tenant, reserved)
+            start = self._clock()
+            queued += start - enqueued
+            try:
+                response = await call()
+            except ProviderRateLimitError as exc:
+                self._on_rate_limited(exc)
+                if attempt == self.max_retries:
+                    raise
+                self._stats.retries += 1
+                continue
+            except DeadlineExceededError:
+                # The caller ran out of time; not a sign of upstream overload.
+                raise
+            except ProviderTimeoutError:
+                self._stats.timeouts += 1
+                self.limiter.on_overload()
+                raise
+            finally:
+                self._release()
+
+            self.limiter.on_success((self._clock() - start) * 1000)
+            if self._tokens is not None and response.tokens_used:
+                self._tokens.adjust(reserved - response.tokens_used)
+            # Copied: the response object may be shared (cache, coalescing).
+            return replace(response, timings=replace(response.timings, queue_ms=queued * 1000))
+        raise AssertionError("unreachable")
+
+    async def _stream(self, tenant: str, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        await self._acquire(tenant, await self._estimate(prompt, max_tokens))
+        start = self._clock()
+        try:
+            async for chunk in self.provider.stream(prompt, max_tokens=max_tokens):
+                yield chunk
+        except ProviderRateLimitError as exc:
+            self._on_rate_limited(exc)
+            raise
+        except DeadlineExceededError:
+            raise
+        except ProviderTimeoutError:
+            self._stats.timeouts += 1
+            self.limiter.on_overload()
+            raise
+        else:
+            self.limiter.on_success((self._clock() - start) * 1000)
+        finally:
+            self._release()
+
+    async def _estimate(self, prompt: str, max_tokens: int) -> float:
+        if self._tokens is None:
+            return 0.0
+        return float(await self.provider.count_tokens(prompt) + max_tokens)
+
+    def _on_rate_limited(self, exc: ProviderRateLimitError) -> None:
+        self._stats.rate_limited += 1
+        self.limiter.on_overload()
+        self._blocked_until = max(self._blocked_until, self._clock() + max(0, exc.retry_after))
+
+    async def _acquire(self, tenant: str, tokens: float) -> None:
+        if self.max_queue is not None and self.queued >= self.max_queue:
+            self._stats.rejected += 1
+            raise ProviderRateLimitError("Client-side request queue is full", retry_after=1)
+
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        ticket = _Ticket(tokens, future)
+        self._queues.setdefault(tenant, deque()).append(ticket)
+        self._pump()
+        if not future.done():
+            self._stats.queued += 1
+        deadline = current_deadline()
+        try:
+            if deadline is None:
+                await future
+            else:
+                # Stop waiting once the caller's deadline passes.
+                await asyncio.wait_for(asyncio.shield(future), deadline.remaining())
+        except (asyncio.CancelledError, asyncio.TimeoutError) as exc:
+            if future.done() and not future.cancelled():
+                # Admitted just before the caller gave up: hand the slot back.
+                self._release()
+            else:
+                future.cancel()
+                self._discard(tenant, ticket)
+            if isinstance(exc, asyncio.TimeoutError):
+                raise DeadlineExceededError(
+                    "Deadline exceeded while queued for a rate limit"
+                ) from exc
+            raise
+
+    def _release(self) -> None:
+        self._stats.in_flight -= 1
+        self._pump()
+
+    def _discard(self, tenant: str, ticket: _Ticket) -> None:
+        queue = self._queues.get(tenant)
+        if queue is None:
+            return
+        try:
+            queue.remove(ticket)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[tenant]
+
+    def _pump(self) -> None:
+        """Admit queued requests round-robin across tenants while budgets allow."""
+        while self._queues and self._stats.in_flight < self.limiter.limit:
+            wait = self._blocked_until - self._clock()
+            tenant, queue = next(iter(self._queues.items()))
+            ticket = queue[0]
+            if wait <= 0 and self._requests is not None:
+                wait = self._requests.wait_time(1)
+            if wait <= 0 and self._tokens is not None:
+                wait = self._tokens.wait_time(ticket.tokens)
+            if wait > 0:
+                self._schedule_wakeup(wait)
+                return
+
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(tenant)
+            else:
+                del self._queues[tenant]
+            if ticket.future.done():
+                continue
+            if self._requests is not None:
+                self._requests.try_acquire(1)
+            if self._tokens is not None:
+                self._tokens.adjust(-ticket.tokens)
+            self._stats.in_flight += 1
+            self._stats.admitted += 1
+            ticket.future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        loop = asyncio.get_running_loop()
+        self._wakeup = loop.call_later(delay, self._on_wakeup)
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._pump()
+
+
+class _TenantProvider(ProviderWrapper):
+    """Per-tenant view of a RateLimitedProvider."""
+
+    def __init__(self, limiter: RateLimitedProvider, tenant: str):
+        super().__init__(limiter.provider)
+        self.limiter = limiter
+        self.tenant = tenant
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        return await self.limiter._generate(self.tenant, prompt, max_tokens, temperature)
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        return await self.limiter._generate_chat(
+            self.tenant, messages, max_tokens, temperature, stable_prefix
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        async for chunk in self.limiter._stream(self.tenant, prompt, max_tokens):
+            yield chunk
+
+    async def close(self):
+        # The shared limiter owns the upstream provider.
+        pass
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.tenant!r}, {self.limiter!r})"
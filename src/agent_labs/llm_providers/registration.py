@@ -0,0 +1,92 @@
+"""
+agent_core plugin registering agent_labs providers.
+
+``register(registry)`` replaces agent_core's placeholder "mock", "ollama"
+and "openai" model providers with the agent_labs classes and adds the
+composite providers:
+- ``load_balanced``: LoadBalancedProvider over ``backends``
+- ``cascade``: FallbackCascadeProvider over ``tiers`` (fastest first)
+- ``usage_tracked``: UsageTrackingProvider enforcing a BudgetsConfig
+
+Backends, tiers and the tracked provider are provider instances or
+mappings naming another model_provider registration of the same registry:
+``{"provider": "ollama", "base_url": "http://gpu-1:11434"}``.
+
+It is exposed as the ``ai_agents.agent_core.plugins`` entry point for
+those keys, so agent_core loads it on first lookup without depending on
+agent_labs. It can also be called directly:
+
+    >>> register(get_global_registry())
+    >>> provider = get_global_registry().model_providers.get("load_balanced")(
+    ...     backends=[{"provider": "ollama", "base_url": url} for url in hosts]
+    ... )
+"""
+
+from functools import partial
+from typing import Any, List, Mapping, Sequence
+
+from .balancer import LoadBalancedProvider
+from .cascade import FallbackCascadeProvider
+from .mock import MockProvider
+from .ollama import OllamaProvider
+from .openai import OpenAIProvider
+from .usage import UsageTrackingProvider
+
+
+def register(registry: Any) -> None:
+    """Register agent_labs providers on an agent_core registry."""
+    providers = registry.model_providers
+    providers.register("mock", MockProvider)
+    providers.register("ollama", OllamaProvider)
+    providers.register("openai", OpenAIProvider)
+    providers.register("load_balanced", partial(load_balanced_provider, registry=providers))
+    providers.register("cascade", partial(cascade_provider, registry=providers))
+    providers.register("usage_tracked", partial(usage_tracked_provider, registry=providers))
+
+
+def build_providers(specs: Sequence[Any], registry: Any = None) -> List[Any]:
+    """Build providers from instances or mappings naming a ``registry`` key."""
+    providers = []
+    for spec in specs:
+        if isinstance(spec, Mapping):
+            if registry is None:
+                raise ValueError("Provider mappings need a model_provider registry")
+            config = dict(spec)
+            providers.append(registry.get(config.pop("provider"))(**config))
+        else:
+            providers.append(spec)
+    return providers
+
+
+def load_balanced_provider(
+    backends: Sequence[Any], registry: Any = None, **options: Any
+) -> LoadBalancedProvider:
+    """Build a LoadBalancedProvider; options go to its constructor."""
+    return LoadBalancedProvider(build_providers(backends, registry), **options)
+
+
+def cascade_provider(
+    tiers: Sequence[Any], registry: Any = None, **options: Any
+) -> FallbackCascadeProvider:
+    """Build a FallbackCascadeProvider (accept, mode, stagger_ms, ...)."""
+    return FallbackCascadeProvider(build_providers(tiers, registry), **options)
+
+
+def usage_tracked_provider(
+    provider: Any, budgets: Any = None, registry: Any = None, **options: Any
+) -> UsageTrackingProvider:
+    """
+    Wrap a provider in a UsageTrackingProvider.
+
+    ``budgets`` is a BudgetsConfig (or mapping); its ``max_total_tokens``
+    becomes the token budget. Remaining options go to UsageTrackingProvider
+    (tracker, prices, ...).
+    """
+    (provider,) = build_providers([provider], registry)
+    if budgets is not None:
+        if isinstance(budgets, Mapping):
+            max_total_tokens = budgets.get("max_total_tokens", 0)
+        else:
+            max_total_tokens = budgets.max_total_tokens
+        options.setdefault("max_total_tokens", max_total_tokens)
+    return UsageTrackingProvider(provider, **options)
@@ -0,0 +1,264 @@
+"""
+Simulated LLM provider for load testing.
+
+SimulatedProvider behaves like a real server under load without running a
+model:
+- latency = time to first token + completion tokens / token rate, with
+  configurable jitter;
+- a fixed number of concurrent slots (``capacity``); extra calls queue, and
+  calls beyond ``max_queue`` are rejected with a 429-style
+  ProviderRateLimitError;
+- injected failures (connection errors, timeouts, rate limits) at given rates.
+
+Every random draw comes from a generator seeded with (seed, prompt,
+occurrence), so a run is reproducible regardless of how concurrent calls
+interleave.
+
+Example:
+    >>> provider = SimulatedProvider(
+    ...     latency=LatencyModel(ttft_ms=200, tokens_per_second=40, jitter=0.2),
+    ...     capacity=4,
+    ...     rate_limit_rate=0.01,
+    ...     seed=7,
+    ... )
+    >>> response = await provider.generate("Hello")
+"""
+
+import asyncio
+import contextlib
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple, Union
+
+from .base import Provider, LLMResponse, Timings
+from .exceptions import ProviderConnectionError, ProviderRateLimitError, ProviderTimeoutError
+
+Responder = Callable[[str], str]
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Latency of a simulated call."""
+
+    ttft_ms: float = 200.0
+    """Median time to first token (prompt evaluation)."""
+
+    tokens_per_second: float = 50.0
+    """Generation speed."""
+
+    jitter: float = 0.0
+    """Spread of the lognormal TTFT/rate noise (sigma; 0 = deterministic)."""
+
+    prompt_ms_per_token: float = 0.0
+    """Extra TTFT per prompt token."""
+
+    def sample(self, rng: random.Random, prompt_tokens: int) -> Tuple[float, float]:
+        """Draw (ttft_ms, ms_per_token) for one call."""
+        ttft = (self.ttft_ms + self.prompt_ms_per_token * prompt_tokens) * self._noise(rng)
+        per_token = 1000.0 / (self.tokens_per_second * self._noise(rng))
+        return ttft, per_token
+
+    def _noise(self, rng: random.Random) -> float:
+        return math.exp(rng.gauss(0.0, self.jitter)) if self.jitter else 1.0
+
+
+@dataclass
+class SimulationStats:
+    """Counters for SimulatedProvider."""
+
+    calls: int = 0
+    completed: int = 0
+    rejected: int = 0
+    failures: Counter = field(default_factory=Counter)
+    max_in_flight: int = 0
+    max_queued: int = 0
+
+
+class SimulatedProvider(Provider):
+    """
+    Provider with modeled latency, capacity limits and failure injection.
+
+    Use it to load-test wrappers and the agent loop (see
+    agent_labs.evaluation.load) without a model server.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        completion_tokens: Union[int, Tuple[int, int]] = (20, 60),
+        responder: Optional[Responder] = None,
+        capacity: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        failure_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+        time_scale: float = 1.0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        clock: Callable[[], float] = time.perf_counter,
+        name: str = "simulated",
+    ):
+        """
+        Initialize SimulatedProvider.
+
+        Args:
+            latency: Latency model (default: LatencyModel())
+            completion_tokens: Completion length, fixed or a (min, max) range
+            responder: Maps a prompt to response text (overrides completion_tokens)
+            capacity: Concurrent calls served at once (None = unlimited)
+            max_queue: Calls allowed to wait for a slot; more are rejected with 429
+            failure_rate: Probability of a ProviderConnectionError
+            timeout_rate: Probability of a ProviderTimeoutError
+            rate_limit_rate: Probability of a ProviderRateLimitError
+            retry_after: retry_after of injected and capacity 429s
+            seed: Seed for all random draws
+            time_scale: Multiplier on simulated delays (e.g. 0.01 for fast tests)
+            sleep: Async sleep function (injectable for virtual time)
+            clock: Timer for queue time (use the same virtual time as sleep)
+            name: Model name reported in responses
+        """
+        if capacity is not None and capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if failure_rate + timeout_rate + rate_limit_rate > 1:
+            raise ValueError("failure, timeout and rate-limit rates must sum to at most 1")
+        self.latency = latency or LatencyModel()
+        self.completion_tokens = completion_tokens
+        self.responder = responder
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.failure_rate = failure_rate
+        self.timeout_rate = timeout_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.time_scale = time_scale
+        self.name = name
+        self._sleep = sleep
+        self._clock = clock
+        self._slots = asyncio.Semaphore(capacity) if capacity is not None else None
+        self._occurrences: Counter = Counter()
+        self._in_flight = 0
+        self._queued = 0
+        self.stats = SimulationStats()
+
+    @property
+    def model(self) -> str:
+        return self.name
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        chunks = []
+        timings = Timings()
+        async with contextlib.aclosing(self._simulate(prompt, max_tokens, timings)) as simulation:
+            async for chunk in simulation:
+                chunks.append(chunk)
+        text = "".join(chunks)
+        completion = len(text.split())
+        return LLMResponse(
+            text=text,
+            tokens_used=completion,
+            model=self.name,
+            prompt_tokens=await self.count_tokens(prompt),
+            completion_tokens=completion,
+            timings=timings,
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        # Closing the stream early closes the simulation, freeing its slot.
+        async with contextlib.aclosing(self._simulate(prompt, max_tokens, Timings())) as simulation:
+            async for chunk in simulation:
+                yield chunk
+
+    async def count_tokens(self, text: str) -> int:
+        """Count tokens (~1 token per word, like MockProvider)."""
+        return len(text.split()) if text else 0
+
+    async def _simulate(
+        self, prompt: str, max_tokens: int, timings: Timings
+    ) -> AsyncIterator[str]:
+        self.stats.calls += 1
+        rng = self._rng(prompt)
+        start = self._clock()
+        await self._acquire()
+        timings.queue_ms = (self._clock() - start) * 1000
+        self._in_flight += 1
+        self.stats.max_in_flight = max(self.stats.max_in_flight, self._in_flight)
+        try:
+            words = self._words(prompt, rng)[:max_tokens]
+            ttft_ms, per_token_ms = self.latency.sample(rng, await self.count_tokens(prompt))
+            self._inject_failure(rng)
+            await self._delay(ttft_ms)
+            timings.ttft_ms = ttft_ms
+            timings.prompt_eval_ms = ttft_ms
+            for index, word in enumerate(words):
+                if index:
+                    await self._delay(per_token_ms)
+                yield word if index == len(words) - 1 else word + " "
+            timings.eval_ms = per_token_ms * max(0, len(words) - 1)
+            self.stats.completed += 1
+        finally:
+            self._in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    async def _acquire(self) -> None:
+        if self._slots is None:
+            return
+        if self._slots.locked():
+            if self.max_queue is not None and self._queued >= self.max_queue:
+                self.stats.rejected += 1
+                raise ProviderRateLimitError(
+                    "Simulated server at capacity", retry_after=self.retry_after
+                )
+            self._queued += 1
+            self.stats.max_queued = max(self.stats.max_queued, self._queued)
+            try:
+                await self._slots.acquire()
+            finally:
+                self._queued -= 1
+        else:
+            await self._slots.acquire()
+
+    def _inject_failure(self, rng: random.Random) -> None:
+        roll = rng.random()
+        if roll < self.failure_rate:
+            self.stats.failures["connection"] += 1
+            raise ProviderConnectionError("Simulated connection failure")
+        roll -= self.failure_rate
+        if roll < self.timeout_rate:
+            self.stats.failures["timeout"] += 1
+            raise ProviderTimeoutError("Simulated timeout")
+        roll -= self.timeout_rate
+        if roll < self.rate_limit_rate:
+            self.stats.failures["rate_limit"] += 1
+            raise ProviderRateLimitError("Simulated rate limit", retry_after=self.retry_after)
+
+    def _words(self, prompt: str, rng: random.Random) -> list:
+        if self.responder is not None:
+            return self.responder(prompt).split()
+        if isinstance(self.completion_tokens, int):
+            count = self.completion_tokens
+        else:
+            count = rng.randint(*self.completion_tokens)
+        return [f"tok{rng.randrange(1000)}" for _ in range(count)]
+
+    def _rng(self, prompt: str) -> random.Random:
+        occurrence = self._occurrences[prompt]
+        self._occurrences[prompt] += 1
+        return random.Random(f"{self.seed}:{occurrence}:{prompt}")
+
+    async def _delay(self, ms: float) -> None:
+        if ms > 0 and self.time_scale > 0:
+            await self._sleep(ms / 1000 * self.time_scale)
@@ -0,0 +1,218 @@
+"""
+Shared tokenizer service.
+
+Tokenizer counts tokens with the model's BPE encoding when tiktoken is
+installed and knows the model; encodings are loaded once per model and
+reused. Otherwise it falls back to a heuristic calibrated against
+cl100k_base on English prose (roughly one token per short word, number
+group or punctuation mark, more for long words and non-ASCII text). The
+heuristic can be re-calibrated per model from exact counts, e.g. the
+prompt token counts a server reports.
+
+Counts are memoized in a bounded LRU, so repeated strings (system
+prompts, history entries re-checked every turn) cost one dict lookup.
+
+Example:
+    >>> tokenizer = get_tokenizer()
+    >>> tokenizer.count("Hello, world!", model="gpt-4")
+    4
+    >>> tokenizer.count_batch(["one", "two three"])
+    [1, 2]
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Pieces the heuristic counts: ASCII words, digit groups (cl100k splits
+# numbers into groups of up to 3), single non-ASCII characters, punctuation.
+_PIECES = re.compile(r"[A-Za-z]+|\d{1,3}|[^\x00-\x7f]|[^\sA-Za-z\d]")
+
+# Texts longer than this are memoized by digest rather than by value.
+_MAX_KEY_CHARS = 1024
+
+_UNSET = object()
+
+
+def heuristic_count(text: str) -> float:
+    """Uncalibrated heuristic token estimate."""
+    total = 0
+    for piece in _PIECES.findall(text):
+        if len(piece) > 7 and piece.isalpha():
+            total += 1 + (len(piece) - 1) // 7
+        else:
+            total += 1
+    return float(total)
+
+
+class Tokenizer:
+    """Cached, model-aware token counting."""
+
+    def __init__(self, cache_size: int = 8192):
+        """
+        Initialize Tokenizer.
+
+        Args:
+            cache_size: Maximum memoized (model, text) counts
+        """
+        self.cache_size = cache_size
+        self._encodings: Dict[Optional[str], Any] = {}
+        self._scales: Dict[Optional[str], float] = {}
+        self._counts: "OrderedDict[Tuple[Optional[str], Any], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encoding_for(self, model: Optional[str] = None) -> Any:
+        """
+        BPE encoding for ``model`` (cached), or None when unavailable.
+
+        ``model=None`` selects cl100k_base. Unknown non-OpenAI models
+        (e.g. Ollama's llama2) get None and use the heuristic.
+        """
+        encoding = self._encodings.get(model, _UNSET)
+        if encoding is _UNSET:
+            encoding = self._load_encoding(model)
+            self._encodings[model] = encoding
+        return encoding
+
+    def is_exact(self, model: Optional[str] = None) -> bool:
+        """Whether counts for ``model`` come from a real encoding."""
+        return self.encoding_for(model) is not None
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Count tokens in ``text`` for ``model``."""
+        if not text:
+            return 0
+        key = (model, _key_text(text))
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        count = self._count_uncached(text, model)
+        self._remember(key, count)
+        return count
+
+    def count_batch(self, texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+        """Count tokens for many texts, encoding the uncached ones in one batch."""
+        results: List[Optional[int]] = [None] * len(texts)
+        missing: List[int] = []
+        with self._lock:
+            for index, text in enumerate(texts):
+                if not text:
+                    results[index] = 0
+                    continue
+                cached = self._counts.get((model, _key_text(text)))
+                if cached is None:
+                    missing.append(index)
+                else:
+                    results[index] = cached
+                    self.hits += 1
+            self.misses += len(missing)
+
+        if missing:
+            encoding = self.encoding_for(model)
+            batch = [texts[index] for index in missing]
+            if encoding is not None:
+                encoded = encoding.encode_batch(batch, disallowed_special=())
+                counts = [len(tokens) for tokens in encoded]
+            else:
+                counts = [self._estimate(text, model) for text in batch]
+            for index, count in zip(missing, counts):
+                results[index] = count
+                self._remember((model, _key_text(texts[index])), count)
+        return results  # type: ignore[return-value]
+
+    def calibrate(
+        self,
+        samples: Sequence[str],
+        counts: Optional[Sequence[int]] = None,
+        model: Optional[str] = None,
+    ) -> float:
+        """
+        Fit the heuristic's scale for ``model`` and return it.
+
+        Args:
+            samples: Representative texts
+            counts: Exact token counts for ``samples`` (default: from the encoding)
+            model: Model whose heuristic is calibrated
+        """
+        if counts is None:
+            encoding = self.encoding_for(model) or self.encoding_for(None)
+            if encoding is None:
+                raise ValueError("counts are required when no encoding is available")
+            counts = [len(encoding.encode(text, disallowed_special=())) for text in samples]
+        estimated = sum(heuristic_count(text) for text in samples)
+        if not estimated:
+            raise ValueError("samples contain no tokens")
+        scale = sum(counts) / estimated
+        self._scales[model] = scale
+        with self._lock:
+            for key in [key for key in self._counts if key[0] == model]:
+                del self._counts[key]
+        return scale
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self.hits = self.misses = 0
+
+    def _count_uncached(self, text: str, model: Optional[str]) -> int:
+        encoding = self.encoding_for(model)
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        return self._estimate(text, model)
+
+    def _estimate(self, text: str, model: Optional[str]) -> int:
+        return max(1, math.ceil(heuristic_count(text) * self._scales.get(model, 1.0)))
+
+    def _remember(self, key, count: int) -> None:
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+
+    @staticmethod
+    def _load_encoding(model: Optional[str]) -> Any:
+        try:
+            import tiktoken
+        except ImportError:
+            return None
+        try:
+            if model is None:
+                return tiktoken.get_encoding(DEFAULT_ENCODING)
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Newer OpenAI-style models share cl100k; others have their own vocabularies.
+            if model.startswith(("gpt-", "o1", "o3", "text-embedding")):
+                return tiktoken.get_encoding(DEFAULT_ENCODING)
+            return None
+        except Exception:
+            # Encoding files could not be fetched (offline).
+            return None
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _key_text(text: str) -> Any:
+    return text if len(text) <= _MAX_KEY_CHARS else _digest(text)
+
+
+_TOKENIZER = Tokenizer()
+
+
+def get_tokenizer() -> Tokenizer:
+    """The process-wide tokenizer service."""
+    return _TOKENIZER
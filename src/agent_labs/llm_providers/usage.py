@@ -0,0 +1,303 @@
+"""
+Usage accounting for provider calls.
+
+UsageTracker aggregates token usage, cost and latency breakdowns
+(queueing, prompt evaluation, generation, time to first token) across
+calls, and optionally enforces a total-token budget such as
+``BudgetsConfig.max_total_tokens``. UsageTrackingProvider records every
+call of the provider it wraps.
+
+Example:
+    >>> tracker = UsageTracker(
+    ...     max_total_tokens=config.policies.budgets.max_total_tokens,
+    ...     prices={"gpt-4o-mini": (0.00015, 0.0006)},
+    ... )
+    >>> provider = UsageTrackingProvider(OpenAIProvider(...), tracker=tracker)
+    >>> await provider.generate("Hello")
+    >>> tracker.summary().to_dict()
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .base import Provider, LLMResponse, MessageLike, Timings, render_messages
+from .exceptions import TokenLimitExceededError
+from ..stats import percentile
+from .wrapper import ProviderWrapper, model_name
+
+# Timings fields summarized as percentiles.
+TIMING_FIELDS = ("latency_ms", "ttft_ms", "queue_ms", "prompt_eval_ms", "eval_ms")
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class UsageRecord:
+    """Usage of a single call."""
+
+    model: Optional[str]
+    prompt_tokens: int
+    completion_tokens: int
+    timings: Timings
+    cost: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class UsageSummary:
+    """Aggregated usage across recorded calls."""
+
+    calls: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    latency: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    """Percentiles per timing field, e.g. ``latency["ttft_ms"]["p95"]``."""
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cost": self.cost,
+            "latency": {name: dict(values) for name, values in self.latency.items()},
+        }
+
+
+class UsageTracker:
+    """Aggregate usage records and enforce a token budget."""
+
+    def __init__(
+        self,
+        max_total_tokens: int = 0,
+        prices: Optional[Mapping[str, Tuple[float, float]]] = None,
+        window: int = 1000,
+    ):
+        """
+        Initialize UsageTracker.
+
+        Args:
+            max_total_tokens: Token budget across all calls (0 = unlimited)
+            prices: Per-model (prompt, completion) price per 1K tokens
+            window: Recent calls kept for latency percentiles
+        """
+        if max_total_tokens < 0:
+            raise ValueError("max_total_tokens cannot be negative")
+        self.max_total_tokens = max_total_tokens
+        self.prices = dict(prices or {})
+        self._records: Deque[UsageRecord] = deque(maxlen=window)
+        self._summary = UsageSummary()
+
+    @property
+    def total_tokens(self) -> int:
+        return self._summary.total_tokens
+
+    @property
+    def remaining_tokens(self) -> Optional[int]:
+        """Tokens left in the budget, or None when unlimited."""
+        if not self.max_total_tokens:
+            return None
+        return max(0, self.max_total_tokens - self.total_tokens)
+
+    def check_budget(self) -> None:
+        """Raise TokenLimitExceededError once the budget is spent."""
+        if self.max_total_tokens and self.total_tokens >= self.max_total_tokens:
+            raise TokenLimitExceededError(
+                f"Token budget exhausted: {self.total_tokens} of "
+                f"{self.max_total_tokens} tokens used"
+            )
+
+    def record(self, record: UsageRecord) -> UsageRecord:
+        """Add a call's usage (cost is filled in from ``prices``)."""
+        if not record.cost and record.model in self.prices:
+            prompt_price, completion_price = self.prices[record.model]
+            cost = (
+                record.prompt_tokens * prompt_price + record.completion_tokens * completion_price
+            ) / 1000
+            record = replace(record, cost=cost)
+        summary = self._summary
+        summary.calls += 1
+        summary.errors += record.error is not None
+        summary.prompt_tokens += record.prompt_tokens
+        summary.completion_tokens += record.completion_tokens
+        summary.cost += record.cost
+        self._records.append(record)
+        return record
+
+    def records(self) -> List[UsageRecord]:
+        return list(self._records)
+
+    def summary(self) -> UsageSummary:
+        """Totals plus p50/p95/p99 of each timing over the recent window."""
+        latency: Dict[str, Dict[str, float]] = {}
+        for name in TIMING_FIELDS:
+            samples = [
+                value
+                for value in (getattr(record.timings, name) for record in self._records)
+                if value is not None
+            ]
+            if samples:
+                latency[name] = {f"p{pct}": percentile(samples, pct) for pct in PERCENTILES}
+        return replace(self._summary, latency=latency)
+
+    def reset(self) -> None:
+        self._records.clear()
+        self._summary = UsageSummary()
+
+
+class UsageTrackingProvider(ProviderWrapper):
+    """
+    Record usage of every call and refuse calls once the budget is spent.
+
+    Providers that don't report prompt/completion tokens are counted with
+    the wrapped provider's count_tokens.
+    """
+
+    def __init__(
+        self,
+        provider: Provider,
+        tracker: Optional[UsageTracker] = None,
+        max_total_tokens: int = 0,
+        prices: Optional[Mapping[str, Tuple[float, float]]] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """
+        Initialize UsageTrackingProvider.
+
+        Args:
+            provider: Provider to wrap
+            tracker: Shared tracker (default: a new one from the options below)
+            max_total_tokens: Token budget when no tracker is given (0 = unlimited)
+            prices: Per-model (prompt, completion) price per 1K tokens
+            clock: Timer for latency (injectable for tests)
+        """
+        super().__init__(provider)
+        self.tracker = tracker or UsageTracker(max_total_tokens=max_total_tokens, prices=prices)
+        self._clock = clock
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        return await self._track(
+            prompt,
+            lambda: self.provider.generate(prompt, max_tokens=max_tokens, temperature=temperature),
+        )
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        return await self._track(
+            render_messages(messages),
+            lambda: self.provider.generate_chat(
+                messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stable_prefix=stable_prefix,
+            ),
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        self.tracker.check_budget()
+        start = self._clock()
+        ttft_ms = None
+        chunks: List[str] = []
+        try:
+            async for chunk in self.provider.stream(prompt, max_tokens=max_tokens):
+                if ttft_ms is None:
+                    ttft_ms = (self._clock() - start) * 1000
+                chunks.append(chunk)
+                yield chunk
+        except Exception as exc:
+            self._record_error(exc, start)
+            raise
+        timings = Timings(latency_ms=(self._clock() - start) * 1000, ttft_ms=ttft_ms)
+        self.tracker.record(
+            UsageRecord(
+                model=model_name(self.provider),
+                prompt_tokens=await self.provider.count_tokens(prompt),
+                completion_tokens=await self.provider.count_tokens("".join(chunks)),
+                timings=timings,
+            )
+        )
+
+    async def _track(self, prompt: str, call: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        self.tracker.check_budget()
+        start = self._clock()
+        try:
+            response = await call()
+        except Exception as exc:
+            self._record_error(exc, start)
+            raise
+        timings = replace(response.timings, latency_ms=(self._clock() - start) * 1000)
+        if timings.ttft_ms is None:
+            # Without streaming, the first token arrives with the whole response.
+            timings.ttft_ms = timings.latency_ms
+        prompt_tokens = response.prompt_tokens
+        if prompt_tokens is None:
+            prompt_tokens = await self.provider.count_tokens(prompt)
+        completion_tokens = response.completion_tokens
+        if completion_tokens is None:
+            completion_tokens = response.tokens_used
+            if response.prompt_tokens is not None:
+                # tokens_used is the total for some backends (e.g. OpenAI).
+                completion_tokens = max(0, response.tokens_used - response.prompt_tokens)
+        self.tracker.record(
+            UsageRecord(
+                model=response.model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                timings=timings,
+            )
+        )
+        return replace(
+            response,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            timings=timings,
+        )
+
+    def _record_error(self, exc: Exception, start: float) -> None:
+        self.tracker.record(
+            UsageRecord(
+                model=model_name(self.provider),
+                prompt_tokens=0,
+                completion_tokens=0,
+                timings=Timings(latency_ms=(self._clock() - start) * 1000),
+                error=type(exc).__name__,
+            )
+        )
@@ -0,0 +1,72 @@
+"""
+Base class for providers that decorate another provider.
+
+Wrappers (caching, rate limiting, load balancing, ...) subclass
+ProviderWrapper and override only the calls they change; everything else
+is delegated to the wrapped provider.
+"""
+
+from typing import AsyncIterator, Optional, Sequence
+
+from .base import Provider, LLMResponse, MessageLike
+
+
+def model_name(provider: Provider) -> Optional[str]:
+    """Best-effort model identifier for a provider (``model`` or ``name``)."""
+    return getattr(provider, "model", None) or getattr(provider, "name", None)
+
+
+class ProviderWrapper(Provider):
+    """Provider that delegates every call to ``self.provider``."""
+
+    def __init__(self, provider: Provider):
+        self.provider = provider
+
+    @property
+    def model(self) -> Optional[str]:
+        return model_name(self.provider)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        return await self.provider.generate(prompt, max_tokens=max_tokens, temperature=temperature)
+
+    async def generate_chat(
+        self,
+        messages: Sequence[MessageLike],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        stable_prefix: int = 0,
+    ) -> LLMResponse:
+        return await self.provider.generate_chat(
+            messages, max_tokens=max_tokens, temperature=temperature, stable_prefix=stable_prefix
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+    ) -> AsyncIterator[str]:
+        async for chunk in self.provider.stream(prompt, max_tokens=max_tokens):
+            yield chunk
+
+    async def count_tokens(self, text: str) -> int:
+        return await self.provider.count_tokens(text)
+
+    async def close(self):
+        """Close the wrapped provider if it supports closing."""
+        close = getattr(self.provider, "close", None)
+        if close is not None:
+            await close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.provider!r})"
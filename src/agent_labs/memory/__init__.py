@@ -1,10 +1,25 @@
 """Memory systems for agent_labs."""
 
 from .base import Memory, MemoryItem
+from .compact import CompactMemoryItem, EmbeddingArena
 from .short_term import ShortTermMemory
 from .long_term import LongTermMemory, sqlite_backend
 from .rag import RAGMemory
 from .manager import MemoryManager
+from .consolidation import (
+    ConsolidationPolicy,
+    ConsolidationReport,
+    MemoryConsolidator,
+    estimate_item_bytes,
+)
+from .sessions import SessionMemoryService, SessionStats
+from .snapshot import (
+    SnapshotFormatError,
+    SnapshotWriter,
+    load_snapshots,
+    manager_tiers,
+    restore_manager,
+)
 from .storage import (
     StorageBackend,
     InMemoryStorage,
@@ -16,10 +31,23 @@ from .storage import (
 __all__ = [
     "Memory",
     "MemoryItem",
+    "CompactMemoryItem",
+    "EmbeddingArena",
     "ShortTermMemory",
     "LongTermMemory",
     "RAGMemory",
     "MemoryManager",
+    "ConsolidationPolicy",
+    "ConsolidationReport",
+    "MemoryConsolidator",
+    "estimate_item_bytes",
+    "SessionMemoryService",
+    "SessionStats",
+    "SnapshotFormatError",
+    "SnapshotWriter",
+    "load_snapshots",
+    "manager_tiers",
+    "restore_manager",
     "StorageBackend",
     "InMemoryStorage",
     "SqliteStorage",
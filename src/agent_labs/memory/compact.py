@@ -0,0 +1,295 @@
+"""
+Compact memory item representation for large memory stores.
+
+CompactMemoryItem mirrors the public MemoryItem API (content, timestamp,
+metadata, embedding, to_dict) but stores:
+- timestamps as epoch floats (UTC)
+- embeddings as float32 slices of a shared EmbeddingArena
+- metadata as raw JSON bytes until first access
+
+Embeddings round-trip through float32, so values lose precision beyond
+~7 significant digits. RAGMemory(compact=True) stores its items this way.
+"""
+
+from __future__ import annotations
+
+import json
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .base import MemoryItem
+
+
+def to_epoch(value: datetime) -> float:
+    """Convert a datetime (naive values are treated as UTC) to epoch seconds."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def from_epoch(value: float) -> datetime:
+    """Convert epoch seconds to a naive UTC datetime (matches MemoryItem)."""
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+class EmbeddingArena:
+    """Shared float32 storage for embeddings, addressed by offset.
+
+    Storage is split into fixed-size blocks that are never resized, so
+    memoryviews returned by ``view`` stay valid while new vectors are added.
+    Released slots are reused by later vectors of the same dimension.
+    """
+
+    __slots__ = ("_block_size", "_blocks", "_used", "_free")
+
+    def __init__(self, block_size: int = 1 << 16) -> None:
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self._block_size = block_size
+        self._blocks: List[array] = []
+        self._used = 0
+        self._free: Dict[int, List[int]] = {}
+
+    @property
+    def block_size(self) -> int:
+        return self._block_size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated for embedding storage."""
+        return sum(len(block) * block.itemsize for block in self._blocks)
+
+    def __len__(self) -> int:
+        """Number of float slots handed out (including padding)."""
+        return self._used
+
+    def add(self, values: Sequence[float]) -> int:
+        """Copy a vector into the arena and return its offset."""
+        dim = len(values)
+        if dim == 0:
+            # Empty vectors take no space; any in-range offset addresses them.
+            return self._used
+        free = self._free.get(dim)
+        if free:
+            offset = free.pop()
+            self.write(offset, values)
+            return offset
+        if dim > self._block_size:
+            raise ValueError(f"embedding dim {dim} exceeds arena block_size {self._block_size}")
+        capacity = len(self._blocks) * self._block_size
+        if self._used + dim > capacity:
+            # Vectors never straddle blocks: pad to the next block boundary.
+            self._used = capacity
+            self._blocks.append(array("f", bytes(4 * self._block_size)))
+        index, pos = divmod(self._used, self._block_size)
+        self._blocks[index][pos:pos + dim] = array("f", values)
+        offset = self._used
+        self._used += dim
+        return offset
+
+    def release(self, offset: int, dim: int) -> None:
+        """Return a vector's slot for reuse; views of it may be overwritten."""
+        if dim > 0:
+            self._locate(offset, dim)
+            self._free.setdefault(dim, []).append(offset)
+
+    def write(self, offset: int, values: Sequence[float]) -> None:
+        """Overwrite a vector in place (dimension must match the original)."""
+        if not values:
+            return
+        block, pos = self._locate(offset, len(values))
+        block[pos:pos + len(values)] = array("f", values)
+
+    def get(self, offset: int, dim: int) -> List[float]:
+        if dim == 0:
+            return []
+        block, pos = self._locate(offset, dim)
+        return block[pos:pos + dim].tolist()
+
+    def view(self, offset: int, dim: int) -> memoryview:
+        """Zero-copy float32 view of a stored vector."""
+        if dim == 0:
+            return memoryview(array("f"))
+        block, pos = self._locate(offset, dim)
+        return memoryview(block)[pos:pos + dim]
+
+    def buffers(self) -> Iterator[memoryview]:
+        """Zero-copy views over the used portion of each block."""
+        remaining = self._used
+        for block in self._blocks:
+            size = min(remaining, self._block_size)
+            yield memoryview(block)[:size]
+            remaining -= size
+
+    def tobytes(self) -> bytes:
+        return b"".join(view.tobytes() for view in self.buffers())
+
+    @classmethod
+    def frombytes(cls, data: bytes, block_size: int = 1 << 16) -> "EmbeddingArena":
+        """Rebuild an arena from ``tobytes`` output (offsets are preserved)."""
+        arena = cls(block_size=block_size)
+        floats = array("f")
+        floats.frombytes(data)
+        for start in range(0, len(floats), block_size):
+            block = array("f", bytes(4 * block_size))
+            chunk = floats[start:start + block_size]
+            block[:len(chunk)] = chunk
+            arena._blocks.append(block)
+        arena._used = len(floats)
+        return arena
+
+    def _locate(self, offset: int, dim: int) -> Tuple[array, int]:
+        index, pos = divmod(offset, self._block_size)
+        if offset < 0 or offset + dim > self._used or pos + dim > self._block_size:
+            raise IndexError(f"embedding slice [{offset}:{offset + dim}] out of range")
+        return self._blocks[index], pos
+
+
+class CompactMemoryItem:
+    """Slotted, arena-backed equivalent of MemoryItem.
+
+    Example:
+        >>> arena = EmbeddingArena()
+        >>> item = CompactMemoryItem.from_item(MemoryItem(content="hi", embedding=[0.1]), arena)
+        >>> item.embedding_view().tobytes()  # no list materialization
+    """
+
+    __slots__ = ("content", "epoch", "_metadata", "_metadata_raw", "_arena", "_offset", "_dim")
+
+    def __init__(
+        self,
+        content: str,
+        epoch: float,
+        metadata: Optional[Dict[str, Any]] = None,
+        metadata_raw: Optional[bytes] = None,
+        arena: Optional[EmbeddingArena] = None,
+        offset: int = -1,
+        dim: int = 0,
+    ) -> None:
+        self.content = content
+        self.epoch = epoch
+        self._metadata = metadata or None
+        self._metadata_raw = metadata_raw if metadata is None else None
+        self._arena = arena
+        self._offset = offset
+        self._dim = dim
+
+    @classmethod
+    def from_item(cls, item: MemoryItem, arena: EmbeddingArena) -> "CompactMemoryItem":
+        offset, dim = -1, 0
+        if item.embedding is not None:
+            offset, dim = arena.add(item.embedding), len(item.embedding)
+        return cls(
+            content=item.content,
+            epoch=to_epoch(item.timestamp),
+            metadata=dict(item.metadata) if item.metadata else None,
+            arena=arena,
+            offset=offset,
+            dim=dim,
+        )
+
+    @classmethod
+    def from_record(
+        cls, record: Tuple[str, float, Optional[bytes], int, int], arena: EmbeddingArena
+    ) -> "CompactMemoryItem":
+        """Rebuild an item from ``to_record`` output; metadata stays undecoded."""
+        content, epoch, metadata_raw, offset, dim = record
+        return cls(
+            content=content,
+            epoch=epoch,
+            metadata_raw=metadata_raw,
+            arena=arena,
+            offset=offset,
+            dim=dim,
+        )
+
+    @property
+    def timestamp(self) -> datetime:
+        return from_epoch(self.epoch)
+
+    @timestamp.setter
+    def timestamp(self, value: datetime) -> None:
+        self.epoch = to_epoch(value)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Metadata dict, decoded from raw JSON on first access."""
+        if self._metadata is None:
+            raw = self._metadata_raw
+            self._metadata = json.loads(raw) if raw else {}
+            self._metadata_raw = None
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        self._metadata = value
+        self._metadata_raw = None
+
+    @property
+    def has_embedding(self) -> bool:
+        """Whether an embedding is set (an empty one counts; None does not)."""
+        return self._offset >= 0 and self._arena is not None
+
+    @property
+    def embedding(self) -> Optional[List[float]]:
+        if not self.has_embedding:
+            return None
+        return self._arena.get(self._offset, self._dim)
+
+    @embedding.setter
+    def embedding(self, value: Optional[Sequence[float]]) -> None:
+        if self.has_embedding and value is not None and len(value) == self._dim:
+            self._arena.write(self._offset, value)
+            return
+        self.release_embedding()
+        if value is None:
+            return
+        if self._arena is None:
+            self._arena = EmbeddingArena()
+        self._offset, self._dim = self._arena.add(value), len(value)
+
+    def release_embedding(self) -> None:
+        """Drop the embedding and give its arena slot back for reuse."""
+        if self.has_embedding:
+            self._arena.release(self._offset, self._dim)
+        self._offset, self._dim = -1, 0
+
+    def embedding_view(self) -> Optional[memoryview]:
+        """Zero-copy float32 view of the embedding."""
+        if not self.has_embedding:
+            return None
+        return self._arena.view(self._offset, self._dim)
+
+    def metadata_bytes(self) -> Optional[bytes]:
+        """Metadata as JSON bytes, reusing the raw form when never decoded."""
+        if self._metadata is None:
+            return self._metadata_raw
+        return json.dumps(self._metadata, default=str).encode("utf-8")
+
+    def to_record(self) -> Tuple[str, float, Optional[bytes], int, int]:
+        """Flat tuple for serialization; embeddings stay in the shared arena."""
+        return (self.content, self.epoch, self.metadata_bytes(), self._offset, self._dim)
+
+    def to_item(self) -> MemoryItem:
+        return MemoryItem(
+            content=self.content,
+            timestamp=self.timestamp,
+            metadata=self.metadata,
+            embedding=self.embedding,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the same dictionary shape as MemoryItem.to_dict()."""
+        return {
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat(),
+            "metadata": self.metadata,
+            "embedding": self.embedding,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactMemoryItem(content={self.content!r}, epoch={self.epoch}, "
+            f"dim={self._dim})"
+        )
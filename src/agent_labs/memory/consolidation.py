@@ -0,0 +1,314 @@
+"""
+Memory consolidation for long-running agents.
+
+Consolidation keeps memory tiers bounded over time:
+- Aged short-term items are summarized into a single long-term fact
+- Duplicate long-term/RAG items are merged: by embedding similarity when an
+  embedder is given, otherwise by normalized content (case, punctuation and
+  whitespace ignored), since mock embeddings can't tell unrelated texts apart
+- Long-term items expire by TTL or decayed importance
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .base import MemoryItem
+from .rag import RAGMemory
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from .manager import MemoryManager
+
+
+Embedder = Callable[[str], List[float]]
+Summarizer = Callable[[Sequence[MemoryItem]], str]
+
+
+def estimate_item_bytes(item: MemoryItem) -> int:
+    """Approximate serialized size of a memory item in bytes."""
+    size = len(item.content.encode("utf-8"))
+    if item.metadata:
+        size += len(json.dumps(item.metadata, default=str).encode("utf-8"))
+    if item.embedding:
+        size += 8 * len(item.embedding)
+    return size
+
+
+def normalize_content(text: str) -> str:
+    """Content key for embedder-less dedupe: lowercase words, punctuation dropped."""
+    return " ".join(re.findall(r"\w+", text.casefold()))
+
+
+def join_summarizer(items: Sequence[MemoryItem], max_chars: int = 500) -> str:
+    """Deterministic summarizer: join unique contents in order, truncated."""
+    seen: Set[str] = set()
+    parts: List[str] = []
+    for item in items:
+        text = item.content.strip()
+        if text and text not in seen:
+            seen.add(text)
+            parts.append(text)
+    summary = "; ".join(parts)
+    return summary[:max_chars]
+
+
+@dataclass
+class ConsolidationPolicy:
+    """Thresholds controlling consolidation behavior (all ages in seconds)."""
+
+    similarity_threshold: float = 0.99
+    promote_after_seconds: float = 3600.0
+    min_items_to_promote: int = 1
+    ttl_seconds: Optional[float] = None
+    decay_half_life_seconds: Optional[float] = None
+    min_decayed_score: float = 0.05
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.similarity_threshold <= 1.0:
+            raise ValueError("similarity_threshold must be in (0, 1]")
+        if self.promote_after_seconds < 0:
+            raise ValueError("promote_after_seconds must be non-negative")
+        if self.min_items_to_promote <= 0:
+            raise ValueError("min_items_to_promote must be positive")
+        if self.ttl_seconds is not None and self.ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if self.decay_half_life_seconds is not None and self.decay_half_life_seconds <= 0:
+            raise ValueError("decay_half_life_seconds must be positive")
+
+
+@dataclass
+class ConsolidationReport:
+    """Outcome of a consolidation pass."""
+
+    promoted: int = 0
+    merged: int = 0
+    evicted: int = 0
+    bytes_reclaimed: int = 0
+    duration_ms: float = 0.0
+    details: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "promoted": self.promoted,
+            "merged": self.merged,
+            "evicted": self.evicted,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "duration_ms": self.duration_ms,
+            "details": dict(self.details),
+        }
+
+
+class MemoryConsolidator:
+    """Merge, summarize, and evict memories across tiers.
+
+    Example:
+        >>> consolidator = MemoryConsolidator(ConsolidationPolicy(ttl_seconds=86400))
+        >>> report = consolidator.consolidate(manager)
+        >>> print(report.bytes_reclaimed)
+    """
+
+    def __init__(
+        self,
+        policy: Optional[ConsolidationPolicy] = None,
+        embedder: Optional[Embedder] = None,
+        summarizer: Optional[Summarizer] = None,
+        interval_seconds: float = 0.0,
+    ) -> None:
+        if interval_seconds < 0:
+            raise ValueError("interval_seconds must be non-negative")
+        self.policy = policy or ConsolidationPolicy()
+        self.embedder = embedder
+        self.summarizer = summarizer or join_summarizer
+        self.interval_seconds = interval_seconds
+        self._last_run: Optional[float] = None
+
+    def due(self) -> bool:
+        """Return True when the configured interval has elapsed."""
+        if self._last_run is None:
+            return True
+        return time.monotonic() - self._last_run >= self.interval_seconds
+
+    def maybe_consolidate(
+        self, manager: "MemoryManager", now: Optional[datetime] = None
+    ) -> Optional[ConsolidationReport]:
+        """Run consolidation only if the interval has elapsed."""
+        if not self.due():
+            return None
+        return self.consolidate(manager, now=now)
+
+    def consolidate(
+        self, manager: "MemoryManager", now: Optional[datetime] = None
+    ) -> ConsolidationReport:
+        """Run a full consolidation pass over all tiers of a manager."""
+        start = time.perf_counter()
+        now = now or datetime.utcnow()
+        embed = self.embedder
+        report = ConsolidationReport()
+
+        self._promote_aged(manager, now, report)
+        self._evict_expired(manager, now, report)
+        self._merge_long_term(manager, embed, report)
+        self._merge_rag(manager, embed, report)
+
+        self._last_run = time.monotonic()
+        report.duration_ms = (time.perf_counter() - start) * 1000
+        return report
+
+    def decayed_score(self, item: MemoryItem, now: datetime) -> float:
+        """Importance decayed exponentially by age."""
+        importance = float(item.metadata.get("importance", item.metadata.get("confidence", 1.0)))
+        if self.policy.decay_half_life_seconds is None:
+            return importance
+        age = max(0.0, (now - item.timestamp).total_seconds())
+        return importance * 0.5 ** (age / self.policy.decay_half_life_seconds)
+
+    def _promote_aged(
+        self, manager: "MemoryManager", now: datetime, report: ConsolidationReport
+    ) -> None:
+        threshold = self.policy.promote_after_seconds
+
+        def is_aged(item: MemoryItem) -> bool:
+            return (now - item.timestamp).total_seconds() >= threshold
+
+        aged = [item for item in manager.short_term.retrieve() if is_aged(item)]
+        if len(aged) < self.policy.min_items_to_promote:
+            return
+
+        aged_ids = {id(item) for item in aged}
+        manager.short_term.evict(lambda item: id(item) in aged_ids)
+        summary = MemoryItem(
+            content=self.summarizer(aged),
+            timestamp=max(item.timestamp for item in aged),
+            metadata={"type": "consolidated", "source_count": len(aged)},
+        )
+        manager.store_long(summary)
+
+        reclaimed = sum(estimate_item_bytes(item) for item in aged) - estimate_item_bytes(summary)
+        report.promoted += len(aged)
+        report.bytes_reclaimed += max(0, reclaimed)
+        report.details["short_term_promoted"] = len(aged)
+
+    def _evict_expired(
+        self, manager: "MemoryManager", now: datetime, report: ConsolidationReport
+    ) -> None:
+        ttl = self.policy.ttl_seconds
+        use_decay = self.policy.decay_half_life_seconds is not None
+        if ttl is None and not use_decay:
+            return
+
+        def is_expired(item: MemoryItem) -> bool:
+            if ttl is not None and (now - item.timestamp).total_seconds() > ttl:
+                return True
+            return use_decay and self.decayed_score(item, now) < self.policy.min_decayed_score
+
+        evicted = 0
+        for key, item in self._long_term_entries(manager, "expiry"):
+            if is_expired(item) and manager.long_term.delete(key):
+                evicted += 1
+                report.bytes_reclaimed += estimate_item_bytes(item)
+
+        removed = manager.rag.evict(is_expired)
+        evicted += len(removed)
+        report.bytes_reclaimed += sum(estimate_item_bytes(item) for item in removed)
+
+        report.evicted += evicted
+        report.details["expired"] = evicted
+
+    def _merge_long_term(
+        self, manager: "MemoryManager", embed: Optional[Embedder], report: ConsolidationReport
+    ) -> None:
+        entries = self._long_term_entries(manager, "merging")
+        items = [item for _, item in entries]
+        survivors = self._find_duplicates(items, embed)
+
+        merged = 0
+        updated: Set[int] = set()
+        for index, keep_index in survivors.items():
+            key, item = entries[index]
+            if manager.long_term.delete(key):
+                merged += 1
+                report.bytes_reclaimed += estimate_item_bytes(item)
+                updated.add(keep_index)
+        for keep_index in updated:
+            key, item = entries[keep_index]
+            manager.store_long(item, key=key)
+
+        report.merged += merged
+        report.details["long_term_merged"] = merged
+
+    @staticmethod
+    def _long_term_entries(manager: "MemoryManager", step: str) -> List[Tuple[str, MemoryItem]]:
+        """Long-term (key, item) pairs, or none if the backend can't list them."""
+        try:
+            return list(manager.long_term.entries())
+        except NotImplementedError:
+            logger.debug("Skipping long-term %s: backend cannot list its entries", step)
+            return []
+
+    def _merge_rag(
+        self, manager: "MemoryManager", embed: Optional[Embedder], report: ConsolidationReport
+    ) -> None:
+        items = list(manager.rag.retrieve())
+        survivors = self._find_duplicates(items, embed)
+        drop_ids = {id(items[index]) for index in survivors}
+        removed = manager.rag.evict(lambda item: id(item) in drop_ids)
+
+        report.merged += len(removed)
+        report.bytes_reclaimed += sum(estimate_item_bytes(item) for item in removed)
+        report.details["rag_merged"] = len(removed)
+
+    def _find_duplicates(
+        self, items: List[MemoryItem], embed: Optional[Embedder]
+    ) -> Dict[int, int]:
+        """Map each duplicate index to the index of the item it merges into.
+
+        Without an embedder only items with the same normalized content
+        match. Newer items win; the survivor's ``merged_count`` metadata is
+        bumped.
+        """
+        order = sorted(range(len(items)), key=lambda i: items[i].timestamp, reverse=True)
+        kept: List[int] = []
+        embeddings: Dict[int, List[float]] = {}
+        by_content: Dict[str, int] = {}
+        duplicates: Dict[int, int] = {}
+
+        for index in order:
+            item = items[index]
+            if embed is None:
+                match = by_content.setdefault(normalize_content(item.content), index)
+                if match == index:
+                    continue
+            else:
+                embedding = item.embedding or embed(item.content)
+                embeddings[index] = embedding
+                match = self._best_match(embedding, kept, embeddings)
+                if match is None:
+                    kept.append(index)
+                    continue
+            duplicates[index] = match
+            survivor = items[match]
+            survivor.metadata["merged_count"] = (
+                int(survivor.metadata.get("merged_count", 0))
+                + int(item.metadata.get("merged_count", 0))
+                + 1
+            )
+        return duplicates
+
+    def _best_match(
+        self, embedding: List[float], kept: Iterable[int], embeddings: Dict[int, List[float]]
+    ) -> Optional[int]:
+        best: Optional[int] = None
+        best_score = self.policy.similarity_threshold
+        for index in kept:
+            score = RAGMemory._cosine_similarity(embedding, embeddings[index])
+            if score >= best_score:
+                best, best_score = index, score
+        return best
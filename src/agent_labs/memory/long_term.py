@@ -2,7 +2,7 @@
 Long-term memory implementation with pluggable storage backends.
 """
 
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
 from .base import Memory, MemoryItem
 from .storage import StorageBackend, InMemoryStorage, SqliteStorage
@@ -30,6 +30,13 @@ class LongTermMemory(Memory):
     def get(self, key: str) -> Optional[MemoryItem]:
         return self._backend.get(key)
 
+    def delete(self, key: str) -> bool:
+        return self._backend.delete(key)
+
+    def entries(self) -> Iterable[Tuple[str, MemoryItem]]:
+        """Iterate over (key, item) pairs from the backend."""
+        return self._backend.iter_entries()
+
     def clear(self) -> None:
         self._backend.clear()
 
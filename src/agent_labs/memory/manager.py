@@ -2,9 +2,11 @@
 Memory manager coordinating short-term, long-term, and RAG memory tiers.
 """
 
+from datetime import datetime
 from typing import List, Optional
 
 from .base import MemoryItem
+from .consolidation import ConsolidationReport, MemoryConsolidator
 from .short_term import ShortTermMemory
 from .long_term import LongTermMemory
 from .rag import RAGMemory
@@ -18,10 +20,12 @@ class MemoryManager:
         short_term: Optional[ShortTermMemory] = None,
         long_term: Optional[LongTermMemory] = None,
         rag: Optional[RAGMemory] = None,
+        consolidator: Optional[MemoryConsolidator] = None,
     ) -> None:
         self.short_term = short_term or ShortTermMemory()
         self.long_term = long_term or LongTermMemory()
         self.rag = rag or RAGMemory()
+        self.consolidator = consolidator
 
     def store_short(self, item: MemoryItem) -> None:
         self.short_term.store(item)
@@ -55,6 +59,13 @@ class MemoryManager:
             self.store_short(item)
             self.store_long(item)
             self.store_rag(item)
+        if self.consolidator:
+            self.consolidator.maybe_consolidate(self)
+
+    def consolidate(self, now: Optional[datetime] = None) -> ConsolidationReport:
+        """Run a consolidation pass now (uses default policy if none configured)."""
+        consolidator = self.consolidator or MemoryConsolidator()
+        return consolidator.consolidate(self, now=now)
 
     def clear(self) -> None:
         self.short_term.clear()
@@ -1,27 +1,39 @@
 """
 RAG memory implementation with mock embeddings and similarity search.
+
+With ``compact=True`` items are kept as CompactMemoryItem objects whose
+embeddings live in one float32 EmbeddingArena, which cuts the per-item
+footprint of large stores; retrieval scores the arena in place.
 """
 
 from __future__ import annotations
 
 import math
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Sequence, Tuple
 
 from .base import Memory, MemoryItem
+from .compact import CompactMemoryItem, EmbeddingArena
 
 
 class RAGMemory(Memory):
     """RAG memory with mock embeddings and cosine similarity."""
 
-    def __init__(self, embedding_dim: int = 8) -> None:
+    def __init__(self, embedding_dim: int = 8, compact: bool = False) -> None:
         if embedding_dim <= 0:
             raise ValueError("embedding_dim must be positive")
         self._items: List[MemoryItem] = []
         self._embedding_dim = embedding_dim
+        self._arena: Optional[EmbeddingArena] = EmbeddingArena() if compact else None
+
+    @property
+    def compact(self) -> bool:
+        return self._arena is not None
 
     def store(self, item: MemoryItem) -> None:
         if item.embedding is None:
             item.embedding = self._embed(item.content)
+        if self._arena is not None:
+            item = CompactMemoryItem.from_item(item, self._arena)
         self._items.append(item)
 
     def retrieve(self, query: Optional[str] = None, top_k: int = 5, **kwargs) -> List[MemoryItem]:
@@ -29,14 +41,35 @@ class RAGMemory(Memory):
             return list(self._items)
         query_embedding = self._embed(query)
         scored: List[Tuple[float, MemoryItem]] = [
-            (self._cosine_similarity(query_embedding, item.embedding or []), item)
+            (self._cosine_similarity(query_embedding, self._vector(item)), item)
             for item in self._items
         ]
         scored.sort(key=lambda pair: pair[0], reverse=True)
         return [item for _, item in scored[:top_k]]
 
+    def evict(self, predicate: Callable[[MemoryItem], bool]) -> List[MemoryItem]:
+        """Remove items matching predicate and return them.
+
+        In compact mode the returned items are MemoryItem copies and the
+        removed embeddings' arena slots are reused.
+        """
+        kept: List[MemoryItem] = []
+        removed: List[MemoryItem] = []
+        for item in self._items:
+            if not predicate(item):
+                kept.append(item)
+            elif isinstance(item, CompactMemoryItem):
+                removed.append(item.to_item())
+                item.release_embedding()
+            else:
+                removed.append(item)
+        self._items = kept
+        return removed
+
     def clear(self) -> None:
         self._items.clear()
+        if self._arena is not None:
+            self._arena = EmbeddingArena()
 
     def _embed(self, text: str) -> List[float]:
         """Generate a deterministic mock embedding from text."""
@@ -47,7 +80,13 @@ class RAGMemory(Memory):
         return [value / total for value in buckets]
 
     @staticmethod
-    def _cosine_similarity(a: List[float], b: List[float]) -> float:
+    def _vector(item: MemoryItem) -> Sequence[float]:
+        if isinstance(item, CompactMemoryItem):
+            return item.embedding_view() or []
+        return item.embedding or []
+
+    @staticmethod
+    def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
         if not a or not b:
             return 0.0
         dot = sum(x * y for x, y in zip(a, b))
@@ -0,0 +1,227 @@
+"""
+Session-scoped memory service.
+
+Keeps one MemoryManager per session id. At most ``max_hot_sessions``
+managers live in RAM; the least recently used session is serialized
+(binary snapshot) to SQLite cold storage and rehydrated lazily on its
+next access, so process memory is capped regardless of session count.
+
+A manager returned by ``get()`` is only the live one until its session is
+evicted; writes to it after that are lost and the next ``get()`` loads the
+older snapshot. Hold ``session()`` for as long as a manager is used: a
+session in use is never evicted (the hot set may exceed
+``max_hot_sessions`` while sessions are held).
+"""
+
+from __future__ import annotations
+
+import io
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+
+from .manager import MemoryManager
+from .snapshot import SnapshotWriter, load_snapshots, manager_tiers, restore_manager
+
+
+@dataclass
+class SessionStats:
+    """Counters for session cache behavior."""
+
+    hot_sessions: int = 0
+    cold_sessions: int = 0
+    created: int = 0
+    evictions: int = 0
+    rehydrations: int = 0
+    hits: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "hot_sessions": self.hot_sessions,
+            "cold_sessions": self.cold_sessions,
+            "created": self.created,
+            "evictions": self.evictions,
+            "rehydrations": self.rehydrations,
+            "hits": self.hits,
+        }
+
+
+class SessionMemoryService:
+    """Per-session MemoryManager instances with LRU eviction to SQLite.
+
+    Example:
+        >>> service = SessionMemoryService(max_hot_sessions=100, path="sessions.db")
+        >>> with service.session("user-42") as memory:
+        ...     memory.store_short(MemoryItem(content="hello"))
+    """
+
+    def __init__(
+        self,
+        max_hot_sessions: int = 128,
+        path: str = ":memory:",
+        manager_factory: Optional[Callable[[], MemoryManager]] = None,
+    ) -> None:
+        if max_hot_sessions <= 0:
+            raise ValueError("max_hot_sessions must be positive")
+        self.max_hot_sessions = max_hot_sessions
+        self._factory = manager_factory or MemoryManager
+        self._hot: "OrderedDict[str, MemoryManager]" = OrderedDict()
+        self._in_use: Counter = Counter()
+        self._lock = threading.RLock()
+        self._stats = SessionStats()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS memory_sessions (
+                session_id TEXT PRIMARY KEY,
+                snapshot BLOB NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, session_id: str) -> MemoryManager:
+        """Return the session's manager, rehydrating or creating it if needed.
+
+        Don't keep the manager past the next ``get()`` of another session:
+        it may be evicted. Use ``session()`` to keep it live.
+        """
+        if not session_id:
+            raise ValueError("session_id must be non-empty")
+        with self._lock:
+            manager = self._hot.get(session_id)
+            if manager is not None:
+                self._hot.move_to_end(session_id)
+                self._stats.hits += 1
+                return manager
+
+            manager = self._rehydrate(session_id)
+            if manager is None:
+                manager = self._factory()
+                self._stats.created += 1
+            self._hot[session_id] = manager
+            self._evict_overflow(keep=session_id)
+            return manager
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[MemoryManager]:
+        """Use a session's manager; it stays hot until the block exits."""
+        with self._lock:
+            self._in_use[session_id] += 1
+            try:
+                manager = self.get(session_id)
+            except BaseException:
+                self._release(session_id)
+                raise
+        try:
+            yield manager
+        finally:
+            with self._lock:
+                self._release(session_id)
+                self._evict_overflow()
+
+    def drop(self, session_id: str) -> bool:
+        """Delete a session from both hot and cold storage."""
+        with self._lock:
+            removed = self._hot.pop(session_id, None) is not None
+            cursor = self._conn.execute(
+                "DELETE FROM memory_sessions WHERE session_id = ?", (session_id,)
+            )
+            self._conn.commit()
+            return removed or cursor.rowcount > 0
+
+    def evict(self, session_id: str) -> bool:
+        """Move a hot session to cold storage now (False if not hot or in use)."""
+        with self._lock:
+            if self._in_use[session_id]:
+                return False
+            manager = self._hot.pop(session_id, None)
+            if manager is None:
+                return False
+            self._persist(session_id, manager)
+            self._stats.evictions += 1
+            return True
+
+    def flush(self) -> None:
+        """Persist every hot session to cold storage (they stay hot)."""
+        with self._lock:
+            for session_id, manager in self._hot.items():
+                self._persist(session_id, manager)
+
+    def is_hot(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._hot
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._lock:
+            if session_id in self._hot:
+                return True
+            row = self._conn.execute(
+                "SELECT 1 FROM memory_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            return row is not None
+
+    def stats(self) -> SessionStats:
+        with self._lock:
+            rows = self._conn.execute("SELECT session_id FROM memory_sessions")
+            cold = sum(1 for (session_id,) in rows if session_id not in self._hot)
+            self._stats.hot_sessions = len(self._hot)
+            self._stats.cold_sessions = cold
+            return SessionStats(**self._stats.to_dict())
+
+    def close(self) -> None:
+        """Flush hot sessions and close the SQLite connection."""
+        with self._lock:
+            self.flush()
+            self._hot.clear()
+            self._conn.close()
+
+    def _release(self, session_id: str) -> None:
+        self._in_use[session_id] -= 1
+        if not self._in_use[session_id]:
+            del self._in_use[session_id]
+
+    def _evict_overflow(self, keep: Optional[str] = None) -> None:
+        overflow = len(self._hot) - self.max_hot_sessions
+        if overflow <= 0:
+            return
+        # Least recently used first, skipping sessions in use and ``keep``.
+        idle = [
+            session_id
+            for session_id in self._hot
+            if session_id != keep and not self._in_use[session_id]
+        ]
+        for session_id in idle[:overflow]:
+            self._persist(session_id, self._hot.pop(session_id))
+            self._stats.evictions += 1
+
+    def _persist(self, session_id: str, manager: MemoryManager) -> None:
+        buffer = io.BytesIO()
+        SnapshotWriter().write(manager_tiers(manager), buffer)
+        self._conn.execute(
+            """
+            INSERT INTO memory_sessions (session_id, snapshot, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                snapshot = excluded.snapshot,
+                updated_at = excluded.updated_at
+            """,
+            (session_id, buffer.getvalue(), time.time()),
+        )
+        self._conn.commit()
+
+    def _rehydrate(self, session_id: str) -> Optional[MemoryManager]:
+        row = self._conn.execute(
+            "SELECT snapshot FROM memory_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        manager = self._factory()
+        restore_manager(manager, load_snapshots([io.BytesIO(row[0])]))
+        self._stats.rehydrations += 1
+        return manager
@@ -1,30 +1,118 @@
 """
 Short-term memory implementation (bounded, turn-by-turn).
+
+Items are indexed incrementally on store/evict: each entry keeps its
+lowercased content and term set, and an inverted index maps terms to
+entries, so keyword lookups only touch matching items.
 """
 
 from collections import deque
-from typing import List, Optional
+from typing import Callable, Deque, Dict, FrozenSet, List, Optional, Set, Tuple
 
 from .base import Memory, MemoryItem
 
 
+def tokenize(text: str) -> FrozenSet[str]:
+    """Split text into lowercase whitespace-delimited terms."""
+    return frozenset(text.lower().split())
+
+
 class ShortTermMemory(Memory):
-    """Short-term memory stored in a bounded deque."""
+    """Short-term memory stored in a bounded deque with a term index."""
 
     def __init__(self, max_items: int = 20) -> None:
         if max_items <= 0:
             raise ValueError("max_items must be positive")
-        self._items = deque(maxlen=max_items)
+        self._max_items = max_items
+        self._items: Deque[MemoryItem] = deque()
+        self._seqs: Deque[int] = deque()
+        self._next_seq = 0
+        self._by_seq: Dict[int, MemoryItem] = {}
+        self._lower: Dict[int, str] = {}
+        self._terms: Dict[int, FrozenSet[str]] = {}
+        self._index: Dict[str, Set[int]] = {}
 
     def store(self, item: MemoryItem) -> None:
+        if len(self._items) >= self._max_items:
+            self._items.popleft()
+            self._unindex(self._seqs.popleft())
+        seq = self._next_seq
+        self._next_seq += 1
         self._items.append(item)
+        self._seqs.append(seq)
+        self._index_item(seq, item)
 
     def retrieve(self, query: Optional[str] = None, **kwargs) -> List[MemoryItem]:
-        items = list(self._items)
         if not query:
-            return items
+            return list(self._items)
+        # Substring semantics can't be answered from whole-term postings, but the
+        # lowercased content is precomputed so no per-call normalization is done.
         query_lower = query.lower()
-        return [item for item in items if query_lower in item.content.lower()]
+        return [
+            self._by_seq[seq]
+            for seq in self._seqs
+            if query_lower in self._lower[seq]
+        ]
+
+    def search_terms(
+        self, query: str, match_all: bool = False
+    ) -> List[Tuple[MemoryItem, int]]:
+        """Return (item, matched term count) for items sharing terms with query.
+
+        Uses the inverted index, so cost scales with the number of matching
+        items rather than the window size. Results are in insertion order.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        counts: Dict[int, int] = {}
+        for term in terms:
+            for seq in self._index.get(term, ()):
+                counts[seq] = counts.get(seq, 0) + 1
+        if match_all:
+            counts = {seq: n for seq, n in counts.items() if n == len(terms)}
+        return [(self._by_seq[seq], counts[seq]) for seq in sorted(counts)]
+
+    def evict(self, predicate: Callable[[MemoryItem], bool]) -> List[MemoryItem]:
+        """Remove items matching predicate and return them."""
+        removed: List[MemoryItem] = []
+        kept_items: Deque[MemoryItem] = deque()
+        kept_seqs: Deque[int] = deque()
+        for seq, item in zip(self._seqs, self._items):
+            if predicate(item):
+                removed.append(item)
+                self._unindex(seq)
+            else:
+                kept_items.append(item)
+                kept_seqs.append(seq)
+        self._items = kept_items
+        self._seqs = kept_seqs
+        return removed
 
     def clear(self) -> None:
         self._items.clear()
+        self._seqs.clear()
+        self._by_seq.clear()
+        self._lower.clear()
+        self._terms.clear()
+        self._index.clear()
+
+    def _index_item(self, seq: int, item: MemoryItem) -> None:
+        lower = item.content.lower()
+        terms = tokenize(item.content)
+        self._by_seq[seq] = item
+        self._lower[seq] = lower
+        self._terms[seq] = terms
+        for term in terms:
+            self._index.setdefault(term, set()).add(seq)
+
+    def _unindex(self, seq: int) -> None:
+        self._by_seq.pop(seq, None)
+        self._lower.pop(seq, None)
+        for term in self._terms.pop(seq, ()):
+            postings = self._index.get(term)
+            if postings is None:
+                continue
+            postings.discard(seq)
+            if not postings:
+                del self._index[term]
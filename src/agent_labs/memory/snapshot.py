@@ -0,0 +1,429 @@
+"""
+Versioned binary snapshots for memory tiers.
+
+A snapshot is a header followed by frames. Each frame holds up to
+``chunk_size`` records for one tier, followed by a raw little-endian
+float32 block with the embeddings of those records, and a CRC32 of both.
+Frames are written and read one at a time, so memory stays bounded for
+large tiers.
+
+Layout (all integers little-endian):
+    header  := MAGIC version:u8 kind:u8 sequence:u32 chain:16B
+    frame   := name_len:u8 name count:u32 records_len:u32 floats:u32
+               records float32[floats] crc32:u32
+    end     := name_len=0
+    record  := op:u8 key:str [content:str epoch:f64 metadata:bytes dim:u32]
+    str     := len:u32 utf8 (bytes likewise)
+
+Delta snapshots (kind=1) only contain records that changed since the
+previous snapshot written by the same SnapshotWriter, plus delete
+tombstones; ``load_snapshots`` replays a full snapshot and its deltas.
+``chain`` is a random id given to each full snapshot and copied into its
+deltas, so a delta from another chain is rejected instead of applied.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .base import MemoryItem
+from .compact import CompactMemoryItem, EmbeddingArena, from_epoch, to_epoch
+
+if TYPE_CHECKING:
+    from .manager import MemoryManager
+
+
+MAGIC = b"AGMSNAP"
+FORMAT_VERSION = 2
+KIND_FULL = 0
+KIND_DELTA = 1
+OP_UPSERT = 0
+OP_DELETE = 1
+
+_HEADER = struct.Struct("<7sBBI16s")
+_FRAME = struct.Struct("<III")
+_U32 = struct.Struct("<I")
+_F64 = struct.Struct("<d")
+_NONE_LEN = 0xFFFFFFFF
+
+AnyItem = Union[MemoryItem, CompactMemoryItem]
+TierEntries = Iterable[Tuple[str, AnyItem]]
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a snapshot stream is malformed or out of sequence."""
+
+
+@dataclass
+class SnapshotRecord:
+    """A decoded record: an upsert (item set) or a delete tombstone."""
+
+    tier: str
+    key: str
+    item: Optional[AnyItem] = None
+
+    @property
+    def is_delete(self) -> bool:
+        return self.item is None
+
+
+@dataclass
+class SnapshotStats:
+    """Summary of a written snapshot."""
+
+    kind: int
+    sequence: int
+    records: int = 0
+    deletes: int = 0
+    unchanged: int = 0
+    bytes_written: int = 0
+    tiers: Dict[str, int] = field(default_factory=dict)
+
+
+def _pack_bytes(data: Optional[bytes]) -> bytes:
+    if data is None:
+        return _U32.pack(_NONE_LEN)
+    return _U32.pack(len(data)) + data
+
+
+def _embedding_bytes(item: AnyItem) -> bytes:
+    view = getattr(item, "embedding_view", None)
+    if view is not None:
+        raw = view()
+        if raw is None:
+            return b""
+        data = raw.tobytes()
+        if sys.byteorder == "little":
+            return data
+        floats = array("f", data)
+        floats.byteswap()
+        return floats.tobytes()
+    if not item.embedding:
+        return b""
+    floats = array("f", item.embedding)
+    if sys.byteorder != "little":
+        floats.byteswap()
+    return floats.tobytes()
+
+
+def _metadata_bytes(item: AnyItem) -> Optional[bytes]:
+    packer = getattr(item, "metadata_bytes", None)
+    if packer is not None:
+        return packer()
+    if not item.metadata:
+        return None
+    return json.dumps(item.metadata, default=str).encode("utf-8")
+
+
+def _fingerprint(content: bytes, epoch: float, metadata: Optional[bytes], vector: bytes) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(content)
+    digest.update(_F64.pack(epoch))
+    digest.update(metadata or b"")
+    digest.update(vector)
+    return digest.digest()
+
+
+def sequence_keys(items: Iterable[AnyItem]) -> Iterator[Tuple[str, AnyItem]]:
+    """Derive stable keys for unkeyed tiers (short-term, RAG).
+
+    Keys combine the timestamp and a content hash, so an unchanged item
+    keeps its key across snapshots; repeats get a ``#n`` suffix.
+    """
+    seen: Dict[str, int] = {}
+    for item in items:
+        digest = hashlib.blake2b(item.content.encode("utf-8"), digest_size=8).hexdigest()
+        key = f"{to_epoch(item.timestamp)!r}:{digest}"
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        yield (f"{key}#{count}" if count else key), item
+
+
+class SnapshotWriter:
+    """Stream memory tiers to binary snapshots, with optional deltas.
+
+    Example:
+        >>> writer = SnapshotWriter()
+        >>> with open("memory.snap", "wb") as fp:
+        ...     writer.write(manager_tiers(manager), fp)
+        >>> with open("memory.1.snap", "wb") as fp:
+        ...     writer.write(manager_tiers(manager), fp, delta=True)
+    """
+
+    def __init__(self, chunk_size: int = 1024) -> None:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.chunk_size = chunk_size
+        self._sequence = -1
+        self._chain = b""
+        self._fingerprints: Dict[str, Dict[str, bytes]] = {}
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the last snapshot written (-1 if none)."""
+        return self._sequence
+
+    def write(
+        self,
+        tiers: Mapping[str, TierEntries],
+        fp: BinaryIO,
+        delta: bool = False,
+    ) -> SnapshotStats:
+        """Write a full or delta snapshot of ``tiers`` to a binary stream."""
+        if delta and self._sequence < 0:
+            raise SnapshotFormatError("A full snapshot must be written before a delta")
+
+        sequence = self._sequence + 1 if delta else 0
+        kind = KIND_DELTA if delta else KIND_FULL
+        chain = self._chain if delta else uuid.uuid4().bytes
+        stats = SnapshotStats(kind=kind, sequence=sequence)
+        fingerprints: Dict[str, Dict[str, bytes]] = {}
+
+        stats.bytes_written += fp.write(
+            _HEADER.pack(MAGIC, FORMAT_VERSION, kind, sequence, chain)
+        )
+        # Tiers that disappeared since the last snapshot get tombstones for all their keys.
+        removed = [tier for tier in self._fingerprints if tier not in tiers] if delta else []
+        all_tiers = itertools.chain(tiers.items(), ((tier, ()) for tier in removed))
+        for tier, entries in all_tiers:
+            previous = self._fingerprints.get(tier, {}) if delta else {}
+            current: Dict[str, bytes] = {}
+            fingerprints[tier] = current
+            pending: List[Tuple[bytes, bytes]] = []
+
+            for key, item in entries:
+                content = item.content.encode("utf-8")
+                epoch = to_epoch(item.timestamp)
+                metadata = _metadata_bytes(item)
+                vector = _embedding_bytes(item)
+                digest = _fingerprint(content, epoch, metadata, vector)
+                current[key] = digest
+                if previous.get(key) == digest:
+                    stats.unchanged += 1
+                    continue
+                record = b"".join(
+                    (
+                        bytes((OP_UPSERT,)),
+                        _pack_bytes(key.encode("utf-8")),
+                        _pack_bytes(content),
+                        _F64.pack(epoch),
+                        _pack_bytes(metadata),
+                        _U32.pack(len(vector) // 4),
+                    )
+                )
+                pending.append((record, vector))
+                stats.records += 1
+                stats.tiers[tier] = stats.tiers.get(tier, 0) + 1
+                if len(pending) >= self.chunk_size:
+                    stats.bytes_written += self._write_frame(fp, tier, pending)
+                    pending = []
+
+            for key in previous.keys() - current.keys():
+                pending.append((bytes((OP_DELETE,)) + _pack_bytes(key.encode("utf-8")), b""))
+                stats.deletes += 1
+                if len(pending) >= self.chunk_size:
+                    stats.bytes_written += self._write_frame(fp, tier, pending)
+                    pending = []
+
+            if pending:
+                stats.bytes_written += self._write_frame(fp, tier, pending)
+
+        stats.bytes_written += fp.write(b"\x00")
+        self._sequence = sequence
+        self._chain = chain
+        self._fingerprints = fingerprints
+        return stats
+
+    @staticmethod
+    def _write_frame(fp: BinaryIO, tier: str, pending: Sequence[Tuple[bytes, bytes]]) -> int:
+        name = tier.encode("utf-8")
+        if not 0 < len(name) < 256:
+            raise SnapshotFormatError(f"Tier name must be 1-255 bytes: {tier!r}")
+        records = b"".join(record for record, _ in pending)
+        vectors = b"".join(vector for _, vector in pending)
+        crc = zlib.crc32(vectors, zlib.crc32(records))
+        written = fp.write(bytes((len(name),)) + name)
+        written += fp.write(_FRAME.pack(len(pending), len(records), len(vectors) // 4))
+        written += fp.write(records)
+        written += fp.write(vectors)
+        written += fp.write(_U32.pack(crc))
+        return written
+
+
+def _read_exact(fp: BinaryIO, size: int) -> bytes:
+    data = fp.read(size)
+    if len(data) != size:
+        raise SnapshotFormatError("Unexpected end of snapshot stream")
+    return data
+
+
+def read_header(fp: BinaryIO) -> Tuple[int, int, bytes]:
+    """Read and validate a snapshot header; returns (kind, sequence, chain id)."""
+    magic, version, kind, sequence, chain = _HEADER.unpack(_read_exact(fp, _HEADER.size))
+    if magic != MAGIC:
+        raise SnapshotFormatError("Not a memory snapshot (bad magic)")
+    if version != FORMAT_VERSION:
+        raise SnapshotFormatError(f"Unsupported snapshot version {version}")
+    if kind not in (KIND_FULL, KIND_DELTA):
+        raise SnapshotFormatError(f"Unknown snapshot kind {kind}")
+    return kind, sequence, chain
+
+
+def iter_records(fp: BinaryIO, compact: bool = False) -> Iterator[SnapshotRecord]:
+    """Stream records from a snapshot positioned after its header.
+
+    With ``compact=True`` items are CompactMemoryItem objects that share one
+    EmbeddingArena per frame, built directly from the raw float32 block.
+    """
+    while True:
+        name_len = _read_exact(fp, 1)[0]
+        if name_len == 0:
+            return
+        tier = _read_exact(fp, name_len).decode("utf-8")
+        count, records_len, floats = _FRAME.unpack(_read_exact(fp, _FRAME.size))
+        records = _read_exact(fp, records_len)
+        vectors = _read_exact(fp, floats * 4)
+        (crc,) = _U32.unpack(_read_exact(fp, 4))
+        if zlib.crc32(vectors, zlib.crc32(records)) != crc:
+            raise SnapshotFormatError(f"Checksum mismatch in tier '{tier}'")
+
+        block = array("f")
+        block.frombytes(vectors)
+        if sys.byteorder != "little":
+            block.byteswap()
+        arena = None
+        if compact:
+            arena = EmbeddingArena.frombytes(block.tobytes(), block_size=max(1, floats))
+        yield from _decode_frame(tier, count, memoryview(records), block, arena)
+
+
+def _decode_frame(
+    tier: str,
+    count: int,
+    buf: memoryview,
+    block: array,
+    arena: Optional[EmbeddingArena],
+) -> Iterator[SnapshotRecord]:
+    pos = 0
+    offset = 0
+
+    def take_bytes() -> Optional[bytes]:
+        nonlocal pos
+        (size,) = _U32.unpack_from(buf, pos)
+        pos += 4
+        if size == _NONE_LEN:
+            return None
+        data = bytes(buf[pos:pos + size])
+        pos += size
+        return data
+
+    for _ in range(count):
+        op = buf[pos]
+        pos += 1
+        key = (take_bytes() or b"").decode("utf-8")
+        if op == OP_DELETE:
+            yield SnapshotRecord(tier=tier, key=key)
+            continue
+        if op != OP_UPSERT:
+            raise SnapshotFormatError(f"Unknown record op {op}")
+        content = (take_bytes() or b"").decode("utf-8")
+        (epoch,) = _F64.unpack_from(buf, pos)
+        pos += 8
+        metadata = take_bytes()
+        (dim,) = _U32.unpack_from(buf, pos)
+        pos += 4
+
+        if arena is not None:
+            item: AnyItem = CompactMemoryItem(
+                content=content,
+                epoch=epoch,
+                metadata_raw=metadata,
+                arena=arena,
+                offset=offset if dim else -1,
+                dim=dim,
+            )
+        else:
+            item = MemoryItem(
+                content=content,
+                timestamp=from_epoch(epoch),
+                metadata=json.loads(metadata) if metadata else {},
+                embedding=block[offset:offset + dim].tolist() if dim else None,
+            )
+        offset += dim
+        yield SnapshotRecord(tier=tier, key=key, item=item)
+
+
+def load_snapshots(
+    streams: Iterable[BinaryIO], compact: bool = False
+) -> Dict[str, Dict[str, AnyItem]]:
+    """Replay a full snapshot followed by its deltas, in order.
+
+    Returns ``{tier: {key: item}}`` with insertion order preserved.
+    """
+    tiers: Dict[str, Dict[str, AnyItem]] = {}
+    expected: Optional[int] = None
+    base_chain = b""
+    for fp in streams:
+        kind, sequence, chain = read_header(fp)
+        if expected is None:
+            if kind != KIND_FULL:
+                raise SnapshotFormatError("Snapshot chain must start with a full snapshot")
+        elif kind == KIND_FULL:
+            tiers = {}
+        elif chain != base_chain:
+            raise SnapshotFormatError("Delta belongs to a different full snapshot")
+        elif sequence != expected:
+            raise SnapshotFormatError(
+                f"Delta sequence {sequence} does not follow snapshot {expected - 1}"
+            )
+        if kind == KIND_FULL:
+            base_chain = chain
+        for record in iter_records(fp, compact=compact):
+            entries = tiers.setdefault(record.tier, {})
+            if record.is_delete:
+                entries.pop(record.key, None)
+            else:
+                entries[record.key] = record.item
+        expected = sequence + 1
+    return tiers
+
+
+def manager_tiers(manager: "MemoryManager") -> Dict[str, TierEntries]:
+    """Keyed entries for every tier of a MemoryManager."""
+    return {
+        "short_term": sequence_keys(manager.short_term.retrieve()),
+        "long_term": manager.long_term.entries(),
+        "rag": sequence_keys(manager.rag.retrieve()),
+    }
+
+
+def restore_manager(manager: "MemoryManager", tiers: Mapping[str, Mapping[str, AnyItem]]) -> None:
+    """Replace a MemoryManager's contents with loaded snapshot tiers."""
+    manager.clear()
+    for item in tiers.get("short_term", {}).values():
+        manager.store_short(item)
+    for key, item in tiers.get("long_term", {}).items():
+        manager.store_long(item, key=key)
+    for item in tiers.get("rag", {}).values():
+        manager.store_rag(item)
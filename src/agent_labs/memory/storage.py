@@ -9,7 +9,7 @@ import sqlite3
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .base import MemoryItem
 
@@ -37,6 +37,14 @@ class StorageBackend(ABC):
     def iter_items(self) -> Iterable[MemoryItem]:
         raise NotImplementedError
 
+    def delete(self, key: str) -> bool:
+        """Delete an item by key (optional for custom backends)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support delete")
+
+    def iter_entries(self) -> Iterable[Tuple[str, MemoryItem]]:
+        """Iterate over (key, item) pairs (optional for custom backends)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support iter_entries")
+
 
 class VectorStoreBackend(ABC):
     """Abstract vector store backend for RAG memory."""
@@ -99,6 +107,12 @@ class InMemoryStorage(StorageBackend):
     def iter_items(self) -> Iterable[MemoryItem]:
         return list(self._items.values())
 
+    def delete(self, key: str) -> bool:
+        return self._items.pop(key, None) is not None
+
+    def iter_entries(self) -> Iterable[Tuple[str, MemoryItem]]:
+        return list(self._items.items())
+
 
 class SqliteStorage(StorageBackend):
     """SQLite storage backend for long-term memory."""
@@ -190,6 +204,30 @@ class SqliteStorage(StorageBackend):
             )
         return results
 
+    def delete(self, key: str) -> bool:
+        cursor = self._conn.execute("DELETE FROM memory_items WHERE key = ?", (key,))
+        self._conn.commit()
+        return cursor.rowcount > 0
+
+    def iter_entries(self) -> Iterable[Tuple[str, MemoryItem]]:
+        cursor = self._conn.execute(
+            "SELECT key, content, timestamp, metadata FROM memory_items"
+        )
+        results = []
+        for key, content, timestamp, metadata_json in cursor.fetchall():
+            metadata = json.loads(metadata_json) if metadata_json else {}
+            results.append(
+                (
+                    key,
+                    MemoryItem(
+                        content=content,
+                        timestamp=datetime.fromisoformat(timestamp),
+                        metadata=metadata,
+                    ),
+                )
+            )
+        return results
+
     def close(self) -> None:
         """Close the SQLite connection."""
         self._conn.close()
@@ -2,13 +2,26 @@
 
 from .agent import Agent
 from .states import AgentState, can_transition, get_valid_transitions
-from .context import AgentContext, VerificationResult
+from .checkpoint import (
+    CheckpointFormatError,
+    InMemoryRunStore,
+    RunStore,
+    SqliteRunStore,
+    decode_context,
+    encode_context,
+    run_store_from_config,
+)
+from .context import AgentContext, PipelineStats, VerificationResult
+from .pool import AgentPool, BatchResult, RunOutcome
+from .streaming import AgentEvent, ToolCallDetector
 from .exceptions import (
     OrchestratorError,
     MaxTurnsExceededError,
     VerificationError,
     PlanningError,
     ActionExecutionError,
+    RunNotFoundError,
+    RunTimeoutError,
     StateTransitionError,
 )
 
@@ -17,6 +30,19 @@ __all__ = [
     "AgentState",
     "AgentContext",
     "VerificationResult",
+    "PipelineStats",
+    "AgentEvent",
+    "ToolCallDetector",
+    "AgentPool",
+    "BatchResult",
+    "RunOutcome",
+    "RunStore",
+    "InMemoryRunStore",
+    "SqliteRunStore",
+    "run_store_from_config",
+    "encode_context",
+    "decode_context",
+    "CheckpointFormatError",
     "can_transition",
     "get_valid_transitions",
     "OrchestratorError",
@@ -24,5 +50,7 @@ __all__ = [
     "VerificationError",
     "PlanningError",
     "ActionExecutionError",
+    "RunNotFoundError",
+    "RunTimeoutError",
     "StateTransitionError",
 ]
@@ -4,14 +4,27 @@ Agent orchestrator - implements the agent loop.
 Agent Loop: Observe -> Plan -> Act -> Verify -> Refine (or Stop)
 """
 
-from typing import Optional, Callable
+import asyncio
+import inspect
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterable, List, Optional, Callable, Tuple
 import logging
 
-from ..llm_providers import Provider
-from .context import AgentContext, VerificationResult
+from ..llm_providers import ChatMessage, Provider, render_messages
+from ..llm_providers.deadline import DeadlineExceededError, deadline_scope
+from .checkpoint import RunStore, decode_context, encode_context
+from .context import AgentContext, PipelineStats, VerificationResult
+from .pool import AgentPool, BatchResult
+from .streaming import AgentEvent, ToolCallDetector
 from .states import AgentState, can_transition
 from .exceptions import (
     MaxTurnsExceededError,
+    OrchestratorError,
+    RunNotFoundError,
+    RunTimeoutError,
     StateTransitionError,
     VerificationError,
     PlanningError,
@@ -20,6 +33,27 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+PLAN_QUESTION = "What should I do next to achieve this goal?"
+
+# Steps of a turn, in order; a resumed run restarts at its checkpointed state.
+_TURN_STEPS = (
+    AgentState.OBSERVING,
+    AgentState.PLANNING,
+    AgentState.ACTING,
+    AgentState.VERIFYING,
+    AgentState.REFINING,
+)
+
+
+@dataclass
+class _Speculation:
+    """A next-turn plan started while the current turn is being verified."""
+
+    task: "asyncio.Future[str]"
+    started: float
+    verified: Optional[float] = None
+    finished: Optional[float] = None
+
 
 class Agent:
     """Agent that uses an LLM to reason, act, and verify progress."""
@@ -29,14 +63,36 @@ class Agent:
         provider: Provider,
         model: str = "mock",
         verifier: Optional[Callable[[AgentContext, str], VerificationResult]] = None,
-        tool_executor: Optional[Callable[[str], str]] = None,
+        tool_executor: Optional[Callable[[str], Any]] = None,
         on_state_change: Optional[Callable[[AgentState, AgentState], None]] = None,
+        stop_after_tool_call: bool = False,
+        pipeline: bool = False,
+        run_store: Optional[RunStore] = None,
+        plan_history: Optional[int] = 3,
+        tool_call_executor: Optional[Callable[[str], Any]] = None,
     ) -> None:
         self.provider = provider
         self.model = model
         self.verifier = verifier
+        # Called with the plan; may return a string or an awaitable of one.
         self.tool_executor = tool_executor
+        # Streaming mode: called with each tool call JSON as soon as it is
+        # complete. Without it, streamed plans go to tool_executor as usual.
+        self.tool_call_executor = tool_call_executor
         self.on_state_change = on_state_change
+        # Streaming mode: stop reading the plan once a tool call is complete.
+        self.stop_after_tool_call = stop_after_tool_call
+        # Pipelined mode: plan the next turn while the current one is verified.
+        # The speculative plan doesn't see that turn's verification feedback.
+        self.pipeline = pipeline
+        # Agent-wide totals over all runs, including concurrent run_many runs.
+        # Updates happen between awaits, so concurrent runs can't interleave them.
+        self.pipeline_stats = PipelineStats()
+        # Checkpoint each run's context after every state transition.
+        self.run_store = run_store
+        # History entries sent when planning (None = all). Planners with
+        # server-side sessions always get the full, append-only history.
+        self.plan_history = plan_history
 
     def _transition_state(self, context: AgentContext, new_state: AgentState) -> None:
         """Transition to a new state with validation and logging."""
@@ -48,71 +104,328 @@ class Agent:
         logger.info("State transition: %s -> %s", old_state.value, new_state.value)
         context.current_state = new_state
 
+        self._checkpoint(context)
+
         if self.on_state_change:
             self.on_state_change(old_state, new_state)
 
+    def _checkpoint(self, context: AgentContext) -> None:
+        if self.run_store is not None and context.run_id:
+            self.run_store.save(context.run_id, encode_context(context))
+
     async def run(
         self,
         goal: str,
         max_turns: int = 5,
         inputs: Optional[dict] = None,
+        on_event: Optional[Callable[[AgentEvent], Any]] = None,
+        max_run_seconds: Optional[float] = None,
+        run_id: Optional[str] = None,
     ) -> str:
-        """Run agent to completion."""
+        """
+        Run agent to completion.
+
+        With ``on_event`` (sync or async callback), plans are streamed: plan
+        tokens are reported as they arrive and tool calls are dispatched as
+        soon as they are complete.
+
+        ``max_run_seconds`` (cf. BudgetsConfig.max_run_seconds; 0 or None =
+        no limit) sets a deadline that provider and tool calls inherit:
+        their timeouts shrink to the time left, retries that can't finish
+        are skipped, and the run is cancelled with RunTimeoutError when the
+        budget is gone.
+
+        With ``pipeline=True`` (non-streaming runs only), the next turn's
+        plan is requested while the current result is verified. It is
+        discarded if verification reports completion and used otherwise;
+        see ``pipeline_stats`` for the time saved and wasted.
+
+        With a ``run_store``, the context is checkpointed under ``run_id``
+        (a generated id if not given) after every state transition; see
+        ``resume``.
+        """
         if max_turns <= 0:
             raise MaxTurnsExceededError("max_turns must be positive")
 
-        context = AgentContext(goal=goal, inputs=inputs or {})
-        last_result = ""
+        context = AgentContext(goal=goal, inputs=inputs or {}, max_turns=max_turns)
+        if self.run_store is not None:
+            context.run_id = run_id or uuid.uuid4().hex
+            logger.info("Checkpointing run %s", context.run_id)
+            self._checkpoint(context)
+        return await self._execute(context, on_event, max_run_seconds)
 
-        for turn in range(max_turns):
-            context.turn_count = turn + 1
-            logger.info("Starting turn %s/%s", context.turn_count, max_turns)
-
-            if context.current_state != AgentState.OBSERVING:
-                self._transition_state(context, AgentState.OBSERVING)
-            await self._observe(context)
-
-            self._transition_state(context, AgentState.PLANNING)
-            plan = await self._plan(context)
+    async def resume(
+        self,
+        run_id: str,
+        on_event: Optional[Callable[[AgentEvent], Any]] = None,
+        max_run_seconds: Optional[float] = None,
+    ) -> str:
+        """
+        Continue a run from its last checkpoint in ``run_store``.
+
+        The run restarts at the step it was about to perform (e.g. an
+        interrupted verification is redone, but the plan and action before
+        it are not) and keeps its original max_turns. Resuming a finished
+        run returns its result.
+        """
+        data = self.run_store.load(run_id) if self.run_store is not None else None
+        if data is None:
+            raise RunNotFoundError(f"No checkpoint for run {run_id}")
+        context = decode_context(data)
+        if context.current_state in (AgentState.DONE, AgentState.FAILED):
+            return context.last_result or "Max turns reached without completing goal"
+        logger.info(
+            "Resuming run %s at turn %s (%s)",
+            run_id,
+            context.turn_count,
+            context.current_state.value,
+        )
+        return await self._execute(context, on_event, max_run_seconds, resume=True)
 
-            self._transition_state(context, AgentState.ACTING)
-            result = await self._act(context, plan)
-            last_result = result
+    async def _execute(
+        self,
+        context: AgentContext,
+        on_event: Optional[Callable[[AgentEvent], Any]],
+        max_run_seconds: Optional[float],
+        resume: bool = False,
+    ) -> str:
+        with deadline_scope(max_run_seconds) as deadline:
+            # Providers with server-side conversation state (e.g. OllamaProvider
+            # with keep_context) give each run its own session.
+            open_session = getattr(self.provider, "session", None)
+            planner = open_session() if open_session is not None else self.provider
+            try:
+                turns = self._run_turns(context, context.max_turns, planner, on_event, resume)
+                if deadline is None:
+                    return await turns
+                return await asyncio.wait_for(turns, deadline.remaining())
+            except asyncio.TimeoutError as exc:
+                raise RunTimeoutError(
+                    f"Run exceeded its time budget after {context.turn_count} turns"
+                ) from exc
+            except OrchestratorError as exc:
+                if isinstance(exc.__cause__, DeadlineExceededError):
+                    raise RunTimeoutError(str(exc)) from exc.__cause__
+                raise
+            finally:
+                if planner is not self.provider:
+                    await planner.close()
+
+    async def run_many(
+        self,
+        goals: Iterable[str],
+        concurrency: int = 10,
+        max_turns: int = 5,
+        ordered: bool = True,
+        max_run_seconds: Optional[float] = None,
+    ) -> BatchResult:
+        """
+        Run many goals concurrently, each with its own context.
+
+        Runs share this agent's provider and tool executor; at most
+        ``concurrency`` are in flight. Failed goals are reported in the
+        BatchResult rather than raised. Use AgentPool.as_completed to
+        stream outcomes of large batches.
+        """
+        pool = AgentPool(
+            self,
+            concurrency=concurrency,
+            max_turns=max_turns,
+            max_run_seconds=max_run_seconds,
+        )
+        return await pool.run(goals, ordered=ordered)
 
-            self._transition_state(context, AgentState.VERIFYING)
-            verification = await self._verify(context, result)
+    async def run_stream(
+        self,
+        goal: str,
+        max_turns: int = 5,
+        inputs: Optional[dict] = None,
+        max_run_seconds: Optional[float] = None,
+    ) -> AsyncIterator[AgentEvent]:
+        """
+        Run agent in streaming mode, yielding AgentEvents as they happen.
+
+        The last event has kind "done" and carries the final result.
+        """
+        queue: "asyncio.Queue[Optional[AgentEvent]]" = asyncio.Queue()
+        task = asyncio.ensure_future(
+            self.run(
+                goal,
+                max_turns=max_turns,
+                inputs=inputs,
+                on_event=queue.put_nowait,
+                max_run_seconds=max_run_seconds,
+            )
+        )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def _run_turns(
+        self,
+        context: AgentContext,
+        max_turns: int,
+        planner: Provider,
+        on_event: Optional[Callable[[AgentEvent], Any]] = None,
+        resume: bool = False,
+    ) -> str:
+        """Run the observe/plan/act/verify loop."""
+        speculation: Optional[_Speculation] = None
+        first_turn, resume_step = 0, 0
+        if resume and context.turn_count:
+            first_turn = context.turn_count - 1
+            resume_step = _TURN_STEPS.index(context.current_state)
 
-            if verification.is_complete:
-                self._transition_state(context, AgentState.DONE)
-                logger.info(
-                    "Goal achieved in %s turns: %s",
-                    context.turn_count,
-                    verification.reason,
+        try:
+            for turn in range(first_turn, max_turns):
+                skip, resume_step = resume_step, 0
+                if skip <= 0:
+                    context.turn_count = turn + 1
+                    logger.info("Starting turn %s/%s", context.turn_count, max_turns)
+                    self._enter_state(context, AgentState.OBSERVING)
+                    await self._observe(context)
+
+                dispatched: List["asyncio.Future[Any]"] = []
+                if skip <= 1:
+                    self._enter_state(context, AgentState.PLANNING)
+                    if speculation is not None:
+                        plan = await self._accept_speculation(context, speculation)
+                        speculation = None
+                    elif on_event is None:
+                        plan = await self._plan(context, planner)
+                    else:
+                        plan, dispatched = await self._plan_streaming(context, planner, on_event)
+                        await self._emit(on_event, context, "plan", plan)
+                elif skip == 2:
+                    plan, dispatched = self._checkpointed_plan(context, on_event is not None)
+
+                if skip <= 2:
+                    self._enter_state(context, AgentState.ACTING)
+                    context.last_result = await self._act(context, plan, dispatched)
+                    await self._emit(on_event, context, "result", context.last_result)
+
+                result = context.last_result
+                if skip <= 3:
+                    self._enter_state(context, AgentState.VERIFYING)
+                    if self.pipeline and on_event is None and turn + 1 < max_turns:
+                        speculation = self._speculate(context, planner)
+                    verification = await self._verify(context, result)
+                    if speculation is not None:
+                        speculation.verified = time.perf_counter()
+                    context.last_verification = verification
+                    await self._emit(on_event, context, "verification", verification.reason)
+
+                    if verification.is_complete:
+                        self._transition_state(context, AgentState.DONE)
+                        logger.info(
+                            "Goal achieved in %s turns: %s",
+                            context.turn_count,
+                            verification.reason,
+                        )
+                        await self._emit(on_event, context, "done", result)
+                        return result
+
+                self._enter_state(context, AgentState.REFINING)
+                feedback = context.last_verification.feedback if context.last_verification else ""
+                await self._refine(context, result, feedback)
+
+            self._transition_state(context, AgentState.FAILED)
+            logger.warning("Max turns (%s) reached without completing goal", max_turns)
+            final = context.last_result or "Max turns reached without completing goal"
+            await self._emit(on_event, context, "done", final)
+            return final
+        finally:
+            # Covers completion, errors and cancellation (e.g. the run deadline).
+            await self._discard_speculation(speculation)
+
+    def _enter_state(self, context: AgentContext, state: AgentState) -> None:
+        """Transition to ``state`` unless a resumed run is already in it."""
+        if context.current_state != state:
+            self._transition_state(context, state)
+
+    def _checkpointed_plan(
+        self, context: AgentContext, streaming: bool
+    ) -> Tuple[str, List["asyncio.Future[Any]"]]:
+        """
+        Recover the plan of a run resumed before acting.
+
+        In streaming mode its tool calls are dispatched again, as they
+        would have been while it streamed.
+        """
+        plan = next(
+            (message for role, message in reversed(context.history) if role == "assistant"), ""
+        )
+        dispatched: List["asyncio.Future[Any]"] = []
+        if streaming and self.tool_call_executor:
+            for call in ToolCallDetector().feed(plan):
+                request = json.dumps(call)
+                dispatched.append(
+                    asyncio.ensure_future(self._execute_tool(self.tool_call_executor, request))
                 )
-                return result
-
-            self._transition_state(context, AgentState.REFINING)
-            await self._refine(context, result, verification.feedback)
-
-        self._transition_state(context, AgentState.FAILED)
-        logger.warning("Max turns (%s) reached without completing goal", max_turns)
-        return last_result or "Max turns reached without completing goal"
+        return plan, dispatched
+
+    @staticmethod
+    async def _emit(
+        on_event: Optional[Callable[[AgentEvent], Any]],
+        context: AgentContext,
+        kind: str,
+        data: str,
+    ) -> None:
+        if on_event is None:
+            return
+        outcome = on_event(AgentEvent(kind, data, context.turn_count))
+        if inspect.isawaitable(outcome):
+            await outcome
 
     async def _observe(self, context: AgentContext) -> None:
         """Observe current state."""
         context.add_history("system", f"Goal: {context.goal} (Turn {context.turn_count})")
         logger.debug("Observed goal: %s", context.goal)
 
-    async def _plan(self, context: AgentContext) -> str:
+    def _plan_messages(
+        self, context: AgentContext, planner: Optional[Provider] = None
+    ) -> List[ChatMessage]:
+        """
+        Build the planning conversation.
+
+        Only the last ``plan_history`` history entries are included, unless
+        it is None or ``planner`` is a server-side session (see run()).
+        With the full history, each earlier plan is preceded by the question
+        it answered, so the conversation sent on one turn, plus its reply, is
+        an exact prefix of the next turn's conversation and can be reused by
+        backends with prompt/KV caching.
+        """
+        history = context.history
+        has_session = planner is not None and planner is not self.provider
+        if self.plan_history is not None and not has_session:
+            history = context.get_recent_history(n=self.plan_history)
+        messages = [
+            ChatMessage("system", f"You are an agent working towards a goal.\nGoal: {context.goal}")
+        ]
+        for role, message in history:
+            if role == "assistant":
+                messages.append(ChatMessage("user", PLAN_QUESTION))
+                messages.append(ChatMessage("assistant", message))
+            else:
+                messages.append(ChatMessage("user", message))
+        messages.append(ChatMessage("user", PLAN_QUESTION))
+        return messages
+
+    async def _plan(self, context: AgentContext, provider: Optional[Provider] = None) -> str:
         """Plan next action using the LLM."""
         try:
-            history_str = context.format_history(n=3)
-            prompt = (
-                f"Goal: {context.goal}\n\n"
-                f"Recent history:\n{history_str}\n\n"
-                "What should I do next to achieve this goal?"
+            messages = self._plan_messages(context, provider)
+            response = await (provider or self.provider).generate_chat(
+                messages, stable_prefix=len(messages) - 1
             )
-            response = await self.provider.generate(prompt)
             plan = response.text
         except Exception as exc:
             raise PlanningError(str(exc)) from exc
@@ -121,11 +434,123 @@ class Agent:
         logger.debug("Generated plan: %s", plan)
         return plan
 
-    async def _act(self, context: AgentContext, plan: str) -> str:
-        """Execute the plan."""
+    def _speculate(self, context: AgentContext, planner: Provider) -> _Speculation:
+        """Start planning the next turn from the history as it is now."""
+        snapshot = AgentContext(goal=context.goal, history=list(context.history))
+        snapshot.add_history("system", f"Goal: {context.goal} (Turn {context.turn_count + 1})")
+        messages = self._plan_messages(snapshot, planner)
+        task = asyncio.ensure_future(
+            planner.generate_chat(messages, stable_prefix=len(messages) - 1)
+        )
+        speculation = _Speculation(task=task, started=time.perf_counter())
+
+        def finished(_: "asyncio.Future[Any]") -> None:
+            speculation.finished = time.perf_counter()
+
+        task.add_done_callback(finished)
+        self.pipeline_stats.speculated += 1
+        return speculation
+
+    async def _accept_speculation(self, context: AgentContext, speculation: _Speculation) -> str:
+        """Use a speculative plan as this turn's plan."""
+        try:
+            plan = (await speculation.task).text
+        except Exception as exc:
+            raise PlanningError(str(exc)) from exc
+
+        # Planning time hidden behind verification.
+        finished = speculation.finished or time.perf_counter()
+        overlap_end = min(speculation.verified or finished, finished)
+        stats = self.pipeline_stats
+        stats.accepted += 1
+        stats.saved_ms += max(0.0, overlap_end - speculation.started) * 1000
+        context.add_history("assistant", plan)
+        logger.debug("Using speculative plan: %s", plan)
+        return plan
+
+    async def _discard_speculation(self, speculation: Optional[_Speculation]) -> None:
+        if speculation is None:
+            return
+        end = speculation.finished or time.perf_counter()
+        stats = self.pipeline_stats
+        stats.discarded += 1
+        stats.wasted_ms += (end - speculation.started) * 1000
+        speculation.task.cancel()
+        try:
+            await speculation.task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    async def _plan_streaming(
+        self,
+        context: AgentContext,
+        provider: Provider,
+        on_event: Callable[[AgentEvent], Any],
+    ) -> Tuple[str, List["asyncio.Future[Any]"]]:
+        """
+        Stream the plan, reporting tokens and dispatching tool calls early.
+
+        Returns the plan and the already-started tool calls.
+        """
+        detector = ToolCallDetector()
+        chunks: List[str] = []
+        dispatched: List["asyncio.Future[Any]"] = []
+        try:
+            stream = provider.stream(render_messages(self._plan_messages(context, provider)))
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    await self._emit(on_event, context, "token", chunk)
+                    for call in detector.feed(chunk):
+                        call_text = json.dumps(call)
+                        await self._emit(on_event, context, "tool_call", call_text)
+                        if self.tool_call_executor:
+                            dispatched.append(
+                                asyncio.ensure_future(
+                                    self._execute_tool(self.tool_call_executor, call_text)
+                                )
+                            )
+                    if dispatched and self.stop_after_tool_call:
+                        break
+            finally:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+        except Exception as exc:
+            for task in dispatched:
+                task.cancel()
+            raise PlanningError(str(exc)) from exc
+
+        plan = "".join(chunks)
+        context.add_history("assistant", plan)
+        logger.debug("Streamed plan: %s (%s tool calls)", plan, len(dispatched))
+        return plan, dispatched
+
+    @staticmethod
+    async def _execute_tool(executor: Callable[[str], Any], request: str) -> Any:
+        result = executor(request)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _act(
+        self,
+        context: AgentContext,
+        plan: str,
+        dispatched: Optional[List["asyncio.Future[Any]"]] = None,
+    ) -> str:
+        """Execute the plan (or collect the tool calls dispatched while streaming it)."""
         try:
-            if self.tool_executor:
-                result = self.tool_executor(plan)
+            if dispatched:
+                try:
+                    results = await asyncio.gather(*dispatched)
+                except BaseException:
+                    for task in dispatched:
+                        task.cancel()
+                    raise
+                result = "\n".join(str(item) for item in results)
+            elif self.tool_executor:
+                result = await self._execute_tool(self.tool_executor, plan)
             else:
                 result = f"Executed: {plan}"
         except Exception as exc:
@@ -0,0 +1,193 @@
+"""
+Checkpointing of agent runs.
+
+An Agent with a RunStore saves its AgentContext after every state
+transition, so ``Agent.resume(run_id)`` can continue an interrupted run
+from the step it was about to perform instead of paying for the earlier
+LLM calls again.
+
+Checkpoints are compact: the context is encoded as JSON with short keys
+and zlib-compressed, prefixed with a format version byte. Values in
+``inputs`` and ``metadata`` that are not JSON-serializable are stored as
+their ``str()``.
+
+The store can be chosen from config (``memory.run_store``):
+
+    >>> store = run_store_from_config({"backend": "sqlite", "config": {"path": "runs.db"}})
+    >>> agent = Agent(provider, run_store=store)
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Mapping, Optional
+
+from .context import AgentContext, VerificationResult
+from .states import AgentState
+
+FORMAT_VERSION = 1
+
+
+class CheckpointFormatError(ValueError):
+    """Raised when checkpoint data is malformed or has an unknown version."""
+
+
+class RunStore(ABC):
+    """Abstract store for run checkpoints."""
+
+    @abstractmethod
+    def save(self, run_id: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load(self, run_id: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, run_id: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_runs(self) -> List[str]:
+        raise NotImplementedError
+
+
+class InMemoryRunStore(RunStore):
+    """Process-local run store (checkpoints survive errors, not restarts)."""
+
+    def __init__(self) -> None:
+        self._runs: Dict[str, bytes] = {}
+
+    def save(self, run_id: str, data: bytes) -> None:
+        self._runs[run_id] = data
+
+    def load(self, run_id: str) -> Optional[bytes]:
+        return self._runs.get(run_id)
+
+    def delete(self, run_id: str) -> bool:
+        return self._runs.pop(run_id, None) is not None
+
+    def list_runs(self) -> List[str]:
+        return list(self._runs)
+
+
+class SqliteRunStore(RunStore):
+    """SQLite run store."""
+
+    def __init__(self, path: str = "runs.db") -> None:
+        self._path = path
+        self._conn = sqlite3.connect(self._path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS agent_runs (
+                run_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def save(self, run_id: str, data: bytes) -> None:
+        self._conn.execute(
+            """
+            INSERT INTO agent_runs (run_id, data) VALUES (?, ?)
+            ON CONFLICT(run_id) DO UPDATE SET data = excluded.data
+            """,
+            (run_id, data),
+        )
+        self._conn.commit()
+
+    def load(self, run_id: str) -> Optional[bytes]:
+        row = self._conn.execute(
+            "SELECT data FROM agent_runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def delete(self, run_id: str) -> bool:
+        cursor = self._conn.execute("DELETE FROM agent_runs WHERE run_id = ?", (run_id,))
+        self._conn.commit()
+        return cursor.rowcount > 0
+
+    def list_runs(self) -> List[str]:
+        rows = self._conn.execute("SELECT run_id FROM agent_runs ORDER BY rowid")
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+RUN_STORES = {
+    "memory": InMemoryRunStore,
+    "sqlite": SqliteRunStore,
+}
+
+
+def run_store_from_config(config: Any) -> Optional[RunStore]:
+    """
+    Build a run store from a ``memory.run_store`` BackendConfig (or mapping).
+
+    Backends: "memory", "sqlite" (config: path) and "disabled" (returns None).
+    """
+    if isinstance(config, Mapping):
+        backend, options = config.get("backend", "memory"), config.get("config") or {}
+    else:
+        backend, options = config.backend, config.config
+    if backend == "disabled":
+        return None
+    if backend not in RUN_STORES:
+        available = ", ".join(sorted(RUN_STORES))
+        raise ValueError(f"Unknown run store backend '{backend}'. Available: {available}, disabled")
+    return RUN_STORES[backend](**dict(options))
+
+
+def encode_context(context: AgentContext) -> bytes:
+    """Serialize a context to compact checkpoint bytes."""
+    verification = context.last_verification
+    verdict = None
+    if verification is not None:
+        verdict = [
+            verification.is_complete,
+            verification.confidence,
+            verification.reason,
+            verification.feedback,
+        ]
+    payload = {
+        "id": context.run_id,
+        "g": context.goal,
+        "i": context.inputs,
+        "t": context.turn_count,
+        "m": context.max_turns,
+        "s": context.current_state.value,
+        "h": [[role, message] for role, message in context.history],
+        "md": context.metadata,
+        "r": context.last_result,
+        "v": verdict,
+    }
+    text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+    return bytes([FORMAT_VERSION]) + zlib.compress(text.encode("utf-8"))
+
+
+def decode_context(data: bytes) -> AgentContext:
+    """Rebuild a context from ``encode_context`` output."""
+    if not data or data[0] != FORMAT_VERSION:
+        raise CheckpointFormatError("Unknown checkpoint format version")
+    try:
+        payload = json.loads(zlib.decompress(data[1:]).decode("utf-8"))
+        verification = payload["v"]
+        return AgentContext(
+            goal=payload["g"],
+            inputs=payload["i"],
+            turn_count=payload["t"],
+            history=[(role, message) for role, message in payload["h"]],
+            metadata=payload["md"],
+            current_state=AgentState(payload["s"]),
+            run_id=payload["id"],
+            max_turns=payload["m"],
+            last_result=payload["r"],
+            last_verification=None if verification is None else VerificationResult(*verification),
+        )
+    except (zlib.error, ValueError, KeyError, TypeError) as exc:
+        raise CheckpointFormatError(f"Corrupt checkpoint: {exc}") from exc
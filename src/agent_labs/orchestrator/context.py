@@ -16,6 +16,28 @@ class VerificationResult:
     feedback: str = ""
 
 
+@dataclass
+class PipelineStats:
+    """Speculative planning counters for pipelined agents."""
+
+    speculated: int = 0
+    accepted: int = 0
+    discarded: int = 0
+    saved_ms: float = 0.0
+    """Planning time overlapped with verification in accepted speculations."""
+    wasted_ms: float = 0.0
+    """Provider time spent on discarded speculations."""
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "speculated": self.speculated,
+            "accepted": self.accepted,
+            "discarded": self.discarded,
+            "saved_ms": self.saved_ms,
+            "wasted_ms": self.wasted_ms,
+        }
+
+
 @dataclass
 class AgentContext:
     """Context and state for an agent execution run."""
@@ -26,6 +48,10 @@ class AgentContext:
     history: List[Tuple[str, str]] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
     current_state: AgentState = AgentState.OBSERVING
+    run_id: Optional[str] = None
+    max_turns: int = 0
+    last_result: str = ""
+    last_verification: Optional[VerificationResult] = None
 
     def add_history(self, role: str, message: str) -> None:
         """Append a message to the conversation history."""
@@ -21,6 +21,14 @@ class ActionExecutionError(OrchestratorError):
     """Raised when action execution fails."""
 
 
+class RunTimeoutError(OrchestratorError):
+    """Raised when a run exceeds its max_run_seconds budget."""
+
+
+class RunNotFoundError(OrchestratorError):
+    """Raised when resuming a run that has no checkpoint."""
+
+
 class StateTransitionError(OrchestratorError):
     """Raised when an invalid state transition is attempted."""
 
@@ -0,0 +1,180 @@
+"""
+Batch execution of many goals over one agent.
+
+AgentPool runs goals concurrently with a fixed number of workers that share
+the agent's provider, verifier and tool executor. Every run gets its own
+AgentContext, so goals never see each other's history. A failing goal is
+recorded in its RunOutcome instead of aborting the batch.
+
+Goals are pulled lazily, so a generator over a large job only keeps
+``concurrency`` runs in flight.
+
+Example:
+    >>> pool = AgentPool(Agent(provider), concurrency=16)
+    >>> batch = await pool.run(goals)
+    >>> print(batch.to_dict())
+    >>> async for outcome in pool.as_completed(goals):
+    ...     save(outcome.goal, outcome.result)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from ..stats import percentile
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class RunOutcome:
+    """Result of one goal in a batch."""
+
+    index: int
+    """Position of the goal in the input."""
+
+    goal: str
+    result: Optional[str] = None
+    error: Optional[BaseException] = None
+    latency_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    """Outcomes and aggregate metrics of a batch."""
+
+    outcomes: List[RunOutcome] = field(default_factory=list)
+    duration_s: float = 0.0
+
+    @property
+    def results(self) -> List[Optional[str]]:
+        """Result of each outcome (None for failed goals)."""
+        return [outcome.result for outcome in self.outcomes]
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for outcome in self.outcomes if outcome.ok)
+
+    @property
+    def failed(self) -> int:
+        return len(self.outcomes) - self.succeeded
+
+    @property
+    def throughput(self) -> float:
+        """Completed goals per second."""
+        return self.succeeded / self.duration_s if self.duration_s else 0.0
+
+    def percentiles(self) -> Dict[str, float]:
+        """Latency percentiles (ms) of successful goals."""
+        latencies = [outcome.latency_ms for outcome in self.outcomes if outcome.ok]
+        if not latencies:
+            return {}
+        return {f"p{pct}": percentile(latencies, pct) for pct in PERCENTILES}
+
+    def error_types(self) -> Dict[str, int]:
+        return dict(
+            Counter(type(outcome.error).__name__ for outcome in self.outcomes if not outcome.ok)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "goals": len(self.outcomes),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "duration_s": self.duration_s,
+            "throughput": self.throughput,
+            "latency_ms": self.percentiles(),
+            "error_types": self.error_types(),
+        }
+
+
+class AgentPool:
+    """Run many goals concurrently over one shared agent."""
+
+    def __init__(
+        self,
+        agent: Any,
+        concurrency: int = 10,
+        max_turns: int = 5,
+        max_run_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """
+        Initialize AgentPool.
+
+        Args:
+            agent: Agent whose run() is used for every goal
+            concurrency: Number of goals in flight at once
+            max_turns: max_turns passed to each run
+            max_run_seconds: Per-goal time budget passed to each run
+            clock: Timer (injectable for tests)
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        self.agent = agent
+        self.concurrency = concurrency
+        self.max_turns = max_turns
+        self.max_run_seconds = max_run_seconds
+        self._clock = clock
+
+    async def run(self, goals: Iterable[str], ordered: bool = True) -> BatchResult:
+        """
+        Run all goals and collect their outcomes.
+
+        Outcomes are in input order, or in completion order with
+        ``ordered=False``.
+        """
+        start = self._clock()
+        outcomes = [outcome async for outcome in self.as_completed(goals)]
+        if ordered:
+            outcomes.sort(key=lambda outcome: outcome.index)
+        return BatchResult(outcomes=outcomes, duration_s=self._clock() - start)
+
+    async def as_completed(self, goals: Iterable[str]) -> AsyncIterator[RunOutcome]:
+        """Yield each goal's outcome as soon as it finishes."""
+        pending = enumerate(goals)
+        queue: "asyncio.Queue[Optional[RunOutcome]]" = asyncio.Queue()
+
+        async def worker() -> None:
+            try:
+                for index, goal in pending:
+                    queue.put_nowait(await self._run_one(index, goal))
+            finally:
+                queue.put_nowait(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        try:
+            running = len(workers)
+            while running:
+                outcome = await queue.get()
+                if outcome is None:
+                    running -= 1
+                    continue
+                yield outcome
+            # Surface errors raised by the goal iterable itself.
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    async def _run_one(self, index: int, goal: str) -> RunOutcome:
+        start = self._clock()
+        try:
+            result = await self.agent.run(
+                goal,
+                max_turns=self.max_turns,
+                max_run_seconds=self.max_run_seconds,
+            )
+        except Exception as exc:
+            latency_ms = (self._clock() - start) * 1000
+            return RunOutcome(index=index, goal=goal, error=exc, latency_ms=latency_ms)
+        latency_ms = (self._clock() - start) * 1000
+        return RunOutcome(index=index, goal=goal, result=result, latency_ms=latency_ms)
@@ -0,0 +1,106 @@
+"""Streaming support for the agent loop.
+
+In streaming mode the agent consumes plan tokens as the provider produces
+them, reports them as AgentEvents, and dispatches tool calls as soon as
+one has been fully generated instead of waiting for the whole plan.
+
+A tool call is a JSON object with a "tool" key anywhere in the plan, e.g.
+``{"tool": "search", "args": {"query": "python asyncio"}}``.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class AgentEvent:
+    """Something that happened during a streaming run."""
+
+    kind: str
+    """"token", "tool_call", "plan", "result", "verification" or "done"."""
+
+    data: str
+    """Token text, tool call JSON, plan, result or verification reason."""
+
+    turn: int = 0
+    """Turn the event belongs to (1-based)."""
+
+    timestamp: float = field(default_factory=time.perf_counter)
+    """perf_counter() when the event was emitted."""
+
+
+class ToolCallDetector:
+    """
+    Incrementally find complete tool-call JSON objects in streamed text.
+
+    A candidate object is dropped as soon as it can no longer be JSON (a
+    brace not followed by a key or "}", or a raw newline inside a string),
+    so a stray brace in prose doesn't hide the tool calls that follow it.
+    """
+
+    def __init__(self, key: str = "tool"):
+        self.key = key
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect_key = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk and return the tool calls it completed."""
+        calls = []
+        for char in chunk:
+            if self._depth and self._impossible(char):
+                self._reset()
+            if self._depth == 0:
+                if char == "{":
+                    self._buffer = [char]
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char.isspace():
+                continue
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    call = self._parse("".join(self._buffer))
+                    if call is not None:
+                        calls.append(call)
+            self._expect_key = char == "{" and not self._in_string
+        return calls
+
+    def _impossible(self, char: str) -> bool:
+        """Whether ``char`` means the buffered text can't become JSON."""
+        if self._in_string:
+            return char == "\n"
+        return self._expect_key and not char.isspace() and char not in '"}'
+
+    def _reset(self) -> None:
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect_key = False
+
+    def _parse(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return None
+        if isinstance(value, dict) and self.key in value:
+            return value
+        return None
@@ -5,7 +5,7 @@ Built-in guardrails for safety enforcement.
 from __future__ import annotations
 
 import re
-from typing import List
+from typing import List, Optional
 
 from .base import Guardrail, GuardrailResult
 from ..context.tokens import TokenCounter
@@ -16,12 +16,13 @@ class TokenLimitGuardrail(Guardrail):
 
     name = "token_limit"
 
-    def __init__(self, max_tokens: int, enabled: bool = True) -> None:
+    def __init__(self, max_tokens: int, enabled: bool = True, model: Optional[str] = None) -> None:
         super().__init__(enabled=enabled)
         self.max_tokens = max_tokens
+        self.model = model
 
     def check_input(self, text: str) -> GuardrailResult:
-        tokens = TokenCounter.count(text)
+        tokens = TokenCounter.count(text, self.model)
         if tokens > self.max_tokens:
             return GuardrailResult(
                 allowed=False,
@@ -34,7 +35,7 @@ class TokenLimitGuardrail(Guardrail):
         )
 
     def check_output(self, text: str) -> GuardrailResult:
-        tokens = TokenCounter.count(text)
+        tokens = TokenCounter.count(text, self.model)
         if tokens > self.max_tokens:
             return GuardrailResult(
                 allowed=False,
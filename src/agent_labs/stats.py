@@ -0,0 +1,15 @@
+"""
+Statistics helpers shared by providers, evaluation and orchestration.
+"""
+
+import math
+from typing import Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``pct`` in 0-100)."""
+    if not samples:
+        raise ValueError("percentile of empty sequence")
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
@@ -14,6 +14,17 @@ import httpx
 from .base import Tool
 from .contract import ToolContract, ToolResult, ExecutionStatus
 from ..config import Config
+from ..llm_providers.deadline import DeadlineExceededError, current_deadline
+from ..llm_providers.http_pool import get_http_pool
+
+
+def _request_timeout(default: float) -> float:
+    """``default`` shrunk to the current deadline (see deadline_scope)."""
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    deadline.check("Ollama tool request")
+    return deadline.timeout(default)
 
 
 class OllamaConnectionError(Exception):
@@ -133,17 +144,18 @@ Text: {text}
 
 Summary:"""
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "temperature": self.temperature,
-                        "num_predict": self.max_tokens
-                    }
-                )
+            client = get_http_pool().get(self.ollama_url)
+            response = await client.post(
+                f"{self.ollama_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "temperature": self.temperature,
+                    "num_predict": self.max_tokens
+                },
+                timeout=_request_timeout(self.timeout),
+            )
             
             if response.status_code != 200:
                 return ToolResult(
@@ -191,7 +203,7 @@ Summary:"""
                 latency_ms=int((time.perf_counter() - start) * 1000)
             )
         
-        except TimeoutError:
+        except (TimeoutError, httpx.TimeoutException, DeadlineExceededError):
             return ToolResult(
                 status=ExecutionStatus.TIMEOUT,
                 output=None,
@@ -337,16 +349,17 @@ Code:
 
 Provide a concise analysis with specific issues found and actionable suggestions."""
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "temperature": 0.3
-                    }
-                )
+            client = get_http_pool().get(self.ollama_url)
+            response = await client.post(
+                f"{self.ollama_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "temperature": 0.3
+                },
+                timeout=_request_timeout(self.timeout),
+            )
             
             if response.status_code != 200:
                 return ToolResult(
@@ -401,7 +414,7 @@ Provide a concise analysis with specific issues found and actionable suggestions
                 latency_ms=int((time.perf_counter() - start) * 1000)
             )
         
-        except TimeoutError:
+        except (TimeoutError, httpx.TimeoutException, DeadlineExceededError):
             return ToolResult(
                 status=ExecutionStatus.TIMEOUT,
                 output=None,
@@ -7,8 +7,10 @@ This module provides:
 3. Error handling and result formatting
 """
 
+import asyncio
 import time
 from typing import Dict, List, Optional
+from ..llm_providers.deadline import current_deadline
 from .base import Tool
 from .contract import ToolResult, ExecutionStatus
 from .validators import ToolInputValidator, ToolOutputValidator
@@ -161,9 +163,17 @@ class ToolRegistry:
             if validated_data is not None:
                 execution_kwargs = validated_data
         
-        # Execute tool
+        # Execute tool, bounded by the caller's deadline (see deadline_scope)
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            return self._timeout_result(name, start_time)
         try:
-            result = await tool.execute(**execution_kwargs)
+            if deadline is None:
+                result = await tool.execute(**execution_kwargs)
+            else:
+                result = await asyncio.wait_for(
+                    tool.execute(**execution_kwargs), deadline.remaining()
+                )
 
             # Validate outputs if contract specifies output_schema
             if result.success and hasattr(tool, "contract") and tool.contract.output_schema:
@@ -186,6 +196,9 @@ class ToolRegistry:
             return result
             
         except Exception as e:
+            # A TimeoutError raised by the tool itself is an ordinary failure.
+            if isinstance(e, asyncio.TimeoutError) and deadline is not None and deadline.expired:
+                return self._timeout_result(name, start_time)
             return ToolResult(
                 status=ExecutionStatus.FAILURE,
                 output=None,
@@ -197,6 +210,16 @@ class ToolRegistry:
                 latency_ms=(time.perf_counter() - start_time) * 1000,
             )
     
+    @staticmethod
+    def _timeout_result(name: str, start_time: float) -> ToolResult:
+        return ToolResult(
+            status=ExecutionStatus.TIMEOUT,
+            output=None,
+            error=f"Tool '{name}' did not finish before the deadline",
+            metadata={"tool_name": name},
+            latency_ms=(time.perf_counter() - start_time) * 1000,
+        )
+    
     async def execute_batch(
         self,
         operations: List[Dict[str, any]]
@@ -2,6 +2,7 @@
 Unit tests for evaluation framework.
 """
 
+import asyncio
 import json
 
 from src.agent_labs.evaluation import (
@@ -15,9 +16,10 @@ from src.agent_labs.evaluation import (
     report_markdown,
     score_distribution,
     comparison_chart,
+    LoadGenerator,
 )
 from src.agent_labs.orchestrator import Agent
-from src.agent_labs.llm_providers import MockProvider
+from src.agent_labs.llm_providers import MockProvider, SimulatedProvider
 
 
 def test_exact_match_scorer():
@@ -79,3 +81,23 @@ def test_orchestrator_integration_mock():
     output = "Mock response to: What is AI?"
     eval_result = scorer.score(output, "Mock response to: What is AI?")
     assert eval_result.score == 1.0
+
+
+def test_load_generator_reports_throughput_and_percentiles():
+    def responder(prompt: str) -> str:
+        return "YES | done" if prompt.startswith("Goal:") else "plan the work"
+
+    provider = SimulatedProvider(
+        responder=responder, capacity=2, failure_rate=0.2, seed=3, time_scale=0.001
+    )
+    generator = LoadGenerator(lambda: Agent(provider), concurrency=4, max_turns=1)
+
+    result = asyncio.run(generator.run(["task a", "task b"], total=20))
+
+    assert result.runs == 20
+    assert result.errors == sum(result.error_types.values())
+    assert 0 < result.errors < 20
+    assert len(result.latencies_ms) == 20 - result.errors
+    assert set(result.percentiles()) == {"p50", "p90", "p95", "p99"}
+    assert result.to_dict()["throughput"] > 0
+    assert provider.stats.max_in_flight <= 2
@@ -9,7 +9,14 @@ Test approach: TDD (test-driven development)
 """
 
 import pytest
-from src.agent_labs.llm_providers import MockProvider, LLMResponse, Provider
+from src.agent_labs.llm_providers import (
+    ChatMessage,
+    LLMResponse,
+    MockProvider,
+    Provider,
+    as_messages,
+    render_messages,
+)
 
 
 @pytest.mark.asyncio
@@ -215,3 +222,28 @@ class TestProviderInterface:
         assert callable(provider.stream)
         assert hasattr(provider, 'count_tokens')
         assert callable(provider.count_tokens)
+
+
+class TestChatMessages:
+    """Test chat message helpers and the default generate_chat."""
+
+    def test_as_messages_accepts_dicts_and_messages(self):
+        messages = as_messages(
+            [{"role": "system", "content": "Be brief"}, ChatMessage("user", "Hi")]
+        )
+
+        assert messages == [ChatMessage("system", "Be brief"), ChatMessage("user", "Hi")]
+        assert messages[1].to_dict() == {"role": "user", "content": "Hi"}
+
+    def test_render_messages_flattens_conversation(self):
+        text = render_messages([ChatMessage("system", "Be brief"), ChatMessage("user", "Hi")])
+
+        assert text == "system: Be brief\n\nuser: Hi"
+
+    @pytest.mark.asyncio
+    async def test_default_generate_chat_uses_flattened_prompt(self):
+        provider = MockProvider()
+
+        response = await provider.generate_chat([ChatMessage("user", "Hi")], stable_prefix=0)
+
+        assert response.text == "Mock response to: user: Hi"
@@ -0,0 +1,122 @@
+"""
+Tests for deadline propagation through providers and tools.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.agent_labs.llm_providers import OllamaProvider, ProviderConnectionError
+from src.agent_labs.llm_providers.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    current_deadline,
+    deadline_scope,
+)
+from src.agent_labs.tools import ExecutionStatus, MockTool, ToolRegistry
+
+
+class TestDeadline:
+    """Test Deadline and deadline_scope."""
+
+    def test_remaining_and_check(self):
+        now = [0.0]
+        deadline = Deadline(2.0, clock=lambda: now[0])
+
+        assert deadline.timeout(60) == 2.0
+        assert deadline.allows(1.5)
+        now[0] = 3.0
+        assert deadline.remaining() == 0.0
+        with pytest.raises(DeadlineExceededError):
+            deadline.check()
+
+    def test_nested_scopes_only_tighten(self):
+        assert current_deadline() is None
+        with deadline_scope(1.0) as outer:
+            with deadline_scope(100.0) as inner:
+                assert inner is outer
+            with deadline_scope(0.5) as inner:
+                assert inner.expires_at < outer.expires_at
+            with deadline_scope(None) as inner:
+                assert inner is outer
+        assert current_deadline() is None
+
+
+class TestProviderDeadlines:
+    """Test that providers shrink timeouts and skip retries under a deadline."""
+
+    @pytest.mark.asyncio
+    async def test_ollama_shrinks_timeout_and_skips_late_retries(self):
+        timeouts = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            timeouts.append(request.extensions["timeout"]["read"])
+            raise httpx.ConnectError("down", request=request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        provider = OllamaProvider(
+            base_url="http://stub", client=client, timeout=60, max_retries=5, retry_backoff=1.0
+        )
+
+        with deadline_scope(0.5):
+            with pytest.raises(ProviderConnectionError):
+                await provider.generate("hi")
+
+        # One attempt: a 1s backoff can't fit in the 0.5s budget.
+        assert len(timeouts) == 1
+        assert timeouts[0] <= 0.5
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_fails_before_request(self):
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(200, json={"response": "hi"})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        provider = OllamaProvider(base_url="http://stub", client=client)
+
+        with deadline_scope(0.01):
+            await asyncio.sleep(0.02)
+            with pytest.raises(DeadlineExceededError):
+                await provider.generate("hi")
+
+        assert calls == []
+
+
+class TestToolDeadlines:
+    """Test ToolRegistry.execute under a deadline."""
+
+    @pytest.mark.asyncio
+    async def test_slow_tool_times_out(self):
+        class SlowTool(MockTool):
+            async def execute(self, **kwargs):
+                await asyncio.sleep(5)
+                return await super().execute(**kwargs)
+
+        registry = ToolRegistry()
+        registry.register(SlowTool("slow"))
+
+        with deadline_scope(0.05):
+            result = await asyncio.wait_for(
+                registry.execute("slow", validate_input=False), timeout=1
+            )
+
+        assert result.status == ExecutionStatus.TIMEOUT
+
+    @pytest.mark.asyncio
+    async def test_tool_timeout_error_before_deadline_is_a_failure(self):
+        class TimingOutTool(MockTool):
+            async def execute(self, **kwargs):
+                raise asyncio.TimeoutError()
+
+        registry = ToolRegistry()
+        registry.register(TimingOutTool("upstream"))
+
+        with deadline_scope(60):
+            result = await registry.execute("upstream", validate_input=False)
+
+        assert result.status == ExecutionStatus.FAILURE
+        assert result.metadata["exception_type"] == "TimeoutError"
@@ -0,0 +1,61 @@
+"""
+Tests for the shared HTTP client pool.
+"""
+
+import pytest
+
+from src.agent_labs.llm_providers import (
+    HTTPClientPool,
+    OllamaProvider,
+    OpenAIProvider,
+    PoolConfig,
+    ProviderConfigError,
+    get_http_pool,
+)
+from src.agent_labs.llm_providers.http_pool import origin
+
+
+def test_origin_normalizes_urls():
+    assert origin("http://LocalHost:11434/api") == "http://localhost:11434"
+    assert origin("https://api.openai.com/v1") == "https://api.openai.com:443"
+    with pytest.raises(ProviderConfigError):
+        origin("localhost:11434")
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_per_origin_and_config():
+    pool = HTTPClientPool()
+
+    a = pool.get("http://host-a:11434")
+    assert pool.get("http://host-a:11434/api/generate") is a
+    assert pool.get("http://host-b:11434") is not a
+    assert pool.get("http://host-a:11434", PoolConfig(max_connections=5)) is not a
+
+    await pool.aclose()
+
+    assert a.is_closed
+    assert len(pool) == 0
+
+
+@pytest.mark.asyncio
+async def test_providers_use_process_wide_pool():
+    first = OllamaProvider(base_url="http://pooled-host:11434")
+    second = OllamaProvider(base_url="http://pooled-host:11434", model="mistral")
+    await first._ensure_client()
+    await second._ensure_client()
+
+    assert first._client is second._client
+    assert first._client is get_http_pool().get("http://pooled-host:11434")
+
+    await first.close()
+    assert not second._client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_openai_limits_select_pool_settings():
+    provider = OpenAIProvider(api_key="k", base_url="http://stub/v1", max_connections=7)
+    await provider._ensure_client()
+
+    assert provider._client is get_http_pool().get(
+        "http://stub/v1", PoolConfig(max_connections=7)
+    )
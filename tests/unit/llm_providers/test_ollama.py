@@ -0,0 +1,263 @@
+"""
+Tests for OllamaProvider streaming against an in-process stub server.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from src.agent_labs.llm_providers import ChatMessage, OllamaProvider
+from src.agent_labs.llm_providers.ndjson import NDJSONDecoder
+
+
+def _lines(*tokens: str, done: bool = True) -> bytes:
+    events = [{"response": token, "done": False} for token in tokens]
+    if done:
+        events.append({"response": "", "done": True, "eval_count": len(tokens)})
+    return b"".join(json.dumps(event).encode() + b"\n" for event in events)
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Response body delivered in fixed chunks, optionally failing midway."""
+
+    def __init__(self, chunks, error: Exception = None):
+        self.chunks = chunks
+        self.error = error
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+
+def _provider(handler) -> OllamaProvider:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return OllamaProvider(base_url="http://stub", model="llama2", client=client, retry_backoff=0)
+
+
+class TestNDJSONDecoder:
+    """Test NDJSONDecoder."""
+
+    def test_objects_split_across_chunks(self):
+        decoder = NDJSONDecoder()
+        body = _lines("Hel", "lo")
+
+        objects = []
+        for i in range(0, len(body), 7):
+            objects.extend(decoder.feed(body[i:i + 7]))
+
+        assert [o["response"] for o in objects] == ["Hel", "lo", ""]
+        assert decoder.pending == 0
+
+    def test_flush_returns_unterminated_line_and_skips_blanks(self):
+        decoder = NDJSONDecoder()
+
+        assert decoder.feed(b'\r\n{"a": 1}\r\n\n{"b": 2}') == [{"a": 1}]
+        assert decoder.flush() == [{"b": 2}]
+        assert decoder.flush() == []
+
+
+class TestOllamaStream:
+    """Test OllamaProvider.stream."""
+
+    @pytest.mark.asyncio
+    async def test_stream_decodes_chunked_body(self):
+        body = _lines("Hel", "lo", " world")
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            payload = json.loads(request.content)
+            assert payload["stream"] is True
+            assert "seed" in payload["options"]
+            chunks = [body[i:i + 5] for i in range(0, len(body), 5)]
+            return httpx.Response(200, stream=ChunkedStream(chunks))
+
+        chunks = [chunk async for chunk in _provider(handler).stream("Hi")]
+
+        assert "".join(chunks) == "Hello world"
+
+    @pytest.mark.asyncio
+    async def test_retry_resumes_without_repeating_tokens(self):
+        seeds = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            seeds.append(json.loads(request.content)["options"]["seed"])
+            if len(seeds) == 1:
+                return httpx.Response(
+                    200,
+                    stream=ChunkedStream(
+                        [_lines("The ", "qui", done=False) + b'{"respon'],
+                        error=httpx.ReadError("connection reset"),
+                    ),
+                )
+            return httpx.Response(200, stream=ChunkedStream([_lines("The ", "quick", " fox")]))
+
+        chunks = [chunk async for chunk in _provider(handler).stream("Hi")]
+
+        assert chunks == ["The ", "qui", "ck", " fox"]
+        assert len(seeds) == 2 and seeds[0] == seeds[1]
+
+    @pytest.mark.asyncio
+    async def test_retry_raises_when_regenerated_text_differs(self):
+        from src.agent_labs.llm_providers import ProviderConnectionError
+
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(
+                    200,
+                    stream=ChunkedStream(
+                        [_lines("The ", "qui", done=False)],
+                        error=httpx.ReadError("connection reset"),
+                    ),
+                )
+            return httpx.Response(200, stream=ChunkedStream([_lines("A ", "slow", " dog")]))
+
+        chunks = []
+        with pytest.raises(ProviderConnectionError, match="diverged"):
+            async for chunk in _provider(handler).stream("Hi"):
+                chunks.append(chunk)
+
+        assert chunks == ["The ", "qui"]
+
+
+class TestOllamaChat:
+    """Test OllamaProvider.generate_chat."""
+
+    @pytest.mark.asyncio
+    async def test_generate_chat_posts_to_chat_endpoint(self):
+        seen = {}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            seen["path"] = request.url.path
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(
+                200,
+                json={"message": {"role": "assistant", "content": "hi"}, "eval_count": 3},
+            )
+
+        response = await _provider(handler).generate_chat(
+            [{"role": "system", "content": "Be brief"}, {"role": "user", "content": "Hello"}]
+        )
+
+        assert response.text == "hi"
+        assert response.tokens_used == 3
+        assert seen["path"] == "/api/chat"
+        assert seen["body"]["messages"][1] == {"role": "user", "content": "Hello"}
+        assert seen["body"]["stream"] is False
+
+
+class TestOllamaSession:
+    """Test KV-context carry-over in OllamaProvider sessions."""
+
+    @staticmethod
+    def _context_server(payloads):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            payload = json.loads(request.content)
+            payloads.append(payload)
+            previous = payload.get("context", [])
+            return httpx.Response(
+                200,
+                json={
+                    "response": f"reply{len(payloads)}",
+                    "eval_count": 1,
+                    "context": previous + [len(payloads)] * 3,
+                },
+            )
+
+        return handler
+
+    def _provider(self, payloads, **kwargs) -> OllamaProvider:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self._context_server(payloads)))
+        return OllamaProvider(base_url="http://stub", client=client, keep_context=True, **kwargs)
+
+    def test_session_is_opt_in(self):
+        provider = OllamaProvider()
+
+        assert provider.session() is provider
+
+    @pytest.mark.asyncio
+    async def test_follow_up_sends_only_new_messages_with_context(self):
+        payloads = []
+        session = self._provider(payloads).session("run-1")
+        first = [ChatMessage("system", "Goal"), ChatMessage("user", "Q1")]
+
+        reply = await session.generate_chat(first)
+        await session.generate_chat(
+            first + [ChatMessage("assistant", reply.text), ChatMessage("user", "Q2")]
+        )
+
+        assert "context" not in payloads[0]
+        assert payloads[0]["prompt"] == "system: Goal\n\nuser: Q1"
+        assert payloads[1]["context"] == [1, 1, 1]
+        assert payloads[1]["prompt"] == "user: Q2"
+        assert session.provider.context_reuses == 1
+
+    @pytest.mark.asyncio
+    async def test_rewritten_history_invalidates_context(self):
+        payloads = []
+        session = self._provider(payloads).session("run-1")
+        first = [ChatMessage("user", "Q1")]
+
+        await session.generate_chat(first)
+        await session.generate_chat([ChatMessage("user", "Summary"), ChatMessage("user", "Q2")])
+
+        assert "context" not in payloads[1]
+        assert payloads[1]["prompt"] == "user: Summary\n\nuser: Q2"
+
+    @pytest.mark.asyncio
+    async def test_contexts_are_bounded(self):
+        payloads = []
+        provider = self._provider(payloads, max_sessions=2, max_context_tokens=4)
+
+        for name in ("a", "b", "c"):
+            await provider.session(name).generate_chat([ChatMessage("user", name)])
+
+        assert provider.context_sessions == 2
+        session = provider.session("a")
+        await session.generate_chat([ChatMessage("user", "a")])
+        await session.generate_chat(
+            [
+                ChatMessage("user", "a"),
+                ChatMessage("assistant", "reply4"),
+                ChatMessage("user", "more"),
+            ]
+        )
+
+        # "a" was evicted earlier, so its context was rebuilt; the next one
+        # would exceed max_context_tokens and is not kept.
+        assert payloads[-1]["context"] == [4, 4, 4]
+        assert provider.context_sessions == 1
+
+
+class TestOllamaUsage:
+    """Test token counts and timings parsed from Ollama responses."""
+
+    @pytest.mark.asyncio
+    async def test_generate_reports_token_split_and_server_timings(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                json={
+                    "response": "hi",
+                    "prompt_eval_count": 12,
+                    "eval_count": 3,
+                    "load_duration": 5_000_000,
+                    "prompt_eval_duration": 20_000_000,
+                    "eval_duration": 30_000_000,
+                    "total_duration": 60_000_000,
+                },
+            )
+
+        response = await _provider(handler).generate("Hello")
+
+        assert response.prompt_tokens == 12
+        assert response.completion_tokens == 3
+        assert response.total_tokens == 15
+        assert response.timings.prompt_eval_ms == pytest.approx(20.0)
+        assert response.timings.eval_ms == pytest.approx(30.0)
+        assert response.timings.server_ms == pytest.approx(60.0)
+        assert response.timings.ttft_ms == pytest.approx(25.0)
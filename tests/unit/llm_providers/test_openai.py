@@ -0,0 +1,167 @@
+"""
+Tests for OpenAIProvider against an in-process OpenAI-compatible stub server.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.agent_labs.llm_providers import (
+    ChatMessage,
+    ModelNotFoundError,
+    OpenAIProvider,
+    ProviderAuthError,
+    ProviderRateLimitError,
+)
+
+
+def _completion(text: str, total_tokens: int = 7) -> dict:
+    return {
+        "model": "gpt-test",
+        "choices": [{"message": {"role": "assistant", "content": text}}],
+        "usage": {"total_tokens": total_tokens},
+    }
+
+
+def _provider(handler, **kwargs) -> OpenAIProvider:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return OpenAIProvider(
+        api_key="test-key",
+        model="gpt-test",
+        base_url="http://stub/v1",
+        client=client,
+        retry_backoff=0,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_posts_chat_completion():
+    seen = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen["url"] = str(request.url)
+        seen["auth"] = request.headers["authorization"]
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json=_completion("hi there"))
+
+    provider = _provider(handler)
+    response = await provider.generate("Hello", max_tokens=5, temperature=0.0)
+
+    assert response.text == "hi there"
+    assert response.tokens_used == 7
+    assert seen["url"] == "http://stub/v1/chat/completions"
+    assert seen["auth"] == "Bearer test-key"
+    assert seen["body"]["messages"][-1] == {"role": "user", "content": "Hello"}
+    assert seen["body"]["max_tokens"] == 5
+
+
+@pytest.mark.asyncio
+async def test_generate_does_not_block_event_loop():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=_completion("ok"))
+
+    provider = _provider(handler)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await asyncio.gather(*(provider.generate(f"p{i}") for i in range(20)))
+
+    assert [r.text for r in results] == ["ok"] * 20
+    assert loop.time() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_generate_retries_rate_limit_with_retry_after():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"retry-after": "0"}, json={"error": {}})
+        return httpx.Response(200, json=_completion("after retry"))
+
+    provider = _provider(handler)
+    response = await provider.generate("Hello")
+
+    assert response.text == "after retry"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_maps_error_statuses():
+    async def rate_limited(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, headers={"retry-after": "0"}, json={"error": {}})
+
+    with pytest.raises(ProviderRateLimitError) as exc_info:
+        await _provider(rate_limited, max_retries=2).generate("Hello")
+    assert exc_info.value.retry_after == 0
+
+    async def unauthorized(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(401, json={"error": {"message": "bad key"}})
+
+    with pytest.raises(ProviderAuthError):
+        await _provider(unauthorized).generate("Hello")
+
+    async def missing(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404, json={"error": {"message": "no such model"}})
+
+    with pytest.raises(ModelNotFoundError):
+        await _provider(missing).generate("Hello")
+
+
+@pytest.mark.asyncio
+async def test_stream_parses_server_sent_events():
+    events = [
+        {"choices": [{"delta": {"role": "assistant"}}]},
+        {"choices": [{"delta": {"content": "Hel"}}]},
+        {"choices": [{"delta": {"content": "lo"}}]},
+    ]
+    body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    provider = _provider(handler)
+    chunks = [chunk async for chunk in provider.stream("Hello")]
+
+    assert chunks == ["Hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_generate_chat_sends_messages_verbatim():
+    seen = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json=_completion("ok"))
+
+    messages = [
+        {"role": "system", "content": "Goal: test"},
+        ChatMessage("assistant", "Earlier plan"),
+        ChatMessage("user", "Next step?"),
+    ]
+    response = await _provider(handler).generate_chat(messages, stable_prefix=2)
+
+    assert response.text == "ok"
+    assert seen["body"]["messages"] == [
+        {"role": "system", "content": "Goal: test"},
+        {"role": "assistant", "content": "Earlier plan"},
+        {"role": "user", "content": "Next step?"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_generate_reports_prompt_and_completion_tokens():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = _completion("ok")
+        body["usage"] = {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+        return httpx.Response(200, json=body)
+
+    response = await _provider(handler).generate("Hello")
+
+    assert (response.prompt_tokens, response.completion_tokens) == (5, 2)
+    assert response.tokens_used == 7
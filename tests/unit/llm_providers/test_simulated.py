@@ -0,0 +1,130 @@
+"""
+Tests for SimulatedProvider (load-testing provider).
+"""
+
+import asyncio
+
+import pytest
+
+from src.agent_labs.llm_providers import (
+    LatencyModel,
+    ProviderConnectionError,
+    ProviderRateLimitError,
+    SimulatedProvider,
+)
+
+
+class VirtualSleep:
+    """Records requested delays instead of sleeping."""
+
+    def __init__(self):
+        self.delays = []
+
+    async def __call__(self, seconds: float) -> None:
+        self.delays.append(seconds)
+        await asyncio.sleep(0)
+
+
+class TestSimulatedProvider:
+    """Test SimulatedProvider."""
+
+    @pytest.mark.asyncio
+    async def test_latency_follows_model(self):
+        sleep = VirtualSleep()
+        provider = SimulatedProvider(
+            latency=LatencyModel(ttft_ms=100, tokens_per_second=50),
+            completion_tokens=5,
+            sleep=sleep,
+        )
+
+        response = await provider.generate("one two")
+
+        assert response.completion_tokens == 5
+        assert response.prompt_tokens == 2
+        assert sleep.delays == pytest.approx([0.1] + [0.02] * 4)
+        assert response.timings.ttft_ms == pytest.approx(100)
+        assert response.timings.eval_ms == pytest.approx(80)
+
+    @pytest.mark.asyncio
+    async def test_same_seed_is_deterministic(self):
+        def make():
+            return SimulatedProvider(
+                latency=LatencyModel(jitter=0.5), failure_rate=0.3, seed=42, time_scale=0
+            )
+
+        async def outcomes(provider):
+            results = []
+            for i in range(20):
+                try:
+                    results.append((await provider.generate(f"p{i % 3}")).text)
+                except ProviderConnectionError:
+                    results.append("error")
+            return results
+
+        first = await outcomes(make())
+        second = await outcomes(make())
+
+        assert first == second
+        assert "error" in first
+        assert len(set(first)) > 2
+
+    @pytest.mark.asyncio
+    async def test_capacity_queues_then_rejects(self):
+        provider = SimulatedProvider(
+            latency=LatencyModel(ttft_ms=10),
+            completion_tokens=1,
+            capacity=2,
+            max_queue=1,
+        )
+
+        results = await asyncio.gather(
+            *(provider.generate(f"p{i}") for i in range(5)), return_exceptions=True
+        )
+
+        rejected = [r for r in results if isinstance(r, ProviderRateLimitError)]
+        assert len(rejected) == 2
+        assert provider.stats.max_in_flight == 2
+        assert provider.stats.max_queued == 1
+        assert provider.stats.completed == 3
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_tokens(self):
+        provider = SimulatedProvider(responder=lambda prompt: "a b c", time_scale=0)
+
+        chunks = [chunk async for chunk in provider.stream("hi")]
+
+        assert chunks == ["a ", "b ", "c"]
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_early_frees_slot(self):
+        provider = SimulatedProvider(responder=lambda prompt: "a b c", capacity=1, time_scale=0)
+
+        stream = provider.stream("first")
+        assert await stream.__anext__() == "a "
+        await stream.aclose()
+
+        response = await asyncio.wait_for(provider.generate("second"), timeout=1)
+        assert response.text == "a b c"
+        assert provider.stats.max_queued == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_time_uses_injected_clock(self):
+        now = [0.0]
+        sleep = VirtualSleep()
+
+        async def virtual_sleep(seconds: float) -> None:
+            await sleep(seconds)
+            now[0] += seconds
+
+        provider = SimulatedProvider(
+            latency=LatencyModel(ttft_ms=100),
+            completion_tokens=1,
+            capacity=1,
+            sleep=virtual_sleep,
+            clock=lambda: now[0],
+        )
+
+        first, second = await asyncio.gather(provider.generate("a"), provider.generate("b"))
+
+        assert first.timings.queue_ms == 0
+        assert second.timings.queue_ms == pytest.approx(100)
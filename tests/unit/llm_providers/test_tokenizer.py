@@ -0,0 +1,68 @@
+"""
+Tests for the shared tokenizer service.
+"""
+
+import pytest
+
+from src.agent_labs.llm_providers import OllamaProvider, Tokenizer
+from src.agent_labs.llm_providers.tokenizer import heuristic_count
+
+
+def test_heuristic_counts_words_numbers_and_punctuation():
+    assert heuristic_count("Hello, world!") == 4
+    assert heuristic_count("1234567") == 3
+    assert heuristic_count("internationalization") == 3
+    assert heuristic_count("") == 0
+
+
+def test_counts_are_memoized():
+    tokenizer = Tokenizer()
+    text = "The quick brown fox " * 100
+
+    first = tokenizer.count(text, model="llama2")
+    second = tokenizer.count(text, model="llama2")
+
+    assert first == second > 0
+    assert (tokenizer.hits, tokenizer.misses) == (1, 1)
+
+
+def test_cache_is_bounded():
+    tokenizer = Tokenizer(cache_size=2)
+    for text in ("one", "two", "three"):
+        tokenizer.count(text, model="llama2")
+
+    tokenizer.count("one", model="llama2")
+
+    assert tokenizer.misses == 4
+
+
+def test_count_batch_matches_single_counts():
+    tokenizer = Tokenizer()
+    texts = ["one", "", "two three", "one"]
+
+    assert tokenizer.count_batch(texts, model="llama2") == [
+        tokenizer.count(text, model="llama2") for text in texts
+    ]
+
+
+def test_calibrate_scales_heuristic_per_model():
+    tokenizer = Tokenizer()
+    samples = ["alpha beta gamma delta"]
+
+    scale = tokenizer.calibrate(samples, counts=[6], model="llama2")
+
+    assert scale == pytest.approx(1.5)
+    assert tokenizer.count("alpha beta gamma delta", model="llama2") == 6
+    assert tokenizer.count("alpha beta gamma delta", model="mistral") == 4
+
+
+def test_unknown_local_model_uses_heuristic():
+    assert not Tokenizer().is_exact("llama2")
+
+
+@pytest.mark.asyncio
+async def test_ollama_count_tokens_uses_tokenizer():
+    provider = OllamaProvider(model="tokenizer-test-model")
+
+    assert await provider.count_tokens("") == 0
+    assert await provider.count_tokens("Hello, world!") == 4
@@ -0,0 +1,687 @@
+"""
+Tests for provider wrappers (caching, coalescing, rate limiting, routing).
+"""
+
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from src.agent_labs.llm_providers import (
+    BatchingProvider,
+    CachingProvider,
+    CircuitBreaker,
+    FallbackCascadeProvider,
+    HedgedProvider,
+    LoadBalancedProvider,
+    LLMResponse,
+    MockProvider,
+    ProviderConnectionError,
+    ProviderRateLimitError,
+    ProviderTimeoutError,
+    RateLimitedProvider,
+    SingleFlightProvider,
+    TokenBucket,
+    Timings,
+    TokenLimitExceededError,
+    UsageTracker,
+    UsageTrackingProvider,
+)
+
+
+class CountingProvider(MockProvider):
+    """MockProvider that counts upstream calls and can add latency."""
+
+    def __init__(self, name: str = "mock", delay: float = 0.0):
+        super().__init__(name=name)
+        self.delay = delay
+        self.generate_calls = 0
+        self.stream_calls = 0
+
+    async def generate(self, prompt, max_tokens=1000, temperature=0.7) -> LLMResponse:
+        self.generate_calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return await super().generate(prompt, max_tokens=max_tokens, temperature=temperature)
+
+    async def stream(self, prompt, max_tokens=1000):
+        self.stream_calls += 1
+        async for chunk in super().stream(prompt, max_tokens=max_tokens):
+            yield chunk
+
+
+class TestCachingProvider:
+    """Test CachingProvider."""
+
+    @pytest.mark.asyncio
+    async def test_generate_hits_cache_for_identical_requests(self):
+        upstream = CountingProvider()
+        provider = CachingProvider(upstream)
+
+        first = await provider.generate("Test prompt", temperature=0.0)
+        second = await provider.generate("Test prompt", temperature=0.0)
+        await provider.generate("Other prompt", temperature=0.0)
+
+        assert first.text == second.text
+        assert upstream.generate_calls == 2
+        stats = provider.stats()
+        assert (stats.hits, stats.misses) == (1, 2)
+        assert stats.hit_rate == pytest.approx(1 / 3)
+
+    @pytest.mark.asyncio
+    async def test_lru_limit_and_ttl(self, monkeypatch):
+        upstream = CountingProvider()
+        provider = CachingProvider(upstream, max_entries=1, ttl_seconds=10)
+        clock = [1000.0]
+        monkeypatch.setattr("src.agent_labs.llm_providers.caching.time.time", lambda: clock[0])
+
+        await provider.generate("a", temperature=0.0)
+        await provider.generate("b", temperature=0.0)
+        await provider.generate("b", temperature=0.0)
+        clock[0] += 11
+        await provider.generate("b", temperature=0.0)
+
+        assert upstream.generate_calls == 3
+        stats = provider.stats()
+        assert stats.evictions == 1
+        assert stats.expirations == 1
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_new_instance(self):
+        with TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / "cache.db")
+            upstream = CountingProvider()
+            provider = CachingProvider(upstream, disk_path=path)
+            await provider.generate("persist me", temperature=0.0)
+            await provider.close()
+
+            reopened = CachingProvider(upstream, disk_path=path)
+            tracked = UsageTrackingProvider(reopened)
+            response = await tracked.generate("persist me", temperature=0.0)
+            await reopened.close()
+
+        assert response.text == "Mock response to: persist me"
+        assert isinstance(response.timings, Timings)
+        assert upstream.generate_calls == 1
+        assert reopened.stats().disk_hits == 1
+        assert tracked.tracker.summary().calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_replays_cached_chunks(self):
+        upstream = CountingProvider()
+        provider = CachingProvider(upstream, max_temperature=None)
+
+        first = [chunk async for chunk in provider.stream("Hello, world!")]
+        second = [chunk async for chunk in provider.stream("Hello, world!")]
+
+        assert first == second
+        assert len(second) > 1
+        assert upstream.stream_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_sampled_calls_bypass_cache_by_default(self):
+        upstream = CountingProvider()
+        provider = CachingProvider(upstream)
+
+        await provider.generate("sampled", temperature=0.7)
+        await provider.generate("sampled", temperature=0.7)
+        [chunk async for chunk in provider.stream("sampled")]
+        [chunk async for chunk in provider.stream("sampled")]
+
+        assert upstream.stream_calls == 2
+        assert provider.stats().bypassed == 4
+        assert provider.stats().misses == 0
+
+    @pytest.mark.asyncio
+    async def test_max_temperature_opts_in_to_caching_sampled_calls(self):
+        upstream = CountingProvider()
+        provider = CachingProvider(upstream, max_temperature=1.0)
+
+        await provider.generate("sampled", temperature=0.7)
+        await provider.generate("sampled", temperature=0.7)
+
+        assert upstream.generate_calls == 1
+
+
+class TestSingleFlightProvider:
+    """Test SingleFlightProvider."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_generates_share_one_call(self):
+        upstream = CountingProvider(delay=0.02)
+        provider = SingleFlightProvider(upstream)
+
+        results = await asyncio.gather(*(provider.generate("same") for _ in range(10)))
+        await provider.generate("same")
+
+        assert {r.text for r in results} == {"Mock response to: same"}
+        assert len({id(r) for r in results}) == 10
+        assert upstream.generate_calls == 2
+        stats = provider.stats()
+        assert (stats.requests, stats.upstream_calls, stats.coalesced) == (11, 2, 9)
+        assert provider.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        class FailingProvider(CountingProvider):
+            async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+                self.generate_calls += 1
+                await asyncio.sleep(0.01)
+                raise ProviderConnectionError("down")
+
+        upstream = FailingProvider()
+        provider = SingleFlightProvider(upstream)
+
+        results = await asyncio.gather(
+            *(provider.generate("x") for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ProviderConnectionError) for r in results)
+        assert upstream.generate_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        upstream = CountingProvider(delay=0.05)
+        provider = SingleFlightProvider(upstream)
+
+        first = asyncio.ensure_future(provider.generate("shared"))
+        second = asyncio.ensure_future(provider.generate("shared"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        response = await second
+        assert response.text == "Mock response to: shared"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_stream_fans_out_to_all_subscribers(self):
+        class SlowStream(CountingProvider):
+            async def stream(self, prompt, max_tokens=1000):
+                self.stream_calls += 1
+                for word in ["a ", "b ", "c "]:
+                    await asyncio.sleep(0.01)
+                    yield word
+
+        upstream = SlowStream()
+        provider = SingleFlightProvider(upstream)
+
+        async def collect():
+            return [chunk async for chunk in provider.stream("s")]
+
+        first = asyncio.ensure_future(collect())
+        await asyncio.sleep(0.015)  # join after the first chunk arrived
+        second = await collect()
+
+        assert await first == ["a ", "b ", "c "]
+        assert second == ["a ", "b ", "c "]
+        assert upstream.stream_calls == 1
+
+
+class TestBatchingProvider:
+    """Test BatchingProvider."""
+
+    @pytest.mark.asyncio
+    async def test_parallelism_is_bounded(self):
+        upstream = CountingProvider(delay=0.01)
+        provider = BatchingProvider(upstream, max_batch_size=4, max_wait_ms=5, max_parallel=2)
+
+        results = await asyncio.gather(*(provider.generate(f"p{i}") for i in range(10)))
+
+        assert [r.text for r in results] == [f"Mock response to: p{i}" for i in range(10)]
+        stats = provider.stats()
+        assert stats.max_in_flight == 2
+        assert stats.batches == 3
+        assert upstream.generate_calls == 10
+
+    @pytest.mark.asyncio
+    async def test_uses_generate_batch_hook_when_available(self):
+        class BatchAware(CountingProvider):
+            def __init__(self):
+                super().__init__()
+                self.batch_sizes = []
+
+            async def generate_batch(self, requests):
+                self.batch_sizes.append(len(requests))
+                return [
+                    LLMResponse(text=r.prompt.upper(), tokens_used=1, model="mock")
+                    for r in requests
+                ]
+
+        upstream = BatchAware()
+        provider = BatchingProvider(upstream, max_batch_size=3, max_wait_ms=50)
+
+        results = await asyncio.gather(*(provider.generate(p) for p in ["a", "b", "c", "d"]))
+
+        assert [r.text for r in results] == ["A", "B", "C", "D"]
+        assert upstream.batch_sizes == [3, 1]
+        assert upstream.generate_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_short_generate_batch_result_fails_every_caller(self):
+        from src.agent_labs.llm_providers import ProviderError
+
+        class Lossy(CountingProvider):
+            async def generate_batch(self, requests):
+                return [LLMResponse(text="only one", tokens_used=1, model="mock")]
+
+        provider = BatchingProvider(Lossy(), max_batch_size=3, max_wait_ms=20)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(provider.generate(p) for p in "abc"), return_exceptions=True),
+            timeout=1,
+        )
+
+        assert all(isinstance(result, ProviderError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_errors_are_delivered_per_request(self):
+        class Picky(CountingProvider):
+            async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+                if prompt == "bad":
+                    raise ProviderConnectionError("nope")
+                return await super().generate(prompt, max_tokens, temperature)
+
+        provider = BatchingProvider(Picky(), max_batch_size=2, max_wait_ms=1)
+
+        good, bad = await asyncio.gather(
+            provider.generate("good"), provider.generate("bad"), return_exceptions=True
+        )
+
+        assert good.text == "Mock response to: good"
+        assert isinstance(bad, ProviderConnectionError)
+
+
+class TestRateLimitedProvider:
+    """Test RateLimitedProvider and its building blocks."""
+
+    def test_token_bucket_refills_over_time(self):
+        now = [0.0]
+        bucket = TokenBucket(rate_per_minute=60, capacity=2, clock=lambda: now[0])
+
+        assert bucket.try_acquire(2)
+        assert not bucket.try_acquire(1)
+        assert bucket.wait_time(1) == pytest.approx(1.0)
+        now[0] = 1.0
+        assert bucket.try_acquire(1)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped(self):
+        upstream = CountingProvider(delay=0.01)
+        in_flight = peak = 0
+        original = upstream.generate
+
+        async def tracked(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                in_flight -= 1
+
+        upstream.generate = tracked
+        provider = RateLimitedProvider(upstream, initial_concurrency=2, max_concurrency=2)
+
+        await asyncio.gather(*(provider.generate(f"p{i}") for i in range(8)))
+
+        assert peak == 2
+        assert provider.stats().admitted == 8
+
+    @pytest.mark.asyncio
+    async def test_honors_retry_after_and_backs_off(self):
+        class Throttled(CountingProvider):
+            async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+                self.generate_calls += 1
+                if self.generate_calls == 1:
+                    raise ProviderRateLimitError("slow down", retry_after=0)
+                return LLMResponse(text="ok", tokens_used=1, model="mock")
+
+        upstream = Throttled()
+        provider = RateLimitedProvider(upstream, initial_concurrency=8)
+
+        response = await provider.generate("Hello")
+
+        assert response.text == "ok"
+        assert upstream.generate_calls == 2
+        stats = provider.stats()
+        assert (stats.rate_limited, stats.retries) == (1, 1)
+        assert stats.concurrency_limit == 4
+
+    @pytest.mark.asyncio
+    async def test_tenants_are_served_round_robin(self):
+        order = []
+
+        class Recording(CountingProvider):
+            async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+                order.append(prompt)
+                return await super().generate(prompt, max_tokens, temperature)
+
+        provider = RateLimitedProvider(
+            Recording(delay=0.01), initial_concurrency=1, max_concurrency=1
+        )
+        busy, quiet = provider.for_tenant("busy"), provider.for_tenant("quiet")
+
+        await asyncio.gather(
+            *(busy.generate(f"busy-{i}") for i in range(4)),
+            quiet.generate("quiet-0"),
+        )
+
+        assert order.index("quiet-0") <= 2
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self):
+        provider = RateLimitedProvider(
+            CountingProvider(delay=0.05), initial_concurrency=1, max_concurrency=1, max_queue=1
+        )
+
+        results = await asyncio.gather(
+            *(provider.generate(f"p{i}") for i in range(3)), return_exceptions=True
+        )
+
+        assert sum(isinstance(r, ProviderRateLimitError) for r in results) == 1
+        assert provider.stats().rejected == 1
+
+
+class FlakyProvider(CountingProvider):
+    """CountingProvider that raises ``error`` while ``failing`` is set."""
+
+    def __init__(self, name: str, error: Exception = None, delay: float = 0.0):
+        super().__init__(name=name, delay=delay)
+        self.error = error or ProviderConnectionError(f"{name} is down")
+        self.failing = True
+
+    async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+        if self.failing:
+            self.generate_calls += 1
+            raise self.error
+        return await super().generate(prompt, max_tokens, temperature)
+
+
+class TestLoadBalancedProvider:
+    """Test LoadBalancedProvider and CircuitBreaker."""
+
+    def test_circuit_breaker_opens_and_half_opens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert not breaker.available()
+        now[0] = 10.0
+        assert breaker.state == "half_open"
+        breaker.begin()
+        assert not breaker.available()  # only one probe at a time
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_least_outstanding_spreads_concurrent_calls(self):
+        backends = [CountingProvider(name=n, delay=0.01) for n in ("a", "b", "c")]
+        provider = LoadBalancedProvider(backends)
+
+        await asyncio.gather(*(provider.generate(f"p{i}") for i in range(9)))
+
+        assert [b.generate_calls for b in backends] == [3, 3, 3]
+
+    @pytest.mark.asyncio
+    async def test_fails_over_and_ejects_broken_backend(self):
+        broken = FlakyProvider("broken", ProviderTimeoutError("timed out"))
+        healthy = CountingProvider(name="healthy")
+        provider = LoadBalancedProvider([broken, healthy], failure_threshold=2, reset_timeout=60)
+
+        for _ in range(4):
+            response = await provider.generate("Hello")
+            assert response.model == "healthy"
+
+        assert broken.generate_calls == 2
+        assert provider.stats()[0].state == "open"
+
+    @pytest.mark.asyncio
+    async def test_raises_last_error_when_all_backends_fail(self):
+        provider = LoadBalancedProvider([FlakyProvider("a"), FlakyProvider("b")])
+
+        with pytest.raises(ProviderConnectionError):
+            await provider.generate("Hello")
+
+    @pytest.mark.asyncio
+    async def test_health_check_restores_backend(self):
+        flaky = FlakyProvider("flaky")
+        provider = LoadBalancedProvider([flaky], failure_threshold=1, reset_timeout=3600)
+        with pytest.raises(ProviderConnectionError):
+            await provider.generate("Hello")
+
+        flaky.failing = False
+        health = await provider.check_health()
+
+        assert list(health.values()) == [True]
+        assert (await provider.generate("Hello")).model == "flaky"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("outcome", ["cancelled", "rate_limited"])
+    async def test_unresolved_half_open_probe_is_released(self, outcome):
+        now = [0.0]
+        flaky = FlakyProvider("flaky")
+        provider = LoadBalancedProvider(
+            [flaky], failure_threshold=1, reset_timeout=10, clock=lambda: now[0]
+        )
+        with pytest.raises(ProviderConnectionError):
+            await provider.generate("Hello")
+        now[0] = 10.0
+
+        if outcome == "cancelled":
+            flaky.failing = False
+            flaky.delay = 1.0
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(provider.generate("Hello"), timeout=0.01)
+            flaky.delay = 0.0
+        else:
+            flaky.error = ProviderRateLimitError("busy")
+            with pytest.raises(ProviderRateLimitError):
+                await provider.generate("Hello")
+            flaky.failing = False
+
+        assert provider.stats()[0].state == "half_open"
+        assert (await provider.generate("Hello")).model == "flaky"
+        assert provider.stats()[0].state == "closed"
+
+
+class TestHedgedProvider:
+    """Test HedgedProvider."""
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_cancelled(self):
+        slow = CountingProvider(name="slow", delay=1.0)
+        fast = CountingProvider(name="fast")
+        provider = HedgedProvider([slow, fast], initial_delay_ms=10, max_hedge_ratio=1.0)
+
+        response = await asyncio.wait_for(provider.generate("Hello"), timeout=0.5)
+
+        assert response.model == "fast"
+        stats = provider.stats()
+        assert (stats.hedges, stats.hedge_wins) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        backends = [CountingProvider(name="a"), CountingProvider(name="b")]
+        provider = HedgedProvider(backends, initial_delay_ms=100, max_hedge_ratio=1.0)
+
+        await provider.generate("Hello")
+
+        assert provider.stats().hedges == 0
+        assert sum(b.generate_calls for b in backends) == 1
+
+    @pytest.mark.asyncio
+    async def test_delay_follows_latency_percentile(self):
+        provider = HedgedProvider([CountingProvider()], initial_delay_ms=500, min_samples=4)
+        assert provider.hedge_delay() == pytest.approx(0.5)
+
+        provider._latencies.extend([10, 20, 30, 400])
+
+        assert provider.hedge_delay() == pytest.approx(0.4)
+        provider.hedge_percentile = 50
+        assert provider.hedge_delay() == pytest.approx(0.02)
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self):
+        backends = [CountingProvider(name="a", delay=0.02), CountingProvider(name="b", delay=0.02)]
+        provider = HedgedProvider(backends, initial_delay_ms=1, max_hedge_ratio=0.25)
+
+        for _ in range(8):
+            await provider.generate("Hello")
+
+        stats = provider.stats()
+        assert stats.hedges == 2
+        assert stats.budget_denied == 6
+
+    @pytest.mark.asyncio
+    async def test_hedge_covers_primary_failure(self):
+        healthy = CountingProvider(name="healthy")
+
+        class SlowThenFail(CountingProvider):
+            async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+                await asyncio.sleep(0.05)
+                raise ProviderConnectionError("lost")
+
+        provider = HedgedProvider(
+            [SlowThenFail(name="bad"), healthy], initial_delay_ms=5, max_hedge_ratio=1.0
+        )
+
+        assert (await provider.generate("Hello")).model == "healthy"
+
+
+class TestUsageTrackingProvider:
+    """Test UsageTrackingProvider and UsageTracker."""
+
+    @pytest.mark.asyncio
+    async def test_records_token_split_cost_and_latency(self):
+        ticks = iter([0.0, 0.25, 1.0, 1.5])
+        provider = UsageTrackingProvider(
+            MockProvider(),
+            prices={"mock": (1.0, 2.0)},
+            clock=lambda: next(ticks),
+        )
+
+        first = await provider.generate("one two three")
+        await provider.generate("four")
+
+        summary = provider.tracker.summary()
+        assert first.prompt_tokens == 3
+        assert first.timings.latency_ms == pytest.approx(250.0)
+        assert summary.calls == 2
+        assert summary.prompt_tokens == 4
+        assert summary.completion_tokens == 6 + 4  # "Mock response to: ..." word counts
+        assert summary.cost == pytest.approx(
+            (summary.prompt_tokens * 1.0 + summary.completion_tokens * 2.0) / 1000
+        )
+        assert summary.latency["latency_ms"] == {"p50": 250.0, "p95": 500.0, "p99": 500.0}
+
+    @pytest.mark.asyncio
+    async def test_total_token_count_is_not_counted_as_completion(self):
+        class TotalOnly(MockProvider):
+            async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+                # OpenAI-style: tokens_used is prompt + completion.
+                return LLMResponse(text="ok", tokens_used=12, model="mock", prompt_tokens=10)
+
+        provider = UsageTrackingProvider(TotalOnly())
+
+        response = await provider.generate("hi")
+
+        assert response.completion_tokens == 2
+        assert provider.tracker.summary().completion_tokens == 2
+
+    @pytest.mark.asyncio
+    async def test_budget_is_enforced_once_spent(self):
+        tracker = UsageTracker(max_total_tokens=5)
+        provider = UsageTrackingProvider(MockProvider(), tracker=tracker)
+
+        await provider.generate("a prompt with six words here")
+
+        assert tracker.remaining_tokens == 0
+        with pytest.raises(TokenLimitExceededError):
+            await provider.generate("again")
+
+    @pytest.mark.asyncio
+    async def test_failures_and_streams_are_recorded(self):
+        class Broken(MockProvider):
+            async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+                if prompt == "hi":
+                    raise ProviderTimeoutError("slow")
+                return await super().generate(prompt, max_tokens, temperature)
+
+        provider = UsageTrackingProvider(Broken())
+
+        with pytest.raises(ProviderTimeoutError):
+            await provider.generate("hi")
+        chunks = [chunk async for chunk in provider.stream("Hello")]
+
+        summary = provider.tracker.summary()
+        assert summary.calls == 2
+        assert summary.errors == 1
+        assert summary.completion_tokens == len("".join(chunks).split())
+        assert "ttft_ms" in summary.latency
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_reports_queue_time(self):
+        provider = RateLimitedProvider(MockProvider())
+
+        response = await provider.generate("hi")
+
+        assert response.timings.queue_ms is not None
+
+
+class TestFallbackCascadeProvider:
+    """Test FallbackCascadeProvider."""
+
+    @pytest.mark.asyncio
+    async def test_race_takes_accepted_fast_answer_and_cancels_slow(self):
+        fast = CountingProvider(name="fast")
+        slow = CountingProvider(name="slow", delay=5)
+        provider = FallbackCascadeProvider([fast, slow])
+
+        response = await asyncio.wait_for(provider.generate("hi"), timeout=1)
+
+        assert response.model == "fast"
+        stats = provider.stats()
+        assert stats.wins == [1, 0]
+        assert stats.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_race_falls_back_when_fast_answer_rejected(self):
+        fast = CountingProvider(name="fast")
+        slow = CountingProvider(name="slow", delay=0.01)
+
+        async def accept(response):
+            return "good" in response.text
+
+        provider = FallbackCascadeProvider([fast, slow], accept=accept)
+
+        response = await provider.generate("hi")
+
+        assert response.model == "slow"
+        assert provider.stats().to_dict()["rejected"] == [1, 0]
+        assert provider.stats().win_rates() == [0.0, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_cascade_mode_only_calls_next_tier_when_needed(self):
+        fast = FlakyProvider("fast")
+        slow = CountingProvider(name="slow")
+        provider = FallbackCascadeProvider([fast, slow], mode="cascade")
+
+        assert (await provider.generate("hi")).model == "slow"
+        fast.failing = False
+        assert (await provider.generate("hi")).model == "fast"
+
+        assert slow.generate_calls == 1
+        assert provider.stats().errors == [1, 0]
+
+    @pytest.mark.asyncio
+    async def test_error_raised_when_final_tier_fails(self):
+        provider = FallbackCascadeProvider(
+            [CountingProvider(name="fast"), FlakyProvider("slow")],
+            accept=lambda response: False,
+        )
+
+        with pytest.raises(ProviderConnectionError):
+            await provider.generate("hi")
@@ -4,7 +4,8 @@ Unit tests for memory systems (short-term, long-term, RAG).
 
 from __future__ import annotations
 
-from datetime import datetime
+import io
+from datetime import datetime, timedelta
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
@@ -19,6 +20,16 @@ from src.agent_labs.memory import (
     InMemoryStorage,
     SqliteStorage,
     ChromaVectorStore,
+    ConsolidationPolicy,
+    MemoryConsolidator,
+    CompactMemoryItem,
+    EmbeddingArena,
+    SnapshotFormatError,
+    SnapshotWriter,
+    load_snapshots,
+    manager_tiers,
+    restore_manager,
+    SessionMemoryService,
 )
 
 
@@ -31,6 +42,79 @@ def test_memory_item_to_dict():
     assert "timestamp" in data
 
 
+def test_compact_memory_item_round_trip():
+    arena = EmbeddingArena(block_size=8)
+    item = MemoryItem(
+        content="compact",
+        timestamp=datetime(2024, 1, 2, 3, 4, 5),
+        metadata={"source": "unit"},
+        embedding=[0.5, 0.25, 0.125],
+    )
+
+    compact = CompactMemoryItem.from_item(item, arena)
+
+    assert not hasattr(compact, "__dict__")
+    assert compact.timestamp == item.timestamp
+    assert compact.embedding == item.embedding
+    assert compact.to_dict() == item.to_dict()
+    assert compact.embedding_view().nbytes == 12
+
+
+def test_compact_memory_item_keeps_empty_embedding_distinct_from_none():
+    arena = EmbeddingArena()
+
+    empty = CompactMemoryItem.from_item(MemoryItem(content="x", embedding=[]), arena)
+    missing = CompactMemoryItem.from_item(MemoryItem(content="y"), arena)
+
+    assert empty.to_item().embedding == []
+    assert empty.embedding_view().nbytes == 0
+    assert missing.to_item().embedding is None
+    assert len(arena) == 0
+
+
+def test_compact_memory_item_record_defers_metadata_decoding():
+    arena = EmbeddingArena()
+    source = CompactMemoryItem.from_item(
+        MemoryItem(content="lazy", metadata={"k": "v"}, embedding=[1.0, 2.0]), arena
+    )
+
+    record = source.to_record()
+    restored = CompactMemoryItem.from_record(record, arena)
+
+    assert restored.to_record() == record
+    assert restored.metadata == {"k": "v"}
+    restored.embedding = [3.0, 4.0]
+    assert restored.embedding == [3.0, 4.0]
+
+
+def test_embedding_arena_blocks_and_bytes_round_trip():
+    arena = EmbeddingArena(block_size=4)
+    first = arena.add([1.0, 2.0, 3.0])
+    second = arena.add([4.0, 5.0])
+    view = arena.view(first, 3)
+
+    third = arena.add([6.0, 7.0, 8.0, 9.0])
+
+    assert second == 4  # vectors never straddle blocks
+    assert view.tolist() == [1.0, 2.0, 3.0]
+    restored = EmbeddingArena.frombytes(arena.tobytes(), block_size=4)
+    assert restored.get(third, 4) == [6.0, 7.0, 8.0, 9.0]
+    with pytest.raises(ValueError):
+        arena.add([0.0] * 5)
+
+
+def test_compact_embedding_resize_reuses_released_slots():
+    arena = EmbeddingArena(block_size=8)
+    item = CompactMemoryItem.from_item(MemoryItem(content="x", embedding=[1.0, 2.0]), arena)
+
+    for _ in range(5):
+        item.embedding = [1.0, 2.0, 3.0]
+        item.embedding = [4.0, 5.0]
+
+    assert item.embedding == [4.0, 5.0]
+    assert len(arena) == 5  # one 2-float and one 3-float slot, reused every time
+
+
 def test_short_term_memory_store_and_retrieve():
     memory = ShortTermMemory(max_items=2)
     item1 = MemoryItem(content="first")
@@ -57,6 +141,36 @@ def test_short_term_memory_query():
     assert results[0].content == "hello world"
 
 
+def test_short_term_memory_term_index_tracks_window():
+    memory = ShortTermMemory(max_items=2)
+    memory.store(MemoryItem(content="alpha beta"))
+    memory.store(MemoryItem(content="beta gamma"))
+    memory.store(MemoryItem(content="Gamma delta"))
+
+    results = memory.search_terms("beta gamma")
+    assert [(item.content, count) for item, count in results] == [
+        ("beta gamma", 2),
+        ("Gamma delta", 1),
+    ]
+    assert memory.search_terms("alpha") == []
+    assert [item.content for item, _ in memory.search_terms("gamma beta", match_all=True)] == [
+        "beta gamma"
+    ]
+
+
+def test_short_term_memory_evict_updates_index():
+    memory = ShortTermMemory(max_items=5)
+    memory.store(MemoryItem(content="keep me"))
+    memory.store(MemoryItem(content="drop me"))
+
+    removed = memory.evict(lambda item: item.content.startswith("drop"))
+
+    assert [item.content for item in removed] == ["drop me"]
+    assert memory.search_terms("drop") == []
+    assert [item.content for item, _ in memory.search_terms("me")] == ["keep me"]
+    assert memory.retrieve(query="ME")[0].content == "keep me"
+
+
 def test_short_term_memory_invalid_size():
     with pytest.raises(ValueError):
         ShortTermMemory(max_items=0)
@@ -115,6 +229,24 @@ def test_rag_memory_retrieval():
     assert results[0].content in {"alpha", "gamma", "beta"}
 
 
+def test_rag_memory_compact_matches_plain_retrieval():
+    plain, compact = RAGMemory(embedding_dim=4), RAGMemory(embedding_dim=4, compact=True)
+    for text in ["alpha", "beta", "gamma", "delta"]:
+        plain.store(MemoryItem(content=text, metadata={"text": text}))
+        compact.store(MemoryItem(content=text, metadata={"text": text}))
+
+    results = compact.retrieve(query="gamma", top_k=4)
+
+    assert [item.content for item in results] == [
+        item.content for item in plain.retrieve(query="gamma", top_k=4)
+    ]
+    assert all(isinstance(item, CompactMemoryItem) for item in results)
+    removed = compact.evict(lambda item: item.content == "beta")
+    assert [item.metadata for item in removed] == [{"text": "beta"}]
+    compact.store(MemoryItem(content="epsilon"))  # reuses beta's arena slot
+    assert removed[0].embedding == pytest.approx(plain.retrieve()[1].embedding)
+
+
 def test_rag_memory_invalid_dim():
     with pytest.raises(ValueError):
         RAGMemory(embedding_dim=0)
@@ -138,3 +270,299 @@ def test_memory_manager_observe_and_refine():
 def test_chroma_vector_store_placeholder():
     with pytest.raises(NotImplementedError):
         ChromaVectorStore()
+
+
+def test_consolidation_promotes_aged_short_term_items():
+    now = datetime.utcnow()
+    manager = MemoryManager()
+    manager.store_short(MemoryItem(content="old turn", timestamp=now - timedelta(hours=2)))
+    manager.store_short(MemoryItem(content="fresh turn", timestamp=now))
+
+    report = manager.consolidate(now=now)
+
+    assert report.promoted == 1
+    assert [item.content for item in manager.retrieve_short()] == ["fresh turn"]
+    facts = manager.retrieve_long()
+    assert len(facts) == 1
+    assert facts[0].content == "old turn"
+    assert facts[0].metadata["type"] == "consolidated"
+
+
+def test_consolidation_merges_near_duplicates():
+    manager = MemoryManager()
+    manager.store_long(MemoryItem(content="User lives in Seattle"), key="a")
+    manager.store_long(MemoryItem(content="User lives in Seattle."), key="b")
+    manager.store_long(MemoryItem(content="The cat sat on the mat"), key="c")
+
+    report = MemoryConsolidator().consolidate(manager)
+
+    assert report.merged == 1
+    remaining = manager.retrieve_long()
+    assert len(remaining) == 2
+    assert any(item.metadata.get("merged_count") == 1 for item in remaining)
+    assert report.bytes_reclaimed > 0
+
+
+def test_consolidation_keeps_unrelated_memories_without_embedder():
+    manager = MemoryManager()
+    facts = [
+        "The user prefers dark mode in the editor",
+        "Paris is the capital of France and a big city",
+        "Invoice 4432 was paid on Tuesday by wire transfer",
+    ]
+    for index, fact in enumerate(facts):
+        manager.store_long(MemoryItem(content=fact), key=str(index))
+        manager.store_rag(MemoryItem(content=fact))
+
+    report = MemoryConsolidator().consolidate(manager)
+
+    assert report.merged == 0
+    assert sorted(item.content for item in manager.retrieve_long()) == sorted(facts)
+    assert len(manager.rag.retrieve()) == 3
+
+
+def test_consolidation_merges_by_similarity_with_embedder():
+    manager = MemoryManager()
+    manager.store_long(MemoryItem(content="User lives in Seattle"), key="a")
+    manager.store_long(MemoryItem(content="User is based in Seattle"), key="b")
+    manager.store_long(MemoryItem(content="The cat sat on the mat"), key="c")
+
+    def embedder(text):
+        return [1.0, 0.0] if "Seattle" in text else [0.0, 1.0]
+
+    report = MemoryConsolidator(embedder=embedder).consolidate(manager)
+
+    assert report.merged == 1
+    assert len(manager.retrieve_long()) == 2
+
+
+def test_consolidation_ttl_and_decay_eviction():
+    now = datetime.utcnow()
+    manager = MemoryManager()
+    manager.store_long(MemoryItem(content="stale", timestamp=now - timedelta(days=10)), key="s")
+    manager.store_long(
+        MemoryItem(
+            content="faded",
+            timestamp=now - timedelta(hours=5),
+            metadata={"importance": 0.5},
+        ),
+        key="f",
+    )
+    manager.store_long(MemoryItem(content="recent", timestamp=now), key="r")
+    policy = ConsolidationPolicy(
+        ttl_seconds=86400,
+        decay_half_life_seconds=3600,
+        min_decayed_score=0.1,
+    )
+
+    report = MemoryConsolidator(policy).consolidate(manager, now=now)
+
+    assert report.evicted == 2
+    assert [item.content for item in manager.retrieve_long()] == ["recent"]
+
+
+def test_consolidation_skips_long_term_for_backends_without_listing():
+    from src.agent_labs.memory import StorageBackend
+
+    class KeyValueOnly(StorageBackend):
+        """Custom backend without the optional iter_entries/delete."""
+
+        def __init__(self):
+            self.items = {}
+
+        def store(self, key, item):
+            self.items[key] = item
+
+        def get(self, key):
+            return self.items.get(key)
+
+        def search(self, query, limit=10):
+            return []
+
+        def clear(self):
+            self.items.clear()
+
+        def iter_items(self):
+            return iter(self.items.values())
+
+    now = datetime.utcnow()
+    manager = MemoryManager(long_term=LongTermMemory(backend=KeyValueOnly()))
+    manager.store_long(MemoryItem(content="stale", timestamp=now - timedelta(days=10)), key="s")
+    policy = ConsolidationPolicy(ttl_seconds=60)
+
+    report = MemoryConsolidator(policy).consolidate(manager, now=now)
+
+    assert report.evicted == 0
+    assert manager.long_term.get("s").content == "stale"
+
+
+def test_consolidation_interval_gates_periodic_runs():
+    consolidator = MemoryConsolidator(interval_seconds=3600)
+    manager = MemoryManager(consolidator=consolidator)
+
+    manager.refine([MemoryItem(content="first")])
+    assert not consolidator.due()
+    assert consolidator.maybe_consolidate(manager) is None
+
+
+def test_consolidation_policy_validation():
+    with pytest.raises(ValueError):
+        ConsolidationPolicy(similarity_threshold=0)
+    with pytest.raises(ValueError):
+        ConsolidationPolicy(ttl_seconds=-1)
+
+
+def test_sqlite_storage_delete_and_entries():
+    with TemporaryDirectory() as temp_dir:
+        backend = SqliteStorage(path=str(Path(temp_dir) / "memory.db"))
+        backend.store("k1", MemoryItem(content="one"))
+        backend.store("k2", MemoryItem(content="two"))
+
+        assert backend.delete("k1") is True
+        assert backend.delete("missing") is False
+        assert [key for key, _ in backend.iter_entries()] == ["k2"]
+        backend.close()
+
+
+def _snapshot_manager() -> MemoryManager:
+    manager = MemoryManager()
+    manager.store_short(MemoryItem(content="turn one", metadata={"role": "user"}))
+    manager.store_long(MemoryItem(content="fact alpha"), key="alpha")
+    manager.store_rag(MemoryItem(content="doc", embedding=[0.5, 0.25]))
+    return manager
+
+
+def test_snapshot_full_round_trip():
+    manager = _snapshot_manager()
+    buffer = io.BytesIO()
+
+    stats = SnapshotWriter().write(manager_tiers(manager), buffer)
+    buffer.seek(0)
+    tiers = load_snapshots([buffer])
+
+    assert stats.records == 3
+    restored = MemoryManager()
+    restore_manager(restored, tiers)
+    assert restored.retrieve_short()[0].metadata == {"role": "user"}
+    assert restored.long_term.get("alpha").content == "fact alpha"
+    assert restored.retrieve_rag()[0].embedding == [0.5, 0.25]
+
+
+def test_snapshot_delta_writes_only_changes():
+    manager = _snapshot_manager()
+    writer = SnapshotWriter(chunk_size=1)
+    base, delta = io.BytesIO(), io.BytesIO()
+    writer.write(manager_tiers(manager), base)
+
+    manager.long_term.delete("alpha")
+    manager.store_long(MemoryItem(content="fact beta"), key="beta")
+    stats = writer.write(manager_tiers(manager), delta, delta=True)
+
+    assert (stats.records, stats.deletes, stats.unchanged) == (1, 1, 2)
+    base.seek(0)
+    delta.seek(0)
+    tiers = load_snapshots([base, delta])
+    assert list(tiers["long_term"]) == ["beta"]
+    assert len(tiers["short_term"]) == 1
+
+
+def test_snapshot_delta_tombstones_tiers_that_disappear():
+    manager = _snapshot_manager()
+    writer = SnapshotWriter()
+    base, delta = io.BytesIO(), io.BytesIO()
+    writer.write(manager_tiers(manager), base)
+
+    tiers = manager_tiers(manager)
+    del tiers["long_term"]
+    stats = writer.write(tiers, delta, delta=True)
+
+    assert stats.deletes == 1
+    base.seek(0)
+    delta.seek(0)
+    assert not load_snapshots([base, delta]).get("long_term")
+
+
+def test_snapshot_delta_from_another_chain_is_rejected():
+    manager = _snapshot_manager()
+    writer, other = SnapshotWriter(), SnapshotWriter()
+    base, other_base, delta = io.BytesIO(), io.BytesIO(), io.BytesIO()
+    writer.write(manager_tiers(manager), base)
+    other.write(manager_tiers(manager), other_base)
+    manager.store_long(MemoryItem(content="fact beta"), key="beta")
+    other.write(manager_tiers(manager), delta, delta=True)
+
+    for stream in (base, delta):
+        stream.seek(0)
+    with pytest.raises(SnapshotFormatError, match="different full snapshot"):
+        load_snapshots([base, delta])
+
+
+def test_snapshot_compact_items_and_validation():
+    manager = _snapshot_manager()
+    buffer = io.BytesIO()
+    writer = SnapshotWriter()
+    with pytest.raises(SnapshotFormatError):
+        writer.write(manager_tiers(manager), buffer, delta=True)
+
+    writer.write(manager_tiers(manager), buffer)
+    buffer.seek(0)
+    rag = load_snapshots([buffer], compact=True)["rag"]
+    item = next(iter(rag.values()))
+    assert isinstance(item, CompactMemoryItem)
+    assert item.embedding == [0.5, 0.25]
+
+    corrupted = bytearray(buffer.getvalue())
+    corrupted[-3] ^= 0xFF
+    with pytest.raises(SnapshotFormatError):
+        load_snapshots([io.BytesIO(bytes(corrupted))])
+
+
+def test_session_memory_service_lru_eviction_and_rehydration():
+    service = SessionMemoryService(max_hot_sessions=2)
+    service.get("a").store_long(MemoryItem(content="alpha fact"), key="k")
+    service.get("b").store_short(MemoryItem(content="beta turn"))
+    service.get("a")  # touch a so b becomes least recently used
+    service.get("c")
+
+    assert service.is_hot("a") and service.is_hot("c")
+    assert not service.is_hot("b")
+    assert "b" in service
+
+    restored = service.get("b")
+    assert [item.content for item in restored.retrieve_short()] == ["beta turn"]
+    stats = service.stats()
+    assert stats.evictions == 2
+    assert stats.rehydrations == 1
+    assert stats.hot_sessions == 2
+    assert stats.cold_sessions == 1  # "b" is loaded again; only "a" is cold-only
+    service.close()
+
+
+def test_session_memory_service_keeps_sessions_in_use_hot():
+    service = SessionMemoryService(max_hot_sessions=1)
+
+    with service.session("a") as memory:
+        service.get("b")
+        assert service.is_hot("a") and service.is_hot("b")
+        assert service.evict("a") is False
+        memory.store_short(MemoryItem(content="kept"))
+
+    service.get("c")
+
+    assert not service.is_hot("a")
+    assert [item.content for item in service.get("a").retrieve_short()] == ["kept"]
+    service.close()
+
+
+def test_session_memory_service_persists_across_instances():
+    with TemporaryDirectory() as temp_dir:
+        path = str(Path(temp_dir) / "sessions.db")
+        service = SessionMemoryService(path=path)
+        service.get("s1").store_long(MemoryItem(content="durable"), key="d")
+        service.close()
+
+        reopened = SessionMemoryService(path=path)
+        assert reopened.get("s1").long_term.get("d").content == "durable"
+        assert reopened.drop("s1") is True
+        assert "s1" not in reopened
+        reopened.close()
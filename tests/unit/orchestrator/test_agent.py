@@ -8,10 +8,14 @@ Test approach: TDD (test-driven development)
 4. Iterate until >95% coverage
 """
 
+import asyncio
+
 import pytest
-from src.agent_labs.llm_providers import MockProvider
+from src.agent_labs.llm_providers import LLMResponse, MockProvider
 from src.agent_labs.orchestrator import (
     Agent,
+    AgentEvent,
+    ToolCallDetector,
     AgentState,
     AgentContext,
     VerificationResult,
@@ -492,3 +496,479 @@ class TestAgentVerificationAndStateTransitions:
         assert result.confidence == 0.95
         assert result.reason == "Goal met"
         assert result.feedback == "Good job"
+
+
+class RecordingProvider(MockProvider):
+    """MockProvider that records the chat conversations it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.conversations = []
+
+    async def generate_chat(self, messages, max_tokens=1000, temperature=0.7, stable_prefix=0):
+        self.conversations.append((list(messages), stable_prefix))
+        return await super().generate_chat(messages, max_tokens, temperature, stable_prefix)
+
+
+@pytest.mark.asyncio
+async def test_plan_sends_append_only_conversation():
+    """Each planning turn extends the previous conversation and its reply."""
+    provider = RecordingProvider()
+    agent = Agent(provider, plan_history=None)
+
+    await agent.run("Multi step task", max_turns=3)
+
+    assert provider.conversations
+    for messages, stable_prefix in provider.conversations:
+        assert messages[0].role == "system"
+        assert messages[-1].role == "user"
+        assert stable_prefix == len(messages) - 1
+    for (earlier, _), (later, _) in zip(provider.conversations, provider.conversations[1:]):
+        assert later[:len(earlier)] == earlier
+        assert later[len(earlier)].role == "assistant"
+
+
+@pytest.mark.asyncio
+async def test_plan_history_is_bounded_by_default():
+    """Without a provider session, planning sends only the recent history."""
+    provider = RecordingProvider()
+
+    await Agent(provider).run("Multi step task", max_turns=5)
+
+    last, _ = provider.conversations[-1]
+    # system prompt + at most 3 entries (a plan adds its question) + question
+    assert len(last) <= 1 + 2 * 3 + 1
+    assert len(provider.conversations) == 5
+
+
+@pytest.mark.asyncio
+async def test_run_reuses_ollama_context_and_releases_session():
+    """A keep_context OllamaProvider carries KV context across turns of one run."""
+    import json
+
+    import httpx
+
+    from src.agent_labs.llm_providers import OllamaProvider
+
+    payloads = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        payloads.append(payload)
+        return httpx.Response(
+            200,
+            json={"response": "NO | keep going", "eval_count": 1, "context": [len(payloads)]},
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = OllamaProvider(base_url="http://stub", client=client, keep_context=True)
+
+    await Agent(provider).run("Long task", max_turns=3)
+
+    assert any("context" in payload for payload in payloads)
+    assert provider.context_reuses == 2
+    assert provider.context_sessions == 0
+
+
+class ScriptedStreamProvider(MockProvider):
+    """MockProvider whose stream yields scripted chunks with a pause before the last."""
+
+    def __init__(self, chunks, pause: float = 0.0):
+        super().__init__()
+        self.chunks = chunks
+        self.pause = pause
+        self.finished = False
+
+    async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+        if prompt.startswith("Goal:"):
+            return LLMResponse(text="YES | done", tokens_used=2, model="mock")
+        return await super().generate(prompt, max_tokens, temperature)
+
+    async def stream(self, prompt, max_tokens=1000):
+        for chunk in self.chunks[:-1]:
+            yield chunk
+        await asyncio.sleep(self.pause)
+        yield self.chunks[-1]
+        self.finished = True
+
+
+class TestStreamingAgent:
+    """Test streaming mode of Agent.run."""
+
+    def test_tool_call_detector_handles_split_chunks_and_strings(self):
+        detector = ToolCallDetector()
+
+        calls = []
+        chunks = [
+            'Plan: {"tool": "echo", "ar',
+            'gs": {"text": "a } b"}',
+            "} and {not json} ",
+            '{"x": 1}',
+        ]
+        for chunk in chunks:
+            calls.extend(detector.feed(chunk))
+
+        assert calls == [{"tool": "echo", "args": {"text": "a } b"}}]
+
+    def test_tool_call_detector_recovers_from_stray_braces(self):
+        detector = ToolCallDetector()
+
+        calls = []
+        for chunk in ["Use {x} or { y ", '{"note\n', 'later {"tool": "echo"}']:
+            calls.extend(detector.feed(chunk))
+
+        assert calls == [{"tool": "echo"}]
+
+    @pytest.mark.asyncio
+    async def test_run_stream_yields_tokens_before_result(self):
+        agent = Agent(ScriptedStreamProvider(["Think ", "then act"]))
+
+        events = [event async for event in agent.run_stream("Stream task")]
+
+        kinds = [event.kind for event in events]
+        assert kinds[:2] == ["token", "token"]
+        assert kinds.index("plan") < kinds.index("result") < kinds.index("verification")
+        assert events[-1].kind == "done"
+        assert events[-1].data == "Executed: Think then act"
+
+    @pytest.mark.asyncio
+    async def test_tool_call_dispatched_before_plan_finishes(self):
+        provider = ScriptedStreamProvider(
+            ['{"tool": "echo", "args": {}}', " more text"], pause=0.05
+        )
+        started = []
+
+        async def executor(call: str) -> str:
+            started.append(provider.finished)
+            return f"ran {call}"
+
+        agent = Agent(provider, tool_call_executor=executor)
+        tokens = []
+
+        def on_event(event: AgentEvent) -> None:
+            if event.kind == "token":
+                tokens.append(event)
+
+        result = await agent.run("Tool task", on_event=on_event)
+
+        assert started == [False]
+        assert result == 'ran {"tool": "echo", "args": {}}'
+        assert len(tokens) == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_after_tool_call_cuts_stream(self):
+        provider = ScriptedStreamProvider(['{"tool": "echo"}', " never read"], pause=0.05)
+        agent = Agent(provider, tool_call_executor=lambda call: "ok", stop_after_tool_call=True)
+
+        events = [event async for event in agent.run_stream("Tool task")]
+
+        assert provider.finished is False
+        plan = next(event.data for event in events if event.kind == "plan")
+        assert plan == '{"tool": "echo"}'
+
+    @pytest.mark.asyncio
+    async def test_tool_executor_receives_plan_when_streaming(self):
+        provider = ScriptedStreamProvider(['{"tool": "echo"}', " then more"])
+        received = []
+        agent = Agent(provider, tool_executor=lambda plan: received.append(plan) or "ok")
+
+        events = [event async for event in agent.run_stream("Tool task")]
+
+        assert received == ['{"tool": "echo"} then more']
+        assert [event.data for event in events if event.kind == "tool_call"] == ['{"tool": "echo"}']
+
+
+@pytest.mark.asyncio
+async def test_run_stops_when_time_budget_is_spent():
+    """max_run_seconds cancels the run instead of waiting on a slow provider."""
+    from src.agent_labs.orchestrator import RunTimeoutError
+
+    class SlowProvider(MockProvider):
+        async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+            await asyncio.sleep(5)
+            return await super().generate(prompt, max_tokens, temperature)
+
+    agent = Agent(SlowProvider())
+
+    with pytest.raises(RunTimeoutError):
+        await asyncio.wait_for(agent.run("Slow task", max_run_seconds=0.05), timeout=1)
+
+
+class SlowPlannerProvider(MockProvider):
+    """Plans and verifications each take ``delay``; verification passes on the given call."""
+
+    def __init__(self, delay: float, complete_on: int):
+        super().__init__()
+        self.delay = delay
+        self.complete_on = complete_on
+        self.verifications = 0
+        self.plans = 0
+        self.finished_plans = 0
+
+    async def generate_chat(
+        self, messages, max_tokens=1000, temperature=0.7, stable_prefix=0
+    ):
+        self.plans += 1
+        plan = f"plan {self.plans}"
+        await asyncio.sleep(self.delay)
+        self.finished_plans += 1
+        return LLMResponse(text=plan, tokens_used=2, model="mock")
+
+    async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+        self.verifications += 1
+        await asyncio.sleep(self.delay)
+        answer = "YES | done" if self.verifications == self.complete_on else "NO | more"
+        return LLMResponse(text=answer, tokens_used=2, model="mock")
+
+
+class TestPipelinedAgent:
+    """Test speculative next-turn planning."""
+
+    @pytest.mark.asyncio
+    async def test_speculative_plan_is_used_and_saves_time(self):
+        provider = SlowPlannerProvider(delay=0.05, complete_on=2)
+        agent = Agent(provider, pipeline=True)
+
+        result = await agent.run("Two step task", max_turns=3)
+
+        assert result == "Executed: plan 2"
+        stats = agent.pipeline_stats
+        assert stats.speculated == 2
+        assert stats.accepted == 1
+        assert stats.discarded == 1
+        assert stats.saved_ms >= 30
+        assert stats.to_dict()["accepted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_speculation_discarded_when_goal_completes(self):
+        provider = SlowPlannerProvider(delay=0.02, complete_on=1)
+        agent = Agent(provider, pipeline=True)
+
+        await agent.run("One step task", max_turns=3)
+        await asyncio.sleep(0.05)
+
+        assert agent.pipeline_stats.accepted == 0
+        assert agent.pipeline_stats.discarded == 1
+        assert agent.pipeline_stats.saved_ms == 0
+        # The cancelled speculation never produced a plan that was acted on.
+        assert provider.plans == 2
+
+    @pytest.mark.asyncio
+    async def test_speculation_cancelled_when_run_deadline_expires(self):
+        from src.agent_labs.orchestrator import RunTimeoutError
+
+        provider = SlowPlannerProvider(delay=0.05, complete_on=99)
+        agent = Agent(provider, pipeline=True)
+
+        with pytest.raises(RunTimeoutError):
+            await agent.run("Slow task", max_turns=5, max_run_seconds=0.13)
+        await asyncio.sleep(0.1)
+
+        assert agent.pipeline_stats.discarded == 1
+        assert provider.finished_plans == provider.plans - 1
+
+    @pytest.mark.asyncio
+    async def test_no_speculation_on_last_turn(self):
+        provider = SlowPlannerProvider(delay=0, complete_on=99)
+        agent = Agent(provider, pipeline=True)
+
+        await agent.run("Endless task", max_turns=2)
+
+        assert agent.pipeline_stats.speculated == 1
+        assert agent.pipeline_stats.accepted == 1
+
+
+class TestAgentPool:
+    """Test batch execution with run_many / AgentPool."""
+
+    @pytest.mark.asyncio
+    async def test_run_many_bounds_concurrency_and_keeps_order(self):
+        in_flight = 0
+        peak = 0
+
+        async def executor(plan: str) -> str:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return plan
+
+        agent = Agent(
+            MockProvider(),
+            tool_executor=executor,
+            verifier=lambda context, result: VerificationResult(
+                is_complete=True, reason=context.goal
+            ),
+        )
+        goals = [f"goal {index}" for index in range(10)]
+
+        batch = await agent.run_many(goals, concurrency=3, max_turns=1)
+
+        assert peak == 3
+        assert [outcome.goal for outcome in batch.outcomes] == goals
+        assert batch.succeeded == 10
+        assert batch.to_dict()["throughput"] > 0
+
+    @pytest.mark.asyncio
+    async def test_pool_isolates_contexts_and_records_failures(self):
+        from src.agent_labs.orchestrator import AgentPool
+
+        seen = {}
+
+        def verifier(context, result):
+            if context.goal == "bad":
+                raise ValueError("boom")
+            seen[context.goal] = [
+                message for _, message in context.history if message.startswith("Goal:")
+            ]
+            return VerificationResult(is_complete=True, reason="ok")
+
+        pool = AgentPool(Agent(MockProvider(), verifier=verifier), concurrency=2, max_turns=1)
+
+        outcomes = [outcome async for outcome in pool.as_completed(["a", "bad", "b"])]
+
+        assert sorted(outcome.index for outcome in outcomes) == [0, 1, 2]
+        failed = [outcome for outcome in outcomes if not outcome.ok]
+        assert [outcome.goal for outcome in failed] == ["bad"]
+        assert seen == {"a": ["Goal: a (Turn 1)"], "b": ["Goal: b (Turn 1)"]}
+
+
+class TestCheckpointResume:
+    """Test run checkpoints and Agent.resume."""
+
+    class CountingProvider(MockProvider):
+        """Counts plan calls; verification passes on the given call, and can crash once."""
+
+        def __init__(self, complete_on: int, crash_on: int = 0, crash_plan_on: int = 0):
+            super().__init__()
+            self.complete_on = complete_on
+            self.crash_on = crash_on
+            self.crash_plan_on = crash_plan_on
+            self.plan_calls = 0
+            self.plans = 0
+            self.verifications = 0
+
+        async def generate_chat(
+            self, messages, max_tokens=1000, temperature=0.7, stable_prefix=0
+        ):
+            self.plan_calls += 1
+            if self.plan_calls == self.crash_plan_on:
+                raise ConnectionError("redeploy")
+            self.plans += 1
+            return LLMResponse(text=f"plan {self.plans}", tokens_used=2, model="mock")
+
+        async def generate(self, prompt, max_tokens=1000, temperature=0.7):
+            self.verifications += 1
+            if self.verifications == self.crash_on:
+                raise ConnectionError("redeploy")
+            answer = "YES | done" if self.verifications == self.complete_on else "NO | more"
+            return LLMResponse(text=answer, tokens_used=2, model="mock")
+
+    @pytest.mark.asyncio
+    async def test_resume_continues_after_crash_without_replanning(self):
+        from src.agent_labs.orchestrator import InMemoryRunStore, VerificationError
+
+        store = InMemoryRunStore()
+        provider = self.CountingProvider(complete_on=3, crash_on=2)
+        agent = Agent(provider, run_store=store)
+
+        with pytest.raises(VerificationError):
+            await agent.run("Long task", max_turns=4, run_id="run-1")
+        assert provider.plans == 2
+
+        # A fresh agent (e.g. after a redeploy) picks up at turn 2's verification.
+        resumed = Agent(provider, run_store=store)
+        result = await resumed.resume("run-1")
+
+        assert result == "Executed: plan 2"
+        assert provider.plans == 2
+        assert await resumed.resume("run-1") == result
+
+    @pytest.mark.asyncio
+    async def test_resume_after_crash_during_planning(self):
+        from src.agent_labs.orchestrator import InMemoryRunStore, PlanningError
+
+        store = InMemoryRunStore()
+        provider = self.CountingProvider(complete_on=2, crash_plan_on=2)
+        agent = Agent(provider, run_store=store)
+
+        with pytest.raises(PlanningError):
+            await agent.run("Long task", max_turns=4, run_id="run-2")
+        assert provider.verifications == 1
+
+        result = await Agent(provider, run_store=store).resume("run-2")
+
+        assert result == "Executed: plan 2"
+        assert provider.plans == 2
+        assert provider.verifications == 2
+
+    @pytest.mark.asyncio
+    async def test_resume_unknown_run_raises(self):
+        from src.agent_labs.orchestrator import InMemoryRunStore, RunNotFoundError
+
+        with pytest.raises(RunNotFoundError):
+            await Agent(MockProvider(), run_store=InMemoryRunStore()).resume("missing")
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_after_each_transition(self):
+        from src.agent_labs.orchestrator import RunStore, decode_context
+
+        class RecordingStore(RunStore):
+            def __init__(self):
+                self.saves = []
+
+            def save(self, run_id, data):
+                self.saves.append(decode_context(data).current_state)
+
+            def load(self, run_id):
+                return None
+
+            def delete(self, run_id):
+                return False
+
+            def list_runs(self):
+                return []
+
+        store = RecordingStore()
+        await Agent(self.CountingProvider(complete_on=1), run_store=store).run("Task")
+
+        assert store.saves == [
+            AgentState.OBSERVING,
+            AgentState.PLANNING,
+            AgentState.ACTING,
+            AgentState.VERIFYING,
+            AgentState.DONE,
+        ]
+
+    def test_encode_decode_roundtrip_with_sqlite_store(self, tmp_path):
+        from src.agent_labs.orchestrator import (
+            decode_context,
+            encode_context,
+            run_store_from_config,
+        )
+
+        context = AgentContext(
+            goal="Summarize",
+            inputs={"doc": "report"},
+            turn_count=2,
+            history=[("system", "Goal: Summarize (Turn 1)")] * 50,
+            current_state=AgentState.REFINING,
+            run_id="r1",
+            max_turns=5,
+            last_result="partial",
+            last_verification=VerificationResult(
+                is_complete=False, confidence=0.5, reason="r", feedback="f"
+            ),
+        )
+        store = run_store_from_config(
+            {"backend": "sqlite", "config": {"path": str(tmp_path / "runs.db")}}
+        )
+
+        data = encode_context(context)
+        store.save("r1", data)
+
+        assert decode_context(store.load("r1")) == context
+        assert len(data) < len(str(context.history))
+        assert store.list_runs() == ["r1"]
+        assert run_store_from_config({"backend": "disabled"}) is None
@@ -5,7 +5,16 @@ from __future__ import annotations
 import pytest
 
 from agent_core.exceptions import ImplementationNotFoundError
-from agent_core.registry import Registry, get_global_registry
+from agent_core.registry import (
+    AgentCoreRegistry,
+    ExecutionEngineRegistry,
+    ExporterRegistry,
+    ModelProviderRegistry,
+    Registry,
+    ToolProviderRegistry,
+    VectorStoreRegistry,
+    get_global_registry,
+)
 
 
 class Example:
@@ -46,3 +55,87 @@ def test_builtin_registrations_present() -> None:
     assert "native" in registry.tool_providers
     assert "mcp" in registry.tool_providers
     assert "memory" in registry.vectorstores
+
+
+@pytest.fixture
+def labs_registry() -> AgentCoreRegistry:
+    """Fresh registry with the agent_labs provider plugin registered."""
+    from agent_labs.llm_providers.registration import register
+
+    registry = AgentCoreRegistry(
+        engines=ExecutionEngineRegistry("engine"),
+        model_providers=ModelProviderRegistry("model_provider"),
+        tool_providers=ToolProviderRegistry("tool_provider"),
+        vectorstores=VectorStoreRegistry("vector_store"),
+        exporters=ExporterRegistry("exporter"),
+    )
+    register(registry)
+    return registry
+
+
+def test_load_balanced_provider_builds_backends_from_registry(labs_registry) -> None:
+    from agent_labs.llm_providers import LoadBalancedProvider, MockProvider
+
+    providers = labs_registry.model_providers
+    providers.register("test_mock", MockProvider)
+
+    provider = providers.get("load_balanced")(
+        backends=[{"provider": "test_mock", "name": "a"}, MockProvider(name="b")],
+        strategy="ewma",
+    )
+
+    assert isinstance(provider, LoadBalancedProvider)
+    assert [p.name for p in provider.providers] == ["a", "b"]
+    assert provider.strategy == "ewma"
+
+
+def test_usage_tracked_provider_enforces_budget_config(labs_registry) -> None:
+    from agent_core.config.models import BudgetsConfig
+    from agent_labs.llm_providers import MockProvider, UsageTrackingProvider
+
+    provider = labs_registry.model_providers.get("usage_tracked")(
+        provider=MockProvider(),
+        budgets=BudgetsConfig(max_total_tokens=500),
+    )
+
+    assert isinstance(provider, UsageTrackingProvider)
+    assert provider.tracker.max_total_tokens == 500
+
+
+def test_composite_providers_build_builtin_provider_specs(labs_registry) -> None:
+    from agent_labs.llm_providers import (
+        FallbackCascadeProvider,
+        MockProvider,
+        OllamaProvider,
+        UsageTrackingProvider,
+    )
+
+    providers = labs_registry.model_providers
+
+    balanced = providers.get("load_balanced")(
+        backends=[
+            {"provider": "mock", "name": "a"},
+            {"provider": "ollama", "base_url": "http://stub"},
+        ],
+    )
+    cascade = providers.get("cascade")(tiers=[{"provider": "mock"}, {"provider": "mock"}])
+    tracked = providers.get("usage_tracked")(provider={"provider": "mock"})
+
+    assert isinstance(balanced.providers[0], MockProvider)
+    assert isinstance(balanced.providers[1], OllamaProvider)
+    assert all(isinstance(tier, MockProvider) for tier in cascade.tiers)
+    assert isinstance(cascade, FallbackCascadeProvider)
+    assert isinstance(tracked, UsageTrackingProvider)
+
+
+def test_agent_core_does_not_import_agent_labs() -> None:
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = (
+        "import sys; import agent_core.registry; "
+        "assert not any(name.startswith('agent_labs') for name in sys.modules)"
+    )
+    src = Path(__file__).resolve().parents[2] / "src"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=src)